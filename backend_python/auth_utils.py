@@ -1,25 +1,170 @@
 from datetime import datetime, timedelta
 from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import hashlib
+import hmac
+import threading
+import time
 from jose import JWTError, jwt
 import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+import os
 import models, database
+from cache import TTLCache
 
 SECRET_KEY = "change-me-to-something-secure"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 # 1 day
 
+# Link download ditandatangani per dokumen (bukan JWT di query string); berlaku DOWNLOAD_LINK_WINDOW
+# sampai 2x DOWNLOAD_LINK_WINDOW detik. Kedaluwarsa dibulatkan per window supaya body list bisa di-cache.
+DOWNLOAD_LINK_WINDOW = int(os.getenv("DOWNLOAD_LINK_WINDOW", "600"))
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
+# Untuk EventSource (SSE) yang tidak bisa mengirim header Authorization
+oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="auth/login", auto_error=False)
+
+# Cache principal user per id, supaya tiap request terautentikasi tidak SELECT ke tabel users
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "2048"))
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "60"))
+user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+
+class UserPrincipal:
+    """Salinan ringan data user (tanpa password) yang aman di-cache lintas request."""
+    __slots__ = ("id", "name", "email", "role", "position", "instansi", "address", "is_active")
+
+    def __init__(self, user):
+        for field in self.__slots__:
+            setattr(self, field, getattr(user, field))
+
+def invalidate_user(user_id):
+    # Hanya cache proses ini; proses/instance lain memakai principal lama sampai USER_CACHE_TTL habis
+    user_cache.delete(user_id)
+
+def _invalidate_after_commit(target):
+    # Dicatat saat flush, dihapus dari cache setelah commit: sebelum itu request lain masih bisa
+    # membaca baris lama dari DB dan mengisi cache lagi
+    session = object_session(target)
+    if session is None:
+        invalidate_user(target.id)
+    else:
+        session.info.setdefault("invalidate_users", set()).add(target.id)
+
+@event.listens_for(models.User, "after_update")
+def _invalidate_on_update(mapper, connection, target):
+    # Role / status aktif berubah -> principal lama tidak boleh dipakai lagi
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in UserPrincipal.__slots__):
+        _invalidate_after_commit(target)
+
+@event.listens_for(models.User, "after_delete")
+def _invalidate_on_delete(mapper, connection, target):
+    _invalidate_after_commit(target)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session):
+    for user_id in session.info.pop("invalidate_users", ()):
+        invalidate_user(user_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_invalidations(session):
+    session.info.pop("invalidate_users", None)
+
+# Work factor bcrypt; hash lama dengan cost berbeda di-hash ulang saat login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Pool khusus hashing password (bcrypt melepas GIL, jadi thread cukup)
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", "2"))
+# Batas antrian; jika penuh request langsung ditolak 503 daripada menumpuk
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", "32"))
 
 def verify_password(plain_password, hashed_password):
     if isinstance(hashed_password, str):
         hashed_password = hashed_password.encode('utf-8')
     return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password)
 
-def get_password_hash(password):
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+def get_password_hash(password, rounds=None):
+    salt = bcrypt.gensalt(rounds=rounds or BCRYPT_ROUNDS)
+    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+def needs_rehash(hashed_password, rounds=None):
+    # Format: $2b$<cost>$<salt+hash>
+    try:
+        return int(hashed_password.split('$')[2]) != (rounds or BCRYPT_ROUNDS)
+    except (IndexError, ValueError, AttributeError):
+        return True
+
+class PasswordHasher:
+    """Menjalankan bcrypt di thread pool terbatas, di luar event loop dan threadpool request."""
+
+    def __init__(self, workers=HASH_WORKERS, max_pending=HASH_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.total_run = 0.0
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    def _timed(self, queued_at, fn, *args):
+        started = time.monotonic()
+        try:
+            return fn(*args)
+        finally:
+            finished = time.monotonic()
+            with self._lock:
+                self.total_wait += started - queued_at
+                self.total_run += finished - started
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(status_code=503, detail="Server sedang sibuk, silakan coba lagi")
+            self.pending += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+            executor = self._get_executor()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, self._timed, time.monotonic(), fn, *args)
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+
+    async def verify(self, plain_password, hashed_password):
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password):
+        return await self._run(get_password_hash, password)
+
+    def stats(self):
+        with self._lock:
+            done = self.completed or 1
+            return {
+                "workers": self.workers,
+                "rounds": BCRYPT_ROUNDS,
+                "pending": self.pending,
+                "peak_pending": self.peak_pending,
+                "max_pending": self.max_pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self.total_wait / done * 1000, 2),
+                "avg_run_ms": round(self.total_run / done * 1000, 2),
+            }
+
+password_hasher = PasswordHasher()
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -31,7 +176,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_async_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -45,10 +190,50 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     except JWTError:
         raise credentials_exception
     
-    user = db.query(models.User).filter(models.User.id == user_id).first()
-    if user is None:
-        raise credentials_exception
-    return user
+    principal = user_cache.get(user_id)
+    if principal is None:
+        user = await db.get(models.User, user_id)
+        if user is None:
+            raise credentials_exception
+        principal = UserPrincipal(user)
+        user_cache.set(user_id, principal)
+    return principal
+
+async def get_current_user_for_stream(token: str = Depends(oauth2_scheme)):
+    # Untuk endpoint yang mengembalikan response streaming: session sendiri yang langsung ditutup,
+    # bukan get_async_db yang baru dilepas setelah stream selesai
+    async with database.async_session() as db:
+        return await get_current_user(token, db)
+
+async def get_current_user_or_query_token(
+    token: Optional[str] = Depends(oauth2_scheme_optional),
+    access_token: Optional[str] = None
+):
+    # Header Authorization atau ?access_token=... (EventSource tidak bisa mengirim header)
+    if not (token or access_token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return await get_current_user_for_stream(token or access_token)
+
+def download_window(now=None):
+    return int((now or time.time()) // DOWNLOAD_LINK_WINDOW)
+
+def _download_signature(doc_id, expires):
+    message = f"{doc_id}:{expires}".encode("utf-8")
+    return hmac.new(SECRET_KEY.encode("utf-8"), message, hashlib.sha256).hexdigest()[:32]
+
+def sign_download(doc_id):
+    """Kembalikan (expires, sig) untuk /documents/{doc_id}/download."""
+    expires = (download_window() + 2) * DOWNLOAD_LINK_WINDOW
+    return expires, _download_signature(doc_id, expires)
+
+def verify_download(doc_id, expires, sig):
+    if not expires or not sig or expires < time.time():
+        return False
+    return hmac.compare_digest(sig, _download_signature(doc_id, expires))
 
 def require_role(allowed_roles: list):
     def role_checker(user: models.User = Depends(get_current_user)):
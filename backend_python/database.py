@@ -1,9 +1,12 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import run_in_threadpool
 import os
+from contextlib import asynccontextmanager
 import ssl
 from dotenv import load_dotenv
+import db_pool
 
 load_dotenv()
 
@@ -26,19 +29,124 @@ if "aivencloud.com" in SQLALCHEMY_DATABASE_URL or os.getenv("VERCEL"):
     except Exception as e:
         print(f"Warning: Failed to create SSL context: {e}")
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, 
-    connect_args=connect_args,
-    pool_pre_ping=True, # Auto-reconnect
-    pool_recycle=300    # Recycle connections every 5 minutes
-)
+# Profil pool: serverless (Vercel), long-running (uvicorn) atau test (SQLite); lihat db_pool.py
+POOL_PROFILE = db_pool.detect_profile(SQLALCHEMY_DATABASE_URL)
+
+def _engine_kwargs(url, is_async=False):
+    options = db_pool.engine_options(POOL_PROFILE, url, is_async=is_async)
+    options["connect_args"] = {**connect_args, **options.get("connect_args", {})}
+    return options
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **_engine_kwargs(SQLALCHEMY_DATABASE_URL))
+pool_metrics = db_pool.instrument(engine, db_pool.PoolMetrics())
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Mode async (opsional): DB_ASYNC=true memakai driver async, mis. aiomysql atau aiosqlite (test)
+DB_ASYNC = os.getenv("DB_ASYNC", "False").lower() == "true"
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def to_async_url(url):
+    scheme, rest = url.split("://", 1)
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}://{rest}"
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or to_async_url(SQLALCHEMY_DATABASE_URL)
+async_engine = None
+async_pool_metrics = None
+AsyncSessionLocal = None
+
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_kwargs(ASYNC_DATABASE_URL, is_async=True))
+    async_pool_metrics = db_pool.instrument(async_engine.sync_engine, db_pool.PoolMetrics())
+    # expire_on_commit=False: atribut tetap bisa dibaca setelah commit tanpa IO implisit
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
+def pool_stats():
+    stats = {"profile": POOL_PROFILE, "sync": pool_metrics.stats(engine.pool)}
+    if async_engine is not None:
+        stats["async"] = async_pool_metrics.stats(async_engine.sync_engine.pool)
+    return stats
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+class SyncSessionAdapter:
+    """Session sinkron dengan API ala AsyncSession; setiap operasi DB dijalankan di threadpool.
+
+    Dipakai oleh get_async_db saat DB_ASYNC mati, sehingga router async cukup ditulis sekali.
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    @property
+    def info(self):
+        return self.sync_session.info
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    async def execute(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.execute, statement, *args, **kwargs)
+
+    async def scalar(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, statement, *args, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def delete(self, instance):
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def refresh(self, instance, *args, **kwargs):
+        await run_in_threadpool(self.sync_session.refresh, instance, *args, **kwargs)
+
+    async def flush(self):
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+@asynccontextmanager
+async def async_session():
+    """Session berumur pendek di luar dependency request.
+
+    Dipakai endpoint streaming (SSE, download): teardown dependency baru jalan setelah
+    response selesai, jadi session request akan menahan koneksi pool selama stream terbuka.
+    """
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as session:
+            yield session
+    else:
+        adapter = SyncSessionAdapter(SessionLocal(expire_on_commit=False))
+        try:
+            yield adapter
+        finally:
+            await adapter.close()
+
+async def get_async_db():
+    async with async_session() as db:
+        yield db
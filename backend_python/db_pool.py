@@ -0,0 +1,192 @@
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool, StaticPool
+
+logger = logging.getLogger(__name__)
+
+# Profil pool koneksi:
+#   serverless   - Vercel: pool kecil per instance, koneksi dibuka saat dipakai, tanpa pre-ping
+#   long-running - uvicorn/gunicorn: pool lebih besar + overflow, pre-ping, LIFO
+#   test         - SQLite; StaticPool untuk database in-memory
+PROFILES = ("serverless", "long-running", "test")
+
+# Checkout yang menunggu lebih lama dari ini dicatat ke log (ms)
+SLOW_CHECKOUT_MS = float(os.getenv("DB_POOL_SLOW_MS", "500"))
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+def _env_float(name, default):
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+def detect_profile(url):
+    profile = os.getenv("DB_POOL_PROFILE", "").lower()
+    if profile:
+        if profile not in PROFILES:
+            raise ValueError(f"DB_POOL_PROFILE tidak dikenal: {profile} (pilihan: {', '.join(PROFILES)})")
+        return profile
+    if url.startswith("sqlite"):
+        return "test"
+    if os.getenv("VERCEL"):
+        return "serverless"
+    return "long-running"
+
+class PoolMetrics:
+    """Hitung checkout/checkin dan lama menunggu koneksi dari pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidated = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.slow_checkouts = 0
+
+    def record_wait(self, seconds, pool):
+        with self._lock:
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+            slow = seconds * 1000 >= SLOW_CHECKOUT_MS
+            if slow:
+                self.slow_checkouts += 1
+        if slow:
+            logger.warning(f"Waited {seconds * 1000:.0f} ms for a DB connection ({pool.status()})")
+
+    def record_timeout(self, pool):
+        with self._lock:
+            self.timeouts += 1
+        logger.warning(f"Timed out waiting for a DB connection ({pool.status()})")
+
+    def incr(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self, pool):
+        with self._lock:
+            data = {
+                "pool": type(pool).__name__,
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidated": self.invalidated,
+                "timeouts": self.timeouts,
+                "slow_checkouts": self.slow_checkouts,
+                "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 2) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 2),
+            }
+        if isinstance(pool, QueuePool):
+            data.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+            })
+        return data
+
+class _TimedPool:
+    """Mixin: ukur berapa lama _do_get menunggu (antre koneksi atau membuka koneksi baru)."""
+
+    metrics = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_timeout(self)
+            raise
+        if self.metrics is not None:
+            self.metrics.record_wait(time.perf_counter() - start, self)
+        return conn
+
+    def recreate(self):
+        # dispose() membuat pool baru; metrics tetap dibawa
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+class TimedQueuePool(_TimedPool, QueuePool):
+    pass
+
+class TimedAsyncQueuePool(_TimedPool, AsyncAdaptedQueuePool):
+    pass
+
+class TimedNullPool(_TimedPool, NullPool):
+    pass
+
+def engine_options(profile, url, is_async=False):
+    """Argumen create_engine untuk profil pool; nilai bisa diubah lewat env DB_POOL_*."""
+    queue_pool = TimedAsyncQueuePool if is_async else TimedQueuePool
+
+    if profile == "test":
+        if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith(":")):
+            # Satu koneksi dipakai bersama supaya semua session melihat database in-memory yang sama
+            return {"poolclass": StaticPool, "connect_args": {"check_same_thread": False}}
+        return {
+            "poolclass": queue_pool,
+            "pool_size": _env_int("DB_POOL_SIZE", 5),
+            "max_overflow": _env_int("DB_MAX_OVERFLOW", 5),
+            "pool_timeout": _env_float("DB_POOL_TIMEOUT", 10),
+        }
+
+    if profile == "serverless":
+        pool_size = _env_int("DB_POOL_SIZE", 1)
+        if pool_size == 0:
+            # Tanpa pool: koneksi dibuka per checkout dan langsung ditutup
+            return {"poolclass": TimedNullPool}
+        return {
+            "poolclass": queue_pool,
+            "pool_size": pool_size,
+            "max_overflow": _env_int("DB_MAX_OVERFLOW", 2),
+            "pool_timeout": _env_float("DB_POOL_TIMEOUT", 10),
+            # Instance berumur pendek: recycle menggantikan pre-ping (hemat satu round trip)
+            "pool_pre_ping": False,
+            "pool_recycle": _env_int("DB_POOL_RECYCLE", 240),
+        }
+
+    return {
+        "poolclass": queue_pool,
+        "pool_size": _env_int("DB_POOL_SIZE", 10),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", 20),
+        "pool_timeout": _env_float("DB_POOL_TIMEOUT", 10),
+        "pool_pre_ping": True,
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", 1800),
+        # LIFO: koneksi yang jarang dipakai menganggur lalu ditutup server/recycle
+        "pool_use_lifo": True,
+    }
+
+def instrument(engine, metrics):
+    """Pasang metrics ke pool engine (sync atau engine.sync_engine milik AsyncEngine)."""
+    pool = engine.pool
+    if isinstance(pool, _TimedPool):
+        pool.metrics = metrics
+
+    @event.listens_for(pool, "connect")
+    def _on_connect(dbapi_conn, record):
+        metrics.incr("connects")
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_conn, record, proxy):
+        metrics.incr("checkouts")
+
+    @event.listens_for(pool, "checkin")
+    def _on_checkin(dbapi_conn, record):
+        metrics.incr("checkins")
+
+    @event.listens_for(pool, "invalidate")
+    def _on_invalidate(dbapi_conn, record, exc):
+        metrics.incr("invalidated")
+
+    return metrics
@@ -0,0 +1,81 @@
+"""Ukur waktu import main.py (cold start) per modul.
+
+    python import_benchmark.py              # mode sesuai env (LEAN_STARTUP)
+    python import_benchmark.py --compare    # normal vs lean
+    python import_benchmark.py --top 30 --runs 5
+
+Tiap run memakai proses Python baru dengan `-X importtime`; angka per modul dari run median.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Modul milik aplikasi: dilaporkan apa adanya; modul lain digabung per package teratas
+APP_PACKAGES = ("main", "database", "db_pool", "models", "auth_utils", "cache", "pagination", "migrations",
+                "response_cache", "json_response", "schemas", "routers", "services")
+SNIPPET = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+
+def run_once(env):
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", SNIPPET],
+                          cwd=HERE, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise SystemExit(proc.stderr[-2000:])
+    total = float(proc.stdout.strip().splitlines()[-1])
+    modules = {}
+    for line in proc.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|", 1).split("|"))
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return total, modules
+
+def summarize(modules):
+    """Waktu per modul aplikasi (kumulatif) dan per package pihak ketiga (jumlah self time)."""
+    app, packages = {}, {}
+    for name, (self_us, cumulative_us) in modules.items():
+        top = name.split(".")[0]
+        if top in APP_PACKAGES:
+            app[name] = cumulative_us
+        else:
+            packages[top] = packages.get(top, 0) + self_us
+    return app, packages
+
+def measure(env, runs):
+    results = sorted((run_once(env) for _ in range(runs)), key=lambda r: r[0])
+    total, modules = results[len(results) // 2]
+    return [r[0] for r in results], summarize(modules)
+
+def print_table(title, rows, top):
+    print(f"\n{title}")
+    for name, us in sorted(rows.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {us / 1000:9.1f} ms  {name}")
+
+def report(label, env, runs, top):
+    totals, (app, packages) = measure(env, runs)
+    print(f"== {label}: import main median {statistics.median(totals) * 1000:.0f} ms "
+          f"(min {min(totals) * 1000:.0f} ms, {runs} run)")
+    print_table("Modul aplikasi (kumulatif, termasuk dependency yang pertama kali di-import):", app, top)
+    print_table("Package pihak ketiga (self time):", packages, top)
+    return statistics.median(totals)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--compare", action="store_true", help="bandingkan LEAN_STARTUP=false dan true")
+    args = parser.parse_args()
+
+    if not args.compare:
+        report(f"LEAN_STARTUP={os.getenv('LEAN_STARTUP', '(default)')}", dict(os.environ), args.runs, args.top)
+        return
+    normal = report("normal", {**os.environ, "LEAN_STARTUP": "false"}, args.runs, args.top)
+    print()
+    lean = report("lean", {**os.environ, "LEAN_STARTUP": "true"}, args.runs, args.top)
+    print(f"\nlean startup: {(normal - lean) * 1000:.0f} ms lebih cepat ({lean / normal:.0%} dari normal)")
+
+if __name__ == "__main__":
+    main()
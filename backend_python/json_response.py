@@ -0,0 +1,20 @@
+import json
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def dumps(content):
+    """Serialisasi ke bytes JSON; orjson bila terpasang (datetime & numpy ditangani langsung)."""
+    if orjson is not None:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """Response class default untuk route tanpa response model."""
+
+    def render(self, content):
+        return dumps(content)
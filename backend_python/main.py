@@ -1,28 +1,41 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends
+from fastapi.datastructures import Default
 from fastapi.middleware.cors import CORSMiddleware
-from database import engine, Base
+from database import engine
+import database, auth_utils, response_cache, json_response
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Create tables if not exist (for dev)
-# Wrap in try-except to prevent crash on Vercel if DB is unreachable
-try:
-    Base.metadata.create_all(bind=engine)
-except Exception as e:
-    logger.error(f"Error creating tables: {e}")
-
 from fastapi.staticfiles import StaticFiles
 import os
 
-app = FastAPI(title="Buku Saku API (Python)")
+# Lean startup (default di Vercel): tidak ada DDL/koneksi DB saat import, job worker baru
+# jalan saat ada job pertama. Skema dimigrasikan saat deploy dengan `python migrate.py`.
+LEAN_STARTUP = os.getenv("LEAN_STARTUP", "true" if os.getenv("VERCEL") else "false").lower() == "true"
+
+# Apply pending schema migrations (see migrations/ and migrate.py)
+# Wrap in try-except to prevent crash on Vercel if DB is unreachable
+if not LEAN_STARTUP:
+    try:
+        import migrations
+        migrations.upgrade(engine)
+    except Exception as e:
+        logger.error(f"Error applying migrations: {e}")
+from services import storage_service
+
+# Dibungkus Default(): route dengan response model tetap memakai jalur cepat pydantic (dump_json),
+# route lain dirender dengan orjson
+app = FastAPI(title="Buku Saku API (Python)", default_response_class=Default(json_response.FastJSONResponse))
 
 # Ensure uploads directory exists (Handle Vercel Read-Only FS)
 try:
     os.makedirs("uploads", exist_ok=True)
-    app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+    # Mount publik tanpa auth hanya bila PUBLIC_UPLOADS=true (default: file lewat /documents/{id}/download)
+    if storage_service.PUBLIC_UPLOADS:
+        app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 except OSError:
     logger.warning("Could not create uploads directory (likely read-only filesystem). Skipping mount.")
 
@@ -59,6 +72,58 @@ try:
 except Exception as e:
     logger.error(f"Failed to load categories router: {e}")
 
+try:
+    from routers import history
+    app.include_router(history.router)
+except Exception as e:
+    logger.error(f"Failed to load history router: {e}")
+
+try:
+    from routers import notifications
+    app.include_router(notifications.router)
+except Exception as e:
+    logger.error(f"Failed to load notifications router: {e}")
+
+try:
+    from routers import favorites
+    app.include_router(favorites.router)
+except Exception as e:
+    logger.error(f"Failed to load favorites router: {e}")
+
+@app.on_event("startup")
+def start_job_workers():
+    # Resume jobs left queued by a previous process (uploads, extraction).
+    # Lean startup: worker dinyalakan oleh commit pertama yang mengantrikan job
+    if LEAN_STARTUP:
+        return
+    try:
+        from services import job_queue
+        job_queue.start()
+    except Exception as e:
+        logger.error(f"Failed to start job workers: {e}")
+
+@app.get("/system/db-pool")
+def db_pool_stats(user = Depends(auth_utils.require_role(['admin', 'superuser']))):
+    # Koneksi yang sedang dipakai, overflow dan lama menunggu checkout
+    return database.pool_stats()
+
+@app.get("/system/response-cache")
+async def response_cache_stats(
+    db = Depends(database.get_async_db),
+    user = Depends(auth_utils.require_role(['admin', 'superuser']))
+):
+    # Hit rate body cache + versi tabel saat ini (tabel table_versions)
+    current = await response_cache.versions(db, response_cache.TABLES)
+    return {**response_cache.stats(), "versions": dict(zip(response_cache.TABLES, current))}
+
+@app.get("/system/drive-cache")
+def drive_cache_stats(user = Depends(auth_utils.require_role(['admin', 'superuser']))):
+    # Salinan lokal file Drive: ukuran, hit/miss, download yang digabung
+    from services import drive_cache
+    if not drive_cache.enabled():
+        return {"enabled": False}
+    return {"enabled": True, **drive_cache.get_cache().stats()}
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to Buku Saku API (Python Edition)"}
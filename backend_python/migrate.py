@@ -0,0 +1,106 @@
+"""Jalankan migrasi skema dan cek rencana query.
+
+    python migrate.py              # terapkan migrasi yang belum jalan
+    python migrate.py --status     # tampilkan migrasi yang sudah / belum diterapkan
+    python migrate.py --explain    # EXPLAIN query listing/search; gagal jika tidak memakai index
+"""
+import logging
+import sys
+from datetime import datetime
+
+from sqlalchemy import select
+
+import database, models, pagination, migrations
+from services import tagging_service
+
+def hot_queries():
+    """Query yang paling sering dijalankan, beserta index yang seharusnya dipakai."""
+    from routers.documents import document_list_query
+    from routers.history import history_query
+
+    # Halaman lanjutan (keyset): kondisi cursor tidak boleh membuat query keluar dari index
+    cursor = pagination.encode_cursor(datetime(2024, 1, 1), "x")
+
+    def listing(statuses=None, q=None, tags=None, categories=None, cursor=None):
+        query = document_list_query()
+        if q:
+            query = query.filter(models.Document.title.like(f"%{q}%"))
+        query = tagging_service.filter_documents(query, tags=tags, categories=categories)
+        if statuses:
+            query = query.filter(models.Document.status.in_(statuses))
+        return pagination.page_query(query, models.Document.created_at, models.Document.id, cursor, None)
+
+    def history_page(cursor=None, **filters):
+        history = models.DocumentHistory
+        return pagination.page_query(history_query(**filters), history.created_at, history.id, cursor, None)
+
+    def favorites_page(cursor=None):
+        favorite = models.Favorite
+        query = select(favorite.document_id).where(favorite.user_id == "x")
+        return pagination.page_query(query, favorite.created_at, favorite.document_id, cursor, None)
+
+    return [
+        ("list documents (admin)", listing(), "ix_documents_deleted_created"),
+        ("list documents (user)", listing(['approved']), "ix_documents_deleted_status_created"),
+        ("list documents, next page (admin)", listing(cursor=cursor), "ix_documents_deleted_created"),
+        ("list documents, next page (user)", listing(['approved'], cursor=cursor), "ix_documents_deleted_status_created"),
+        ("list documents ?q= (user)", listing(['approved'], q="pipa"), "ix_documents_deleted_status_created"),
+        ("list documents ?tag=", listing(tags="k3"), "ix_document_tags_tag_document"),
+        ("list documents ?category=", listing(categories="SOP"), "ix_document_categories_category_document"),
+        ("search index rebuild", select(models.Document.id).where(models.Document.deleted_at == None),
+         "ix_documents_deleted_"),
+        ("document history", history_page(document_id="x"), "ix_document_history_document_created"),
+        ("audit trail", history_page(), "ix_document_history_created"),
+        ("audit trail, next page", history_page(cursor=cursor), "ix_document_history_created"),
+        ("audit trail ?actor=", history_page(actor="x"), "ix_document_history_actor_created"),
+        ("favorites page", favorites_page(), "ix_favorites_user_created"),
+        ("favorites, next page", favorites_page(cursor=cursor), "ix_favorites_user_created"),
+        ("is_favorite lookup", select(models.Favorite.document_id).where(
+            models.Favorite.user_id == "x", models.Favorite.document_id.in_(["a", "b"])
+        ), "sqlite_autoindex_favorites_1" if database.engine.dialect.name == "sqlite" else "PRIMARY"),
+        ("unread notifications", select(models.Notification).where(
+            models.Notification.user_id == "x", models.Notification.is_read == False
+        ).order_by(models.Notification.created_at.desc()), "ix_notifications_user_read_created"),
+        ("notification stream poll", select(models.Notification).where(
+            models.Notification.user_id == "x", models.Notification.is_read == False,
+            models.Notification.created_at >= datetime(2024, 1, 1)
+        ).order_by(models.Notification.created_at, models.Notification.id), "ix_notifications_user_read_created"),
+    ]
+
+def explain(conn, statement):
+    # Nilai parameter ditulis langsung ke SQL supaya bisa diawali EXPLAIN
+    sql = str(statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "sqlite":
+        return [row["detail"] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql).mappings()]
+    return [
+        f"{row['table']}: key={row['key']} type={row['type']} extra={row.get('Extra')}"
+        for row in conn.exec_driver_sql("EXPLAIN " + sql).mappings()
+    ]
+
+def check_plans(engine):
+    ok = True
+    with engine.connect() as conn:
+        for name, statement, expected_index in hot_queries():
+            plan = explain(conn, statement)
+            used = any(expected_index in line for line in plan)
+            ok = ok and used
+            print(f"[{'OK' if used else 'NO INDEX'}] {name} (expected {expected_index}*)")
+            for line in plan:
+                print(f"    {line}")
+    return ok
+
+if __name__ == "__main__":
+    engine = database.engine
+    if "--status" in sys.argv:
+        done = set()
+        with engine.begin() as conn:
+            done = migrations.applied_versions(conn)
+        for version, name in migrations.available():
+            print(f"{'applied' if version in done else 'pending'}  {name}")
+    elif "--explain" in sys.argv:
+        sys.exit(0 if check_plans(engine) else 1)
+    else:
+        # "Applied migration ..." dari migrations.upgrade tetap tampil di terminal
+        logging.basicConfig(level=logging.INFO, format="%(message)s")
+        ran = migrations.upgrade(engine)
+        print(f"{len(ran)} migration(s) applied" if ran else "Schema is up to date")
@@ -0,0 +1,86 @@
+"""Tabel awal (sama dengan database_mysql/schema.sql sebelum ada migrasi).
+
+Definisi dibekukan di sini, bukan diambil dari models.py: kolom/index yang ditambahkan
+belakangan dibuat oleh migrasi berikutnya, jadi database baru dan lama melewati langkah yang sama.
+"""
+from sqlalchemy import (BigInteger, Boolean, Column, Enum, ForeignKey, Integer, JSON, MetaData, String, Table,
+                        Text, TIMESTAMP)
+from sqlalchemy.sql import func
+
+from migrations import create_tables
+
+meta = MetaData()
+
+users = Table(
+    "users", meta,
+    Column("id", String(36), primary_key=True),
+    Column("name", String(255), nullable=False),
+    Column("email", String(255), unique=True, nullable=False),
+    Column("password", Text, nullable=False),
+    Column("role", Enum('admin', 'manager', 'supervisor', 'user', 'superuser'), nullable=False),
+    Column("position", String(255)),
+    Column("instansi", String(255)),
+    Column("address", Text),
+    Column("is_active", Boolean),
+    Column("created_at", TIMESTAMP, server_default=func.now()),
+)
+
+categories = Table(
+    "categories", meta,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("name", String(255), unique=True, nullable=False),
+    Column("created_by", String(36), ForeignKey("users.id")),
+    Column("created_at", TIMESTAMP, server_default=func.now()),
+)
+
+documents = Table(
+    "documents", meta,
+    Column("id", String(36), primary_key=True),
+    Column("title", String(255), nullable=False),
+    Column("file_path", Text, nullable=False),
+    Column("file_type", String(50), nullable=False),
+    Column("file_size", BigInteger, nullable=False),
+    Column("uploaded_by", String(36), ForeignKey("users.id"), nullable=False),
+    Column("status", Enum('pending', 'approved', 'rejected'), nullable=False),
+    Column("approved_by", String(36), ForeignKey("users.id")),
+    Column("rejected_by", String(36), ForeignKey("users.id")),
+    Column("rejection_note", Text),
+    Column("deleted_by", String(36), ForeignKey("users.id")),
+    Column("category", JSON),
+    Column("tags", JSON),
+    Column("content", Text),
+    Column("embedding", JSON),
+    Column("deleted_at", TIMESTAMP),
+    Column("created_at", TIMESTAMP, server_default=func.now()),
+    Column("updated_at", TIMESTAMP, server_default=func.now()),
+)
+
+document_history = Table(
+    "document_history", meta,
+    Column("id", String(36), primary_key=True),
+    Column("document_id", String(36), ForeignKey("documents.id")),
+    Column("changed_by", String(36), ForeignKey("users.id")),
+    Column("action", String(50), nullable=False),
+    Column("notes", Text),
+    Column("created_at", TIMESTAMP, server_default=func.now()),
+)
+
+notifications = Table(
+    "notifications", meta,
+    Column("id", String(36), primary_key=True),
+    Column("user_id", String(36), ForeignKey("users.id")),
+    Column("message", Text, nullable=False),
+    Column("is_read", Boolean),
+    Column("type", String(50)),
+    Column("created_at", TIMESTAMP, server_default=func.now()),
+)
+
+favorites = Table(
+    "favorites", meta,
+    Column("user_id", String(36), ForeignKey("users.id"), primary_key=True),
+    Column("document_id", String(36), ForeignKey("documents.id"), primary_key=True),
+    Column("created_at", TIMESTAMP, server_default=func.now()),
+)
+
+def upgrade(conn):
+    create_tables(conn, users, categories, documents, document_history, notifications, favorites)
@@ -0,0 +1,43 @@
+"""Kolom content_hash/storage_status di documents dan tabel jobs.
+
+Definisi dibekukan di sini (bukan dari models.py), sama seperti 0001.
+"""
+from sqlalchemy import Column, Enum, Index, Integer, JSON, MetaData, String, Table, Text, TIMESTAMP
+from sqlalchemy.sql import func
+
+from migrations import add_column, create_index, create_tables
+
+meta = MetaData()
+
+content_hash = Column("content_hash", String(64))
+# server_default supaya baris lama terisi 'stored' walau kolomnya NOT NULL
+storage_status = Column("storage_status", Enum('uploading', 'stored', 'failed'), nullable=False, server_default="stored")
+
+documents = Table(
+    "documents", meta,
+    Column("id", String(36), primary_key=True),
+    Column("content_hash", String(64)),
+)
+
+jobs = Table(
+    "jobs", meta,
+    Column("id", String(36), primary_key=True),
+    Column("kind", String(50), nullable=False),
+    Column("payload", JSON),
+    Column("idempotency_key", String(255), unique=True),
+    Column("status", Enum('queued', 'running', 'done', 'failed'), nullable=False),
+    Column("attempts", Integer, nullable=False),
+    Column("max_attempts", Integer, nullable=False),
+    Column("run_at", TIMESTAMP, nullable=False),
+    Column("locked_at", TIMESTAMP),
+    Column("last_error", Text),
+    Column("created_at", TIMESTAMP, server_default=func.now()),
+    Column("updated_at", TIMESTAMP, server_default=func.now()),
+    Index("ix_jobs_status_run_at", "status", "run_at"),
+)
+
+def upgrade(conn):
+    add_column(conn, "documents", content_hash)
+    add_column(conn, "documents", storage_status)
+    create_index(conn, Index("ix_documents_content_hash", documents.c.content_hash))
+    create_tables(conn, jobs)
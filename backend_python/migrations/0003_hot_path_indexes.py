@@ -0,0 +1,14 @@
+"""Index komposit untuk listing dokumen, riwayat per dokumen dan notifikasi per user."""
+import models
+from migrations import create_index, model_index
+
+INDEXES = [
+    (models.Document, "ix_documents_deleted_created"),
+    (models.Document, "ix_documents_deleted_status_created"),
+    (models.DocumentHistory, "ix_document_history_document_created"),
+    (models.Notification, "ix_notifications_user_read_created"),
+]
+
+def upgrade(conn):
+    for model, name in INDEXES:
+        create_index(conn, model_index(model, name))
@@ -0,0 +1,29 @@
+"""Join table document_tags/document_categories + job backfill dari kolom JSON."""
+from sqlalchemy import Column, ForeignKey, Index, Integer, MetaData, String, Table
+
+from migrations import create_tables, queue_job
+
+meta = MetaData()
+
+# Hanya kolom yang dirujuk foreign key; tabelnya dibuat 0001
+Table("documents", meta, Column("id", String(36), primary_key=True))
+Table("categories", meta, Column("id", Integer, primary_key=True))
+
+document_tags = Table(
+    "document_tags", meta,
+    Column("document_id", String(36), ForeignKey("documents.id"), primary_key=True),
+    Column("tag", String(100), primary_key=True),
+    Index("ix_document_tags_tag_document", "tag", "document_id"),
+)
+
+document_categories = Table(
+    "document_categories", meta,
+    Column("document_id", String(36), ForeignKey("documents.id"), primary_key=True),
+    Column("category_id", Integer, ForeignKey("categories.id"), primary_key=True),
+    Index("ix_document_categories_category_document", "category_id", "document_id"),
+)
+
+def upgrade(conn):
+    create_tables(conn, document_tags, document_categories)
+    # Backfill dijalankan job worker (services/tagging_service.backfill) setelah aplikasi start
+    queue_job(conn, 'backfill_document_terms', {}, 'backfill_document_terms:0004')
@@ -0,0 +1,18 @@
+"""Tabel document_counters untuk /documents/stats + job rekonsiliasi (mengisi awal & memperbaiki drift)."""
+from sqlalchemy import BigInteger, Column, Enum, MetaData, String, Table
+
+from migrations import create_tables, queue_job
+
+meta = MetaData()
+
+document_counters = Table(
+    "document_counters", meta,
+    Column("dimension", String(20), primary_key=True),
+    Column("ref_id", String(36), primary_key=True),
+    Column("status", Enum('pending', 'approved', 'rejected'), primary_key=True),
+    Column("doc_count", BigInteger, nullable=False),
+)
+
+def upgrade(conn):
+    create_tables(conn, document_counters)
+    queue_job(conn, 'reconcile_document_counters', {'repeat': True}, 'reconcile_document_counters:0005')
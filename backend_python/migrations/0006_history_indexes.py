@@ -0,0 +1,7 @@
+"""Index untuk audit trail: semua riwayat terbaru dulu, dan riwayat per actor."""
+import models
+from migrations import create_index, model_index
+
+def upgrade(conn):
+    create_index(conn, model_index(models.DocumentHistory, "ix_document_history_created"))
+    create_index(conn, model_index(models.DocumentHistory, "ix_document_history_actor_created"))
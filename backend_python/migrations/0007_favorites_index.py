@@ -0,0 +1,6 @@
+"""Index daftar favorit per user (created_at terbaru dulu)."""
+import models
+from migrations import create_index, model_index
+
+def upgrade(conn):
+    create_index(conn, model_index(models.Favorite, "ix_favorites_user_created"))
@@ -0,0 +1,22 @@
+"""Tabel table_versions: versi tabel untuk ETag response cache, dibagi semua proses/instance."""
+from sqlalchemy import BigInteger, Column, MetaData, String, Table
+
+from migrations import create_tables
+
+meta = MetaData()
+
+table_versions = Table(
+    "table_versions", meta,
+    Column("name", String(64), primary_key=True),
+    Column("version", BigInteger, nullable=False),
+)
+
+# Tabel yang dipakai ETag saat migrasi ini ditulis (response_cache.TABLES)
+TABLES = ("documents", "favorites", "users", "categories")
+
+def upgrade(conn):
+    create_tables(conn, table_versions)
+    existing = {row.name for row in conn.execute(table_versions.select())}
+    missing = [name for name in TABLES if name not in existing]
+    if missing:
+        conn.execute(table_versions.insert(), [{"name": name, "version": 0} for name in missing])
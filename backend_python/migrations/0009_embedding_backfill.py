@@ -0,0 +1,6 @@
+"""Job backfill embedding: pencarian semantik tidak lagi menghitung embedding saat request."""
+from migrations import queue_job
+
+def upgrade(conn):
+    # Dijalankan job worker (services/vector_index.backfill) setelah aplikasi start
+    queue_job(conn, 'backfill_embeddings', {}, 'backfill_embeddings:0009')
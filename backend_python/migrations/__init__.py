@@ -0,0 +1,116 @@
+"""Migrasi skema berversi.
+
+Setiap migrasi adalah modul NNNN_nama.py di folder ini dengan fungsi upgrade(conn).
+Versi yang sudah dijalankan dicatat di tabel schema_migrations, jadi upgrade()
+hanya menjalankan migrasi yang belum pernah diterapkan, berurutan.
+Migrasi ditulis idempoten (cek tabel/kolom/index dulu) karena database lama
+mungkin sudah dibuat lewat schema.sql atau create_all.
+"""
+import importlib
+import logging
+import os
+import re
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, JSON, MetaData, String, Table, TIMESTAMP, inspect, select
+from sqlalchemy.schema import CreateColumn
+from sqlalchemy.sql import func
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+_NAME = re.compile(r"^(\d{4})_\w+\.py$")
+
+_meta = MetaData()
+schema_migrations = Table(
+    "schema_migrations", _meta,
+    Column("version", String(64), primary_key=True),
+    Column("applied_at", TIMESTAMP, server_default=func.now()),
+)
+# Kolom jobs yang diisi queue_job (tabelnya dibuat 0002); tidak memakai models.Job
+_jobs = Table(
+    "jobs", _meta,
+    Column("id", String(36), primary_key=True),
+    Column("kind", String(50)),
+    Column("payload", JSON),
+    Column("idempotency_key", String(255)),
+    Column("status", String(20)),
+    Column("attempts", Integer),
+    Column("max_attempts", Integer),
+    Column("run_at", TIMESTAMP),
+)
+
+def available():
+    """Daftar (version, module_name) terurut."""
+    found = []
+    for filename in os.listdir(MIGRATIONS_DIR):
+        match = _NAME.match(filename)
+        if match:
+            found.append((match.group(1), filename[:-3]))
+    return sorted(found)
+
+def applied_versions(conn):
+    schema_migrations.create(conn, checkfirst=True)
+    return {row.version for row in conn.execute(select(schema_migrations.c.version))}
+
+def pending(engine):
+    with engine.begin() as conn:
+        done = applied_versions(conn)
+    return [(version, name) for version, name in available() if version not in done]
+
+def upgrade(engine, target=None):
+    """Jalankan migrasi yang belum diterapkan (sampai target jika diisi). Return versi yang dijalankan."""
+    ran = []
+    for version, name in pending(engine):
+        if target and version > target:
+            break
+        module = importlib.import_module(f"{__name__}.{name}")
+        # Satu transaksi per migrasi (catatan: DDL MySQL tetap auto-commit per statement)
+        with engine.begin() as conn:
+            module.upgrade(conn)
+            conn.execute(schema_migrations.insert().values(version=version))
+        logger.info(f"Applied migration {name}")
+        ran.append(version)
+    return ran
+
+# Helper untuk modul migrasi
+
+def has_table(conn, table):
+    return inspect(conn).has_table(table)
+
+def has_column(conn, table, column):
+    return any(c["name"] == column for c in inspect(conn).get_columns(table))
+
+def has_index(conn, table, index):
+    return any(i["name"] == index for i in inspect(conn).get_indexes(table))
+
+def add_column(conn, table, column):
+    if not has_column(conn, table, column.name):
+        ddl = CreateColumn(column).compile(dialect=conn.dialect)
+        conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {ddl}")
+
+def model_index(model, name):
+    """Index yang didefinisikan di models.py (sumber kebenaran untuk nama & kolom)."""
+    return next(i for i in model.__table__.indexes if i.name == name)
+
+def create_index(conn, index):
+    if not has_index(conn, index.table.name, index.name):
+        index.create(conn)
+
+def create_tables(conn, *tables):
+    for table in tables:
+        table.create(conn, checkfirst=True)
+
+def queue_job(conn, kind, payload, idempotency_key):
+    """Antrikan job dari dalam migrasi (dijalankan worker job_queue setelah aplikasi start)."""
+    conn.execute(_jobs.insert().values(
+        id=str(uuid.uuid4()),
+        kind=kind,
+        payload=payload,
+        idempotency_key=idempotency_key,
+        status='queued',
+        attempts=0,
+        max_attempts=5,
+        run_at=datetime.utcnow(),
+    ))
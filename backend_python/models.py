@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, Text, TIMESTAMP, ForeignKey, JSON, Integer, BigInteger, Enum
+from sqlalchemy import Column, String, Boolean, Text, TIMESTAMP, ForeignKey, JSON, Integer, BigInteger, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
@@ -31,14 +31,21 @@ class Category(Base):
 
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (
+        # Listing: WHERE deleted_at IS NULL [AND status IN (...)] ORDER BY created_at DESC, id DESC
+        Index("ix_documents_deleted_created", "deleted_at", "created_at", "id"),
+        Index("ix_documents_deleted_status_created", "deleted_at", "status", "created_at", "id"),
+    )
 
     id = Column(String(36), primary_key=True, default=generate_uuid)
     title = Column(String(255), nullable=False)
     file_path = Column(Text, nullable=False)
     file_type = Column(String(50), nullable=False)
     file_size = Column(BigInteger, nullable=False)
+    content_hash = Column(String(64), index=True) # SHA-256 isi file
     uploaded_by = Column(String(36), ForeignKey("users.id"), nullable=False)
     status = Column(Enum('pending', 'approved', 'rejected'), default='pending', nullable=False)
+    storage_status = Column(Enum('uploading', 'stored', 'failed'), default='stored', nullable=False) # Status upload ke Drive
     approved_by = Column(String(36), ForeignKey("users.id"))
     rejected_by = Column(String(36), ForeignKey("users.id"))
     rejection_note = Column(Text)
@@ -55,6 +62,11 @@ class Document(Base):
 
 class DocumentHistory(Base):
     __tablename__ = "document_history"
+    __table_args__ = (
+        Index("ix_document_history_document_created", "document_id", "created_at"),
+        Index("ix_document_history_created", "created_at", "id"),
+        Index("ix_document_history_actor_created", "changed_by", "created_at"),
+    )
 
     id = Column(String(36), primary_key=True, default=generate_uuid)
     document_id = Column(String(36), ForeignKey("documents.id"))
@@ -65,6 +77,10 @@ class DocumentHistory(Base):
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Notifikasi per user, belum dibaca dulu, terbaru dulu
+        Index("ix_notifications_user_read_created", "user_id", "is_read", "created_at"),
+    )
 
     id = Column(String(36), primary_key=True, default=generate_uuid)
     user_id = Column(String(36), ForeignKey("users.id"))
@@ -75,7 +91,67 @@ class Notification(Base):
 
 class Favorite(Base):
     __tablename__ = "favorites"
+    __table_args__ = (
+        # Daftar favorit per user, terbaru dulu (keyset pada created_at, document_id)
+        Index("ix_favorites_user_created", "user_id", "created_at", "document_id"),
+    )
 
     user_id = Column(String(36), ForeignKey("users.id"), primary_key=True)
     document_id = Column(String(36), ForeignKey("documents.id"), primary_key=True)
     created_at = Column(TIMESTAMP, server_default=func.now())
+
+    document = relationship("Document")
+
+class DocumentTag(Base):
+    __tablename__ = "document_tags"
+    __table_args__ = (
+        # Filter/facet per tag: WHERE tag IN (...) -> document_id
+        Index("ix_document_tags_tag_document", "tag", "document_id"),
+    )
+
+    document_id = Column(String(36), ForeignKey("documents.id"), primary_key=True)
+    tag = Column(String(100), primary_key=True) # lowercase, tanpa spasi di ujung
+
+class DocumentCategory(Base):
+    __tablename__ = "document_categories"
+    __table_args__ = (
+        Index("ix_document_categories_category_document", "category_id", "document_id"),
+    )
+
+    document_id = Column(String(36), ForeignKey("documents.id"), primary_key=True)
+    category_id = Column(Integer, ForeignKey("categories.id"), primary_key=True)
+
+class DocumentCounter(Base):
+    __tablename__ = "document_counters"
+
+    # dimension: 'status' (ref_id ''), 'category' (ref_id = categories.id), 'uploader' (ref_id = users.id)
+    dimension = Column(String(20), primary_key=True)
+    ref_id = Column(String(36), primary_key=True)
+    status = Column(Enum('pending', 'approved', 'rejected'), primary_key=True)
+    doc_count = Column(BigInteger, default=0, nullable=False)
+
+class TableVersion(Base):
+    __tablename__ = "table_versions"
+
+    # Dinaikkan di transaksi tulis; ETag conditional GET dihitung dari sini (sama di semua proses)
+    name = Column(String(64), primary_key=True)
+    version = Column(BigInteger, default=0, nullable=False)
+
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+    )
+
+    id = Column(String(36), primary_key=True, default=generate_uuid)
+    kind = Column(String(50), nullable=False)
+    payload = Column(JSON)
+    idempotency_key = Column(String(255), unique=True)
+    status = Column(Enum('queued', 'running', 'done', 'failed'), default='queued', nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=5, nullable=False)
+    run_at = Column(TIMESTAMP, nullable=False)
+    locked_at = Column(TIMESTAMP)
+    last_error = Column(Text)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,73 @@
+import base64
+import json
+from datetime import datetime
+from fastapi import HTTPException
+from sqlalchemy import or_, and_, type_coerce, String
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+def clamp_limit(limit):
+    if not limit:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+def encode_cursor(created_at, row_id):
+    # Cursor opaque: base64 dari [created_at, id] baris terakhir di halaman
+    raw = json.dumps([created_at.isoformat() if created_at else None, row_id])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return (datetime.fromisoformat(created_at) if created_at else None), str(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor tidak valid")
+
+def apply_keyset(query, created_col, id_col, cursor):
+    """Urutkan terbaru dulu berdasarkan (created_at, id) dan lanjutkan setelah cursor."""
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        if created_at is None:
+            query = query.filter(created_col == None, id_col < row_id)
+        else:
+            # Dibandingkan sebagai teks 'YYYY-MM-DD HH:MM:SS' supaya cocok dengan
+            # nilai CURRENT_TIMESTAMP di MySQL maupun SQLite (tanpa mikrodetik)
+            created_text = type_coerce(created_col, String)
+            created_at = created_at.strftime(TIMESTAMP_FORMAT)
+            query = query.filter(or_(
+                created_text < created_at,
+                and_(created_text == created_at, id_col < row_id),
+                created_col == None
+            ))
+    return query.order_by(created_col.desc(), id_col.desc())
+
+def created_between(query, created_col, since=None, until=None):
+    """Filter rentang waktu [since, until) dengan perbandingan teks yang sama seperti apply_keyset."""
+    created_text = type_coerce(created_col, String)
+    if since:
+        query = query.filter(created_text >= since.strftime(TIMESTAMP_FORMAT))
+    if until:
+        query = query.filter(created_text < until.strftime(TIMESTAMP_FORMAT))
+    return query
+
+def page_query(query, created_col, id_col, cursor, limit):
+    """Terapkan keyset + LIMIT (limit + 1, untuk tahu masih ada halaman berikutnya) pada Query atau Select."""
+    return apply_keyset(query, created_col, id_col, cursor).limit(clamp_limit(limit) + 1)
+
+def split_page(rows, created_col, id_col, limit):
+    """Potong hasil page_query menjadi (rows, next_cursor)."""
+    limit = clamp_limit(limit)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, created_col.key), getattr(last, id_col.key))
+    return rows, next_cursor
+
+def paginate(query, created_col, id_col, cursor, limit):
+    """Ambil satu halaman dari Query sinkron."""
+    rows = page_query(query, created_col, id_col, cursor, limit).all()
+    return split_page(rows, created_col, id_col, limit)
@@ -0,0 +1,89 @@
+import hashlib
+import os
+
+from fastapi import Response
+from sqlalchemy import select, update
+
+import models
+from cache import TTLCache
+
+# Body JSON yang sudah diserialisasi, key = ETag (sudah mencakup versi tabel, partisi dan URL)
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "512"))
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "30"))
+body_cache = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+
+# Tabel yang versinya dipakai ETag (baris awal dibuat migrasi 0008)
+TABLES = ("documents", "favorites", "users", "categories")
+
+CACHE_CONTROL = "private, no-cache"
+
+def bump(db, *tables):
+    """Naikkan versi tabel di tabel table_versions.
+
+    Dipanggil write path sebelum commit (session sync, atau lewat db.run_sync) supaya versi
+    berubah di transaksi yang sama dengan datanya dan terlihat oleh semua proses.
+    """
+    version = models.TableVersion
+    updated = db.execute(
+        update(version).where(version.name.in_(tables)).values(version=version.version + 1)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if updated < len(tables):
+        existing = set(db.execute(select(version.name).where(version.name.in_(tables))).scalars())
+        db.add_all(version(name=table, version=1) for table in tables if table not in existing)
+
+async def versions(db, tables):
+    """Versi tabel dalam satu query (AsyncSession atau SyncSessionAdapter)."""
+    version = models.TableVersion
+    rows = (await db.execute(select(version.name, version.version).where(version.name.in_(tables)))).all()
+    found = dict(rows)
+    return tuple(found.get(table, 0) for table in tables)
+
+def make_etag(request, table_versions, partition):
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    raw = f"{table_versions}|{partition}|{request.url.path}?{query}"
+    return '"' + hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest() + '"'
+
+def _etag_matches(request, etag):
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in [tag.strip() for tag in header.split(",")]
+
+def _json_response(body, etag):
+    return Response(content=body, media_type="application/json",
+                    headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+class CachedEndpoint:
+    """Conditional GET untuk satu request; dibuat lewat check().
+
+        cached = await response_cache.check(db, request, ("categories",), partition=user.role)
+        if cached.response is not None:
+            return cached.response      # 304, atau body dari cache
+        ...
+        return cached.store(cats, schemas.CategoryList)
+    """
+
+    def __init__(self, request, etag, table_versions=None):
+        self.etag = etag
+        self.versions = table_versions or {}  # nama tabel -> versi yang dipakai ETag
+        self.response = None
+        if _etag_matches(request, self.etag):
+            self.response = Response(status_code=304, headers={"ETag": self.etag, "Cache-Control": CACHE_CONTROL})
+            return
+        body = body_cache.get(self.etag)
+        if body is not None:
+            self.response = _json_response(body, self.etag)
+
+    def store(self, payload, model):
+        # Serialisasi lewat response model yang sama dengan route (pydantic-core, tanpa jsonable_encoder)
+        body = model.model_validate(payload, from_attributes=True).model_dump_json().encode("utf-8")
+        body_cache.set(self.etag, body)
+        return _json_response(body, self.etag)
+
+async def check(db, request, tables, partition):
+    found = await versions(db, tables)
+    return CachedEndpoint(request, make_etag(request, found, partition), dict(zip(tables, found)))
+
+def stats():
+    return body_cache.stats()
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, EmailStr
 import database, models, auth_utils
@@ -31,14 +32,15 @@ class RegisterRequest(BaseModel):
 ADMIN_PASSKEY = "SECRET_PGN_ADMIN_2025" # In prod, use env var
 
 @router.post("/login")
-def login(req: LoginRequest, db: Session = Depends(database.get_db)):
+async def login(req: LoginRequest, db: Session = Depends(database.get_async_db)):
     # Allow login by email or username (though we store mainly email)
-    user = db.query(models.User).filter(models.User.email == req.email).first()
+    user = (await db.execute(select(models.User).where(models.User.email == req.email))).scalars().first()
     
     if not user:
         raise HTTPException(status_code=401, detail="Email atau password salah")
     
-    if not auth_utils.verify_password(req.password, user.password):
+    # bcrypt berjalan di pool khusus (auth_utils.password_hasher), bukan di event loop
+    if not await auth_utils.password_hasher.verify(req.password, user.password):
         raise HTTPException(status_code=401, detail="Email atau password salah")
     
     if not user.is_active:
@@ -46,7 +48,7 @@ def login(req: LoginRequest, db: Session = Depends(database.get_db)):
 
     access_token = auth_utils.create_access_token(data={"sub": str(user.id), "role": user.role})
     
-    return {
+    response = {
         "access_token": access_token,
         "token_type": "bearer",
         "user": {
@@ -59,10 +61,17 @@ def login(req: LoginRequest, db: Session = Depends(database.get_db)):
         }
     }
 
+    # Work factor berubah -> simpan ulang hash dengan cost yang baru
+    if auth_utils.needs_rehash(user.password):
+        user.password = await auth_utils.password_hasher.hash(req.password)
+        await db.commit()
+    
+    return response
+
 @router.post("/register")
-def register(req: RegisterRequest, db: Session = Depends(database.get_db)):
+async def register(req: RegisterRequest, db: Session = Depends(database.get_async_db)):
     # 1. Check existing email
-    existing = db.query(models.User).filter(models.User.email == req.email).first()
+    existing = (await db.execute(select(models.User).where(models.User.email == req.email))).scalars().first()
     if existing:
         raise HTTPException(status_code=400, detail="Email sudah terdaftar")
     
@@ -88,9 +97,10 @@ def register(req: RegisterRequest, db: Session = Depends(database.get_db)):
         raise HTTPException(status_code=400, detail="Role tidak valid")
 
     # 3. Create User
-    hashed_pw = auth_utils.get_password_hash(req.password)
+    hashed_pw = await auth_utils.password_hasher.hash(req.password)
     
     new_user = models.User(
+        id=models.generate_uuid(),
         name=final_name,
         email=req.email,
         password=hashed_pw,
@@ -102,7 +112,12 @@ def register(req: RegisterRequest, db: Session = Depends(database.get_db)):
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
     
     return {"message": "Registrasi berhasil. Silakan login.", "user_id": new_user.id}
+
+@router.get("/hasher/stats")
+def hasher_stats(
+    user: models.User = Depends(auth_utils.require_role(['admin', 'superuser']))
+):
+    return auth_utils.password_hasher.stats()
@@ -1,33 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-import database, models, auth_utils
+import database, models, auth_utils, response_cache, schemas
 
 router = APIRouter(prefix="/categories", tags=["categories"])
 
 class CategoryCreate(BaseModel):
     name: str
 
-@router.get("/")
-def list_categories(
-    db: Session = Depends(database.get_db),
+@router.get("/", response_model=schemas.CategoryList)
+async def list_categories(
+    request: Request,
+    db: Session = Depends(database.get_async_db),
     user: models.User = Depends(auth_utils.get_current_user)
 ):
-    cats = db.query(models.Category).all()
-    return cats
+    # Kategori sama untuk semua user; 304 / body cache dengan satu query versi bila tabel belum berubah
+    cached = await response_cache.check(db, request, ("categories",), partition=user.role)
+    if cached.response is not None:
+        return cached.response
+    cats = (await db.execute(select(models.Category))).scalars().all()
+    return cached.store(cats, schemas.CategoryList)
 
-@router.post("/")
-def create_category(
+@router.post("/", response_model=schemas.CategoryOut)
+async def create_category(
     cat: CategoryCreate,
-    db: Session = Depends(database.get_db),
+    db: Session = Depends(database.get_async_db),
     user: models.User = Depends(auth_utils.require_role(['admin', 'manager', 'supervisor', 'superuser']))
 ):
-    existing = db.query(models.Category).filter(models.Category.name == cat.name).first()
+    existing = (await db.execute(select(models.Category).where(models.Category.name == cat.name))).scalars().first()
     if existing:
         raise HTTPException(status_code=400, detail="Category exists")
     
     new_cat = models.Category(name=cat.name, created_by=user.id)
     db.add(new_cat)
-    db.commit()
-    db.refresh(new_cat)
+    await db.run_sync(response_cache.bump, "categories")
+    await db.commit()
+    await db.refresh(new_cat)
     return new_cat
@@ -1,18 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Body
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Body, Request
+from fastapi.responses import StreamingResponse, FileResponse, RedirectResponse, Response
+from sqlalchemy import select, insert, update
+from sqlalchemy.orm import Session, load_only, joinedload, undefer
 from sqlalchemy.sql import func
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
-import shutil
+from urllib.parse import quote
+import csv
+import io
+import itertools
+import logging
+import mimetypes
 import os
-import database, models, auth_utils
+import database, models, auth_utils, pagination, response_cache, schemas, json_response
 from pydantic import BaseModel
-# Import Drive Service
-try:
-    from services import drive_service
-except ImportError:
-    drive_service = None
+from services import search_service, vector_index, extraction_service, storage_service, storage_backends, tagging_service, stats_service, notification_service
 
 router = APIRouter(prefix="/documents", tags=["documents"])
+logger = logging.getLogger(__name__)
 
 # Handle Read-Only Filesystem on Vercel
 try:
@@ -27,17 +32,184 @@ except OSError:
 ENABLE_GDRIVE = os.getenv("ENABLE_GDRIVE", "False").lower() == "true"
 GDRIVE_FOLDER_ID = os.getenv("GDRIVE_FOLDER_ID", None)
 
+# Kolom yang dibutuhkan untuk listing; content (LONGTEXT) dan embedding tidak ikut dimuat
+LIST_COLUMNS = (
+    models.Document.id,
+    models.Document.title,
+    models.Document.file_path,
+    models.Document.status,
+    models.Document.storage_status,
+    models.Document.category,
+    models.Document.tags,
+    models.Document.uploaded_by,
+    models.Document.rejection_note,
+    models.Document.content_hash,
+    models.Document.created_at,
+)
+UPLOADER_COLUMNS = (models.User.name, models.User.instansi, models.User.email)
+
+SEARCH_MODES = ('keyword', 'semantic', 'hybrid')
+# Jumlah kandidat dari tiap ranker sebelum digabung pada mode hybrid
+HYBRID_CANDIDATES = 200
+
+# Perubahan status yang diizinkan (status lama -> status baru)
+STATUS_TRANSITIONS = {
+    'pending': {'approved', 'rejected'},
+    'approved': {'rejected'},
+    'rejected': {'approved'},
+}
+BULK_ACTIONS = {'approve': 'approved', 'reject': 'rejected', 'delete': None}
+MAX_BULK_IDS = 500
+EXPORT_FORMATS = ('ndjson', 'csv')
+EXPORT_FIELDS = ('id', 'title', 'status', 'category', 'tags', 'uploader_name', 'uploader_email',
+                 'uploader_instansi', 'created_at', 'updated_at')
+# Baris yang diambil per round trip dari server-side cursor saat export
+EXPORT_BATCH_SIZE = 1000
+# Kolom yang dibutuhkan untuk download
+DOWNLOAD_COLUMNS = (
+    models.Document.id,
+    models.Document.title,
+    models.Document.file_path,
+    models.Document.file_type,
+    models.Document.content_hash,
+    models.Document.status,
+    models.Document.deleted_at,
+)
+# File dokumen content-addressed (isi tidak pernah berubah) -> boleh di-cache selamanya oleh browser
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+# Kolom yang dibutuhkan untuk mengubah status / menghapus
+REVIEW_COLUMNS = (
+    models.Document.id,
+    models.Document.title,
+    models.Document.status,
+    models.Document.uploaded_by,
+    models.Document.deleted_at,
+    models.Document.approved_by,
+    models.Document.rejected_by,
+    models.Document.rejection_note,
+)
+
 class StatusUpdate(BaseModel):
     status: str
     note: Optional[str] = None
 
+class BulkAction(BaseModel):
+    ids: List[str]
+    action: str
+    note: Optional[str] = None
+
+def visible_statuses(user):
+    if user.role == 'user':
+        # "Pengguna hanya dapat melihat file yang telah mereka unggah atau file yang sudah disetujui"
+        # Since users can't upload, they see Approved files.
+        # Maybe filter by Instansi? For now, all Approved files.
+        return ['approved']
+    # Admin sees all (pending, approved, rejected)
+    return None
+
+# Tabel yang isinya ikut menentukan response list/search (uploader dari users, is_favorite dari favorites)
+DOCUMENT_CACHE_TABLES = ("documents", "favorites", "users")
+
+def cache_partition(user):
+    # Hasil berbeda per role (visible_statuses) dan per user (is_favorite); window link download
+    # ikut supaya 304 tidak mengembalikan download_url yang sudah kedaluwarsa
+    return f"{user.role}:{user.id}:{auth_utils.download_window()}"
+
+def document_list_query():
+    # Uploader ikut di-join dalam satu query (hindari N+1 SELECT ke tabel users)
+    return select(models.Document).options(
+        load_only(*LIST_COLUMNS),
+        joinedload(models.Document.uploader).load_only(*UPLOADER_COLUMNS)
+    ).where(models.Document.deleted_at == None)
+
+def filter_list_query(query, user, q=None, tag=None, category=None):
+    """Filter listing (judul, tag, kategori, role); dipakai list dan export."""
+    # Search Filter
+    if q:
+        search = f"%{q}%"
+        query = query.filter(models.Document.title.like(search))
+
+    # Tag/Category Filter (lewat join table ber-index)
+    query = tagging_service.filter_documents(query, tags=tag, categories=category)
+    
+    # Role Filter
+    statuses = visible_statuses(user)
+    if statuses:
+        query = query.filter(models.Document.status.in_(statuses))
+    return query
+
+def favorite_ids(db, user_id, doc_ids):
+    """Id dokumen (dari doc_ids) yang difavoritkan user: satu query IN per halaman."""
+    if not doc_ids:
+        return set()
+    return set(db.execute(
+        select(models.Favorite.document_id)
+        .where(models.Favorite.user_id == user_id, models.Favorite.document_id.in_(list(doc_ids)))
+    ).scalars())
+
+def transition_error(old_status, new_status):
+    if new_status not in STATUS_TRANSITIONS:
+        return "Status tidak valid"
+    if new_status not in STATUS_TRANSITIONS.get(old_status, set()):
+        return f"Status tidak dapat diubah dari {old_status} ke {new_status}"
+    return None
+
+def apply_status(doc, status, note, user_id):
+    """Set status + kolom approve/reject; return catatan untuk riwayat."""
+    doc.status = status
+    if status == 'approved':
+        doc.approved_by = user_id
+        doc.rejected_by = None
+        doc.rejection_note = None
+        return "Disetujui oleh admin"
+    doc.rejected_by = user_id
+    doc.approved_by = None
+    doc.rejection_note = note
+    return f"Ditolak. Alasan: {note}"
+
+def serialize_document(d):
+    # Enrich with uploader name
+    uploader_data = {
+        "name": d.uploader.name if d.uploader else "Unknown",
+        "instansi": d.uploader.instansi if d.uploader else "-",
+        "email": d.uploader.email if d.uploader else "-"
+    }
+    
+    # Link download bertanda tangan (berlaku singkat, hanya untuk dokumen ini); v=hash membuat URL berubah bila isi berubah
+    expires, sig = auth_utils.sign_download(d.id)
+    download_url = f"/documents/{d.id}/download?"
+    if d.content_hash:
+        download_url += f"v={d.content_hash[:16]}&"
+    download_url += f"expires={expires}&sig={sig}"
+
+    # Determine file_url based on path type; path file staging (masih uploading) tidak pernah dibuka ke luar
+    file_url = d.file_path
+    if d.storage_status == 'uploading':
+        file_url = download_url
+    elif not file_url.startswith('http'):
+         file_url = f"/uploads/{os.path.basename(d.file_path)}" if storage_service.PUBLIC_UPLOADS else download_url
+         
+    return {
+        "id": d.id,
+        "title": d.title,
+        "file_url": file_url,
+        "download_url": download_url,
+        "status": d.status,
+        "storage_status": d.storage_status,
+        "category": d.category,
+        "tags": d.tags,
+        "created_at": d.created_at,
+        "uploader": uploader_data,
+        "rejection_note": d.rejection_note
+    }
+
 @router.post("/")
 async def upload_document(
     title: str = Form(...),
     file: UploadFile = File(...),
     tags: str = Form(None), # comma separated
     category: str = Form(None), # comma separated
-    db: Session = Depends(database.get_db),
+    db: Session = Depends(database.get_async_db),
     user: models.User = Depends(auth_utils.get_current_user)
 ):
     # Check permissions
@@ -45,41 +217,54 @@ async def upload_document(
         raise HTTPException(status_code=403, detail="Anda tidak memiliki izin untuk mengunggah file.")
 
     file_path = ""
+    storage_status = 'stored'
     
-    if ENABLE_GDRIVE and drive_service:
-        # Read file content
-        content = await file.read()
-        drive_file = drive_service.upload_file_to_drive(
-            content, 
-            file.filename, 
-            file.content_type, 
-            folder_id=GDRIVE_FOLDER_ID
-        )
-        
-        if not drive_file:
-            raise HTTPException(status_code=500, detail="Gagal mengupload ke Google Drive")
-            
-        # Use webViewLink as the path
-        file_path = drive_file.get('webViewLink')
+    # Modul Drive (googleapiclient) hanya di-import bila ENABLE_GDRIVE aktif
+    if ENABLE_GDRIVE and storage_backends.drive_available():
+        # Stream ke file staging sambil di-hash; isi yang sama tidak diupload ulang ke Drive
+        staged = await storage_service.stage_upload(file, directory=UPLOAD_DIR)
+        existing = (await db.execute(select(models.Document.file_path).where(
+            models.Document.content_hash == staged.sha256,
+            models.Document.file_path.like('http%')
+        ).limit(1))).first()
+        from services import drive_upload_service
+        if existing:
+            staged.discard()
+            file_path = existing.file_path
+        elif drive_upload_service.UPLOAD_INLINE:
+            # Serverless: upload selesai sebelum response; ekstraksi nanti membaca dari Drive
+            try:
+                drive_file = await run_in_threadpool(
+                    drive_upload_service.upload_file, staged.temp_path, file.filename, file.content_type, GDRIVE_FOLDER_ID
+                )
+            except Exception as e:
+                logger.error(f"Drive upload failed: {e}")
+                raise HTTPException(status_code=500, detail="Gagal mengupload ke Google Drive")
+            finally:
+                staged.discard()
+            file_path = drive_file.get('webViewLink')
+        else:
+            # Upload ke Drive berjalan di background; sampai selesai path menunjuk file staging
+            file_path = staged.temp_path
+            storage_status = 'uploading'
         
     else:
-        # Local Save (Fallback)
-        file_path = os.path.join(UPLOAD_DIR, f"{user.id}_{file.filename}")
-        with open(file_path, "wb") as buffer:
-            # If using async read above, we need to seek(0) or re-read? 
-            # If ENABLE_GDRIVE is False, we haven't read yet.
-            # But 'file' is UploadFile.
-            shutil.copyfileobj(file.file, buffer)
+        # Local Save (Fallback): content-addressed <sha256><ext>, file identik disimpan sekali
+        staged = await storage_service.stage_upload(file, directory=UPLOAD_DIR)
+        file_path = storage_service.commit_local(staged, UPLOAD_DIR)
     
     # Parse tags/cats
-    tag_list = tags.split(',') if tags else []
-    cat_list = category.split(',') if category else []
+    tag_list = tagging_service.parse_list(tags)
+    cat_list = tagging_service.parse_list(category)
 
     new_doc = models.Document(
+        id=models.generate_uuid(),
         title=title,
         file_path=file_path,
         file_type=file.content_type,
-        file_size=0, # Should calculate
+        file_size=staged.size,
+        content_hash=staged.sha256,
+        storage_status=storage_status,
         uploaded_by=user.id,
         status='pending',
         tags=tag_list,
@@ -87,8 +272,10 @@ async def upload_document(
     )
     
     db.add(new_doc)
-    db.commit()
-    db.refresh(new_doc)
+    # Tag & kategori juga ditulis ke join table (dipakai filter dan facet)
+    cat_ids = await db.run_sync(tagging_service.set_document_terms, new_doc.id, tag_list, cat_list, user.id)
+    # Counter dashboard di-update dalam transaksi yang sama
+    await db.run_sync(stats_service.adjust, new_doc.id, user.id, 'pending', 1, cat_ids)
     
     # Create history entry
     history = models.DocumentHistory(
@@ -98,89 +285,233 @@ async def upload_document(
         notes="File diunggah oleh admin/staff"
     )
     db.add(history)
-    db.commit()
+    # Notifikasi ke approver dibuat oleh job worker (fan-out per batch)
+    await db.run_sync(notification_service.enqueue, 'document_uploaded',
+                      [{"id": new_doc.id, "title": title, "uploaded_by": user.id}], user.id)
+    
+    # Upload Drive & ekstraksi isi (termasuk embedding) dijalankan oleh job worker;
+    # job ikut tersimpan di transaksi yang sama sehingga tidak hilang bila proses mati
+    if storage_status == 'uploading':
+        await db.run_sync(drive_upload_service.enqueue, new_doc.id, file_path, file.filename, file.content_type, GDRIVE_FOLDER_ID)
+    else:
+        await db.run_sync(extraction_service.enqueue, new_doc.id, file_path, file.content_type, file.filename)
+    # Upload bisa membuat kategori baru
+    await db.run_sync(response_cache.bump, "documents", "categories")
+    await db.commit()
+    
+    await run_in_threadpool(search_service.search_index.upsert, new_doc)
     
     return {"message": "Upload berhasil", "document_id": new_doc.id}
 
-@router.get("/")
-def list_documents(
+@router.get("/", response_model=schemas.DocumentPage)
+async def list_documents(
+    request: Request,
     q: Optional[str] = None,
-    db: Session = Depends(database.get_db),
+    tag: Optional[str] = None, # comma separated, salah satu cocok
+    category: Optional[str] = None, # comma separated nama kategori
+    limit: int = pagination.DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    db: Session = Depends(database.get_async_db),
     user: models.User = Depends(auth_utils.get_current_user)
 ):
-    query = db.query(models.Document).filter(models.Document.deleted_at == None)
-    
-    # Search Filter
-    if q:
-        search = f"%{q}%"
-        query = query.filter(models.Document.title.like(search))
-    
-    # Role Filter
-    if user.role == 'user':
-        # "Pengguna hanya dapat melihat file yang telah mereka unggah atau file yang sudah disetujui"
-        # Since users can't upload, they see Approved files.
-        # Maybe filter by Instansi? For now, all Approved files.
-        query = query.filter(models.Document.status == 'approved')
-    else:
-        # Admin sees all (pending, approved, rejected)
-        pass
+    cached = await response_cache.check(db, request, DOCUMENT_CACHE_TABLES, cache_partition(user))
+    if cached.response is not None:
+        return cached.response
+
+    query = filter_list_query(document_list_query(), user, q, tag, category)
         
-    docs = query.all()
+    # Keyset pagination pada (created_at, id)
+    query = pagination.page_query(query, models.Document.created_at, models.Document.id, cursor, limit)
+    rows = (await db.execute(query)).scalars().unique().all()
+    docs, next_cursor = pagination.split_page(rows, models.Document.created_at, models.Document.id, limit)
+    favorites = await db.run_sync(favorite_ids, user.id, [d.id for d in docs])
     
-    # Enrich with uploader name
-    results = []
-    for d in docs:
-        uploader_data = {
-            "name": d.uploader.name if d.uploader else "Unknown",
-            "instansi": d.uploader.instansi if d.uploader else "-",
-            "email": d.uploader.email if d.uploader else "-"
-        }
-        
-        # Determine file_url based on path type
-        file_url = d.file_path
-        if not file_url.startswith('http'):
-             file_url = f"/uploads/{os.path.basename(d.file_path)}"
-             
-        results.append({
-            "id": d.id,
-            "title": d.title,
-            "file_url": file_url,
-            "status": d.status,
-            "category": d.category,
-            "tags": d.tags,
-            "created_at": d.created_at,
-            "uploader": uploader_data,
-            "rejection_note": d.rejection_note
-        })
+    results = [serialize_document(d) for d in docs]
+    for item in results:
+        item["is_favorite"] = item["id"] in favorites
         
-    return {"results": results}
+    return cached.store({"results": results, "next_cursor": next_cursor}, schemas.DocumentPage)
+
+@router.get("/facets")
+async def document_facets(
+    db: Session = Depends(database.get_async_db),
+    user: models.User = Depends(auth_utils.get_current_user)
+):
+    # Jumlah dokumen per kategori dan per tag, sesuai dokumen yang boleh dilihat user
+    return await db.run_sync(tagging_service.facets, visible_statuses(user))
+
+@router.get("/stats")
+async def document_stats(
+    db: Session = Depends(database.get_async_db),
+    user: models.User = Depends(auth_utils.get_current_user)
+):
+    # Total per status, per kategori dan per uploader dari tabel counter
+    return await db.run_sync(stats_service.get_stats, visible_statuses(user))
+
+def export_query():
+    # Kolom katalog + uploader lewat join (tanpa objek ORM per baris)
+    return select(
+        models.Document.id,
+        models.Document.title,
+        models.Document.status,
+        models.Document.category,
+        models.Document.tags,
+        models.User.name.label("uploader_name"),
+        models.User.email.label("uploader_email"),
+        models.User.instansi.label("uploader_instansi"),
+        models.Document.created_at,
+        models.Document.updated_at,
+    ).outerjoin(models.User, models.User.id == models.Document.uploaded_by) \
+     .where(models.Document.deleted_at == None)
+
+def _export_rows(query):
+    # Session sendiri: session request sudah ditutup saat response di-stream
+    db = database.SessionLocal()
+    try:
+        result = db.execute(query.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE))
+        for row in result:
+            yield row
+    finally:
+        db.close()
+
+def _export_ndjson(query):
+    for row in _export_rows(query):
+        yield json_response.dumps(row._asdict()) + b"\n"
+
+def _csv_value(value):
+    if isinstance(value, list):
+        return ", ".join(str(v) for v in value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+def _export_csv(query):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for row in _export_rows(query):
+        writer.writerow([_csv_value(v) for v in row])
+        # Kirim per ~64KB, bukan per baris
+        if buffer.tell() >= 65536:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+@router.get("/export")
+def export_documents(
+    format: str = 'ndjson',
+    q: Optional[str] = None,
+    tag: Optional[str] = None,
+    category: Optional[str] = None,
+    user: models.User = Depends(auth_utils.get_current_user_for_stream)
+):
+    # Seluruh katalog, dibaca bertahap dari server-side cursor (memori tetap kecil berapa pun jumlahnya)
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Format export tidak valid")
+    query = filter_list_query(export_query(), user, q, tag, category) \
+        .order_by(models.Document.created_at.desc(), models.Document.id.desc())
+    if format == 'csv':
+        body, media_type = _export_csv(query), "text/csv; charset=utf-8"
+    else:
+        body, media_type = _export_ndjson(query), "application/x-ndjson"
+    return StreamingResponse(body, media_type=media_type, headers={
+        "Content-Disposition": f'attachment; filename="documents.{format}"'
+    })
+
+def content_disposition(disposition, filename):
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"{disposition}; filename*=utf-8''{quoted}"
+    return f'{disposition}; filename="{filename}"'
+
+@router.get("/{doc_id}/download")
+async def download_document(
+    doc_id: str,
+    request: Request,
+    download: bool = False, # true = attachment, default inline (preview PDF di browser)
+    expires: Optional[int] = None,
+    sig: Optional[str] = None,
+    token: Optional[str] = Depends(auth_utils.oauth2_scheme_optional),
+    access_token: Optional[str] = None
+):
+    # download_url dari list/search sudah ditandatangani untuk dokumen ini (dibuka lewat anchor biasa);
+    # tanpa tanda tangan tetap bisa memakai header Authorization
+    user = None
+    if not auth_utils.verify_download(doc_id, expires, sig):
+        user = await auth_utils.get_current_user_or_query_token(token, access_token)
+    # Session ditutup sebelum response dikirim: file besar / miss Drive tidak menahan koneksi pool
+    async with database.async_session() as db:
+        doc = (await db.execute(
+            select(models.Document).options(load_only(*DOWNLOAD_COLUMNS)).where(models.Document.id == doc_id)
+        )).scalars().first()
+    statuses = visible_statuses(user) if user else None
+    if not doc or doc.deleted_at is not None or (statuses and doc.status not in statuses):
+        raise HTTPException(status_code=404, detail="Dokumen tidak ditemukan")
+
+    backend = storage_backends.for_path(doc.file_path)
+    if not backend.available():
+        # Drive tidak dikonfigurasi / cache nonaktif di proses ini: buka langsung di Google Drive
+        return RedirectResponse(doc.file_path)
+
+    headers = {"Cache-Control": "private, no-cache"}
+    if doc.content_hash:
+        etag = f'"{doc.content_hash}"'
+        headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+        if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+            return Response(status_code=304, headers=headers)
+
+    # Lokal: file di UPLOAD_DIR; Drive: salinan di cache disk bila sudah lengkap
+    path = backend.local_path(doc.file_path)
+    if path is None and not backend.remote:
+        raise HTTPException(status_code=404, detail="File tidak ditemukan")
+
+    if backend.remote:
+        extension = mimetypes.guess_extension(doc.file_type or "") or ""
+    else:
+        extension = os.path.splitext(path)[1]
+    filename = doc.title + extension
+    disposition = "attachment" if download else "inline"
+
+    if path is None:
+        # Miss cache Drive: download dibagi dengan request lain untuk file yang sama,
+        # byte dikirim selagi diunduh. Chunk pertama diambil dulu supaya error jadi 502.
+        chunks = backend.stream(doc.file_path)
+        try:
+            first = await run_in_threadpool(next, chunks, b"")
+        except Exception as e:
+            logger.warning(f"Drive download failed for {doc.id}: {e}")
+            raise HTTPException(status_code=502, detail="Gagal mengambil file dari Google Drive")
+        headers["Content-Disposition"] = content_disposition(disposition, filename)
+        return StreamingResponse(itertools.chain([first], chunks), media_type=doc.file_type, headers=headers)
+
+    if storage_service.ACCEL_REDIRECT_PREFIX and not backend.remote:
+        # nginx yang mengirim byte file (sendfile, Range) dari location internal
+        headers["X-Accel-Redirect"] = storage_service.accel_redirect_path(path)
+        headers["Content-Disposition"] = content_disposition(disposition, filename)
+        return Response(media_type=doc.file_type, headers=headers)
+    # FileResponse menangani Range/If-Range (206) dan http.response.pathsend bila didukung server
+    return FileResponse(path, media_type=doc.file_type, headers=headers,
+                        filename=filename, content_disposition_type=disposition)
 
 @router.put("/{doc_id}/status")
-def update_status(
+async def update_status(
     doc_id: str,
     payload: StatusUpdate,
-    db: Session = Depends(database.get_db),
+    db: Session = Depends(database.get_async_db),
     user: models.User = Depends(auth_utils.require_role(['admin', 'manager', 'superuser']))
 ):
-    doc = db.query(models.Document).filter(models.Document.id == doc_id).first()
-    if not doc:
+    doc = await db.get(models.Document, doc_id)
+    if not doc or doc.deleted_at is not None:
         raise HTTPException(status_code=404, detail="Dokumen tidak ditemukan")
+
+    error = transition_error(doc.status, payload.status)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
     
     old_status = doc.status
-    doc.status = payload.status
-    
-    history_note = ""
-    
-    if payload.status == 'approved':
-        doc.approved_by = user.id
-        doc.rejected_by = None
-        doc.rejection_note = None
-        history_note = "Disetujui oleh admin"
-    elif payload.status == 'rejected':
-        doc.rejected_by = user.id
-        doc.approved_by = None
-        doc.rejection_note = payload.note
-        history_note = f"Ditolak. Alasan: {payload.note}"
+    history_note = apply_status(doc, payload.status, payload.note, user.id)
+    await db.run_sync(stats_service.change_status, doc.id, doc.uploaded_by, old_status, doc.status)
         
     # Create history entry
     history = models.DocumentHistory(
@@ -190,20 +521,107 @@ def update_status(
         notes=history_note
     )
     db.add(history)
+    await db.run_sync(notification_service.enqueue, f"document_{doc.status}",
+                      [{"id": doc.id, "title": doc.title, "uploaded_by": doc.uploaded_by}], user.id, payload.note)
     
-    db.commit()
+    await db.run_sync(response_cache.bump, "documents")
+    await db.commit()
+    search_service.search_index.set_status(doc.id, doc.status)
+    vector_index.vector_index.set_status(doc.id, doc.status)
     return {"message": f"Status dokumen diubah menjadi {payload.status}"}
 
+def apply_bulk(db, ids, action, note, user_id):
+    """Jalankan satu aksi untuk banyak dokumen: satu SELECT IN, satu INSERT riwayat, satu commit."""
+    new_status = BULK_ACTIONS[action]
+    docs = db.execute(
+        select(models.Document).options(load_only(*REVIEW_COLUMNS)).where(models.Document.id.in_(ids))
+    ).scalars().all()
+    by_id = {d.id: d for d in docs}
+
+    results = []
+    history = []
+    changes = []
+    for doc_id in ids:
+        doc = by_id.get(doc_id)
+        if doc is None or doc.deleted_at is not None:
+            results.append({"id": doc_id, "ok": False, "error": "Dokumen tidak ditemukan"})
+            continue
+        if new_status is None:
+            notes = "File dihapus oleh admin"
+        else:
+            error = transition_error(doc.status, new_status)
+            if error:
+                results.append({"id": doc_id, "ok": False, "error": error})
+                continue
+        changes.append((doc.id, doc.uploaded_by, doc.status, new_status))
+        if new_status is not None:
+            notes = apply_status(doc, new_status, note, user_id)
+        history.append({
+            "id": models.generate_uuid(),
+            "document_id": doc.id,
+            "changed_by": user_id,
+            "action": f"status_change_{new_status}" if new_status else "delete",
+            "notes": notes,
+        })
+        results.append({"id": doc_id, "ok": True, "status": new_status or "deleted"})
+
+    if changes:
+        if new_status is None:
+            db.execute(
+                update(models.Document)
+                .where(models.Document.id.in_([c[0] for c in changes]))
+                .values(deleted_at=func.now(), deleted_by=user_id)
+                .execution_options(synchronize_session=False)
+            )
+        db.execute(insert(models.DocumentHistory), history)
+        stats_service.apply_changes(db, changes)
+        if new_status is not None:
+            notification_service.enqueue(db, f"document_{new_status}", [
+                {"id": by_id[c[0]].id, "title": by_id[c[0]].title, "uploaded_by": c[1]} for c in changes
+            ], user_id, note)
+        response_cache.bump(db, "documents")
+        db.commit()
+    return results, changes
+
+@router.post("/bulk")
+async def bulk_action(
+    payload: BulkAction,
+    db: Session = Depends(database.get_async_db),
+    user: models.User = Depends(auth_utils.require_role(['admin', 'manager', 'superuser']))
+):
+    if payload.action not in BULK_ACTIONS:
+        raise HTTPException(status_code=400, detail="Aksi tidak valid")
+    ids = list(dict.fromkeys(payload.ids))
+    if not ids:
+        raise HTTPException(status_code=400, detail="Daftar dokumen kosong")
+    if len(ids) > MAX_BULK_IDS:
+        raise HTTPException(status_code=400, detail=f"Maksimal {MAX_BULK_IDS} dokumen per permintaan")
+
+    results, changes = await db.run_sync(apply_bulk, ids, payload.action, payload.note, user.id)
+
+    for doc_id, _, _, new_status in changes:
+        if new_status is None:
+            search_service.search_index.remove(doc_id)
+            vector_index.vector_index.remove(doc_id)
+        else:
+            search_service.search_index.set_status(doc_id, new_status)
+            vector_index.vector_index.set_status(doc_id, new_status)
+
+    succeeded = sum(1 for r in results if r["ok"])
+    return {"results": results, "succeeded": succeeded, "failed": len(results) - succeeded}
+
 @router.delete("/{doc_id}")
-def delete_document(
+async def delete_document(
     doc_id: str,
-    db: Session = Depends(database.get_db),
+    db: Session = Depends(database.get_async_db),
     user: models.User = Depends(auth_utils.require_role(['admin', 'manager', 'superuser']))
 ):
-    doc = db.query(models.Document).filter(models.Document.id == doc_id).first()
+    doc = await db.get(models.Document, doc_id)
     if not doc:
         raise HTTPException(status_code=404, detail="Dokumen tidak ditemukan")
     
+    if doc.deleted_at is None:
+        await db.run_sync(stats_service.adjust, doc.id, doc.uploaded_by, doc.status, -1)
     doc.deleted_at = func.now()
     doc.deleted_by = user.id
     
@@ -216,14 +634,80 @@ def delete_document(
     )
     db.add(history)
     
-    db.commit()
+    await db.run_sync(response_cache.bump, "documents")
+    await db.commit()
+    search_service.search_index.remove(doc.id)
+    vector_index.vector_index.remove(doc.id)
     return {"message": "Dokumen berhasil dihapus"}
 
-@router.get("/search")
-def search_documents(
+@router.get("/search", response_model=schemas.SearchPage)
+async def search_documents(
+    request: Request,
     q: str,
-    db: Session = Depends(database.get_db),
+    limit: int = pagination.DEFAULT_PAGE_SIZE,
+    offset: int = 0,
+    mode: str = 'keyword',
+    db: Session = Depends(database.get_async_db),
     user: models.User = Depends(auth_utils.get_current_user)
 ):
-    # Reuse list logic for now
-    return list_documents(q=q, db=db, user=user)
+    # Full-text search: inverted index + ranking BM25 atas judul, tag, kategori dan isi.
+    # mode=semantic memakai cosine similarity embedding, mode=hybrid menggabungkan keduanya.
+    if mode not in SEARCH_MODES:
+        raise HTTPException(status_code=400, detail="Mode pencarian tidak valid")
+    cached = await response_cache.check(db, request, DOCUMENT_CACHE_TABLES, cache_partition(user))
+    if cached.response is not None:
+        return cached.response
+    # Rebuild (bila versi documents berubah) dan ranking jalan di thread supaya event loop tidak ikut tertahan
+    index = search_service.search_index
+    documents_version = cached.versions["documents"]
+    if index.is_stale(documents_version):
+        await run_in_threadpool(index.refresh, documents_version)
+    limit = pagination.clamp_limit(limit)
+    offset = max(offset, 0)
+    statuses = visible_statuses(user)
+
+    if mode == 'keyword':
+        total, hits = await run_in_threadpool(index.search, q, statuses=statuses, limit=limit, offset=offset)
+    else:
+        vectors = vector_index.vector_index
+        if vectors.is_stale():
+            await run_in_threadpool(vectors.refresh)
+        depth = max(offset + limit, HYBRID_CANDIDATES)
+        # Embed query + top-k matriks (numpy) di thread, bukan di event loop
+        ranked = await run_in_threadpool(vectors.search, q, k=depth, statuses=statuses)
+        if mode == 'hybrid':
+            _, keyword_hits = await run_in_threadpool(index.search, q, statuses=statuses, limit=depth)
+            ranked = vector_index.hybrid_rank(keyword_hits, ranked)
+        total, hits = len(ranked), ranked[offset:offset + limit]
+
+    if not hits:
+        return cached.store({"results": [], "total": total}, schemas.SearchPage)
+
+    ids = [doc_id for doc_id, _ in hits]
+    query = document_list_query().options(undefer(models.Document.content)).where(models.Document.id.in_(ids))
+    # Status di index bisa tertinggal dari DB (proses lain / sebelum rebuild): filter role diulang di sini
+    if statuses:
+        query = query.where(models.Document.status.in_(statuses))
+    docs = (await db.execute(query)).scalars().unique().all()
+    by_id = {d.id: d for d in docs}
+    # Hit yang gugur (dihapus / status tidak terlihat) tidak ikut dihitung
+    total -= len(hits) - len(by_id)
+    favorites = await db.run_sync(favorite_ids, user.id, list(by_id))
+
+    results = []
+    for doc_id, score in hits:
+        d = by_id.get(doc_id)
+        if d is None:
+            continue
+        item = serialize_document(d)
+        item["score"] = round(score, 4)
+        item["is_favorite"] = doc_id in favorites
+        item["highlight"] = {
+            "title": search_service.highlight(d.title, q),
+            "tags": search_service.highlight(d.tags, q),
+            "category": search_service.highlight(d.category, q),
+            "content": search_service.highlight(d.content, q, snippet=True),
+        }
+        results.append(item)
+
+    return cached.store({"results": results, "total": total}, schemas.SearchPage)
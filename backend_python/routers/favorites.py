@@ -0,0 +1,77 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
+
+import database, models, auth_utils, pagination, response_cache, schemas
+from routers.documents import LIST_COLUMNS, UPLOADER_COLUMNS, visible_statuses, serialize_document
+
+router = APIRouter(prefix="/favorites", tags=["favorites"])
+
+async def get_visible_document(db, doc_id, user):
+    doc = await db.get(models.Document, doc_id)
+    statuses = visible_statuses(user)
+    if not doc or doc.deleted_at is not None or (statuses and doc.status not in statuses):
+        raise HTTPException(status_code=404, detail="Dokumen tidak ditemukan")
+    return doc
+
+@router.get("/", response_model=schemas.FavoritePage)
+async def list_favorites(
+    limit: int = pagination.DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    db: Session = Depends(database.get_async_db),
+    user: models.User = Depends(auth_utils.get_current_user)
+):
+    # Favorit terbaru dulu; dokumen + uploader dimuat dalam satu query
+    favorite = models.Favorite
+    query = select(favorite).join(models.Document, models.Document.id == favorite.document_id).options(
+        joinedload(favorite.document).load_only(*LIST_COLUMNS)
+        .joinedload(models.Document.uploader).load_only(*UPLOADER_COLUMNS)
+    ).where(favorite.user_id == user.id, models.Document.deleted_at == None)
+    statuses = visible_statuses(user)
+    if statuses:
+        query = query.where(models.Document.status.in_(statuses))
+
+    query = pagination.page_query(query, favorite.created_at, favorite.document_id, cursor, limit)
+    rows = (await db.execute(query)).scalars().unique().all()
+    rows, next_cursor = pagination.split_page(rows, favorite.created_at, favorite.document_id, limit)
+
+    results = []
+    for fav in rows:
+        item = serialize_document(fav.document)
+        item["is_favorite"] = True
+        item["favorited_at"] = fav.created_at
+        results.append(item)
+    return {"results": results, "next_cursor": next_cursor}
+
+@router.post("/{doc_id}")
+async def add_favorite(
+    doc_id: str,
+    db: Session = Depends(database.get_async_db),
+    user: models.User = Depends(auth_utils.get_current_user)
+):
+    await get_visible_document(db, doc_id, user)
+    if await db.get(models.Favorite, (user.id, doc_id)) is None:
+        db.add(models.Favorite(user_id=user.id, document_id=doc_id))
+        await db.run_sync(response_cache.bump, "favorites")
+        try:
+            await db.commit()
+        except IntegrityError:
+            # Sudah ditambahkan oleh request lain (versi sudah dinaikkan olehnya)
+            await db.rollback()
+    return {"message": "Ditambahkan ke favorit", "document_id": doc_id, "is_favorite": True}
+
+@router.delete("/{doc_id}")
+async def remove_favorite(
+    doc_id: str,
+    db: Session = Depends(database.get_async_db),
+    user: models.User = Depends(auth_utils.get_current_user)
+):
+    await db.execute(delete(models.Favorite).where(
+        models.Favorite.user_id == user.id, models.Favorite.document_id == doc_id
+    ))
+    await db.run_sync(response_cache.bump, "favorites")
+    await db.commit()
+    return {"message": "Dihapus dari favorit", "document_id": doc_id, "is_favorite": False}
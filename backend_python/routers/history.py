@@ -0,0 +1,103 @@
+import json
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+import database, models, auth_utils, pagination
+
+router = APIRouter(prefix="/history", tags=["history"])
+
+AUDIT_ROLES = ['admin', 'manager', 'supervisor', 'superuser']
+# Baris yang diambil per round trip dari server-side cursor saat export
+EXPORT_BATCH_SIZE = 1000
+
+def history_query(document_id=None, actor=None, action=None, since=None, until=None):
+    """Riwayat + nama actor & judul dokumen lewat join (tanpa lookup per baris)."""
+    history = models.DocumentHistory
+    query = select(
+        history.id,
+        history.document_id,
+        models.Document.title.label("document_title"),
+        history.action,
+        history.notes,
+        history.changed_by,
+        models.User.name.label("actor_name"),
+        models.User.email.label("actor_email"),
+        history.created_at,
+    ).outerjoin(models.User, models.User.id == history.changed_by) \
+     .outerjoin(models.Document, models.Document.id == history.document_id)
+
+    if document_id:
+        query = query.where(history.document_id == document_id)
+    if actor:
+        query = query.where(history.changed_by == actor)
+    if action:
+        query = query.where(history.action == action)
+    return pagination.created_between(query, history.created_at, since, until)
+
+def serialize_history(row):
+    return {
+        "id": row.id,
+        "document_id": row.document_id,
+        "document_title": row.document_title,
+        "action": row.action,
+        "notes": row.notes,
+        "actor": {
+            "id": row.changed_by,
+            "name": row.actor_name or "Unknown",
+            "email": row.actor_email or "-",
+        },
+        "created_at": row.created_at,
+    }
+
+@router.get("/")
+async def list_history(
+    document_id: Optional[str] = None,
+    actor: Optional[str] = None,
+    action: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = pagination.DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    db: Session = Depends(database.get_async_db),
+    user: models.User = Depends(auth_utils.require_role(AUDIT_ROLES))
+):
+    history = models.DocumentHistory
+    query = history_query(document_id, actor, action, since, until)
+    query = pagination.page_query(query, history.created_at, history.id, cursor, limit)
+    rows = (await db.execute(query)).all()
+    rows, next_cursor = pagination.split_page(rows, history.created_at, history.id, limit)
+    return {"results": [serialize_history(r) for r in rows], "next_cursor": next_cursor}
+
+def _export_lines(query):
+    # Session sendiri: session request sudah ditutup saat response di-stream
+    db = database.SessionLocal()
+    try:
+        result = db.execute(query.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE))
+        for row in result:
+            yield json.dumps(serialize_history(row), default=str) + "\n"
+    finally:
+        db.close()
+
+@router.get("/export")
+def export_history(
+    document_id: Optional[str] = None,
+    actor: Optional[str] = None,
+    action: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    user: models.User = Depends(auth_utils.require_role(AUDIT_ROLES))
+):
+    # NDJSON, satu baris per entri; dibaca bertahap dari server-side cursor (memori tetap kecil)
+    history = models.DocumentHistory
+    query = history_query(document_id, actor, action, since, until) \
+        .order_by(history.created_at.desc(), history.id.desc())
+    return StreamingResponse(
+        _export_lines(query),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="history.ndjson"'}
+    )
@@ -0,0 +1,128 @@
+import asyncio
+import json
+from collections import OrderedDict
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+import database, models, auth_utils, pagination
+from services import notification_service
+
+router = APIRouter(prefix="/notifications", tags=["notifications"])
+
+# Komentar SSE dikirim tiap HEARTBEAT_SECONDS supaya proxy tidak menutup koneksi idle;
+# di heartbeat yang sama DB dicek untuk notifikasi dari proses/instance lain
+HEARTBEAT_SECONDS = 15
+# Id notifikasi yang sudah dikirim per koneksi (dedup broker vs polling)
+SEEN_IDS_LIMIT = 1000
+
+class MarkRead(BaseModel):
+    ids: Optional[List[str]] = None # kosong = tandai semua
+
+def serialize_notification(n):
+    return {
+        "id": n.id,
+        "message": n.message,
+        "type": n.type,
+        "is_read": n.is_read,
+        "created_at": n.created_at,
+    }
+
+@router.get("/")
+async def list_notifications(
+    unread_only: bool = False,
+    limit: int = pagination.DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    db: Session = Depends(database.get_async_db),
+    user: models.User = Depends(auth_utils.get_current_user)
+):
+    notification = models.Notification
+    query = select(notification).where(notification.user_id == user.id)
+    if unread_only:
+        query = query.where(notification.is_read == False)
+    query = pagination.page_query(query, notification.created_at, notification.id, cursor, limit)
+    rows = (await db.execute(query)).scalars().all()
+    rows, next_cursor = pagination.split_page(rows, notification.created_at, notification.id, limit)
+    return {"results": [serialize_notification(n) for n in rows], "next_cursor": next_cursor}
+
+@router.get("/unread-count")
+async def unread_count(
+    db: Session = Depends(database.get_async_db),
+    user: models.User = Depends(auth_utils.get_current_user)
+):
+    return {"unread": await db.run_sync(notification_service.unread_count, user.id)}
+
+@router.post("/read")
+async def mark_read(
+    payload: MarkRead,
+    db: Session = Depends(database.get_async_db),
+    user: models.User = Depends(auth_utils.get_current_user)
+):
+    updated = await db.run_sync(notification_service.mark_read, user.id, payload.ids)
+    return {"updated": updated, "unread": await db.run_sync(notification_service.unread_count, user.id)}
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    user: models.User = Depends(auth_utils.get_current_user_or_query_token)
+):
+    # Server-sent events: jumlah belum dibaca saat terhubung, lalu setiap notifikasi baru.
+    # Notifikasi dari proses ini lewat broker; dari proses lain lewat polling DB tiap heartbeat.
+    # Session (juga per polling) ditutup segera: tidak menahan koneksi pool selama klien terhubung.
+    async with database.async_session() as db:
+        unread = await db.run_sync(notification_service.unread_count, user.id)
+        since, seen_ids = await db.run_sync(notification_service.latest_unread, user.id)
+    user_id = user.id
+    seen = OrderedDict.fromkeys(seen_ids)
+
+    def first_time(notification_id):
+        if notification_id in seen:
+            return False
+        seen[notification_id] = None
+        if len(seen) > SEEN_IDS_LIMIT:
+            seen.popitem(last=False)
+        return True
+
+    async def poll():
+        nonlocal since
+        async with database.async_session() as db:
+            rows = await db.run_sync(notification_service.unread_since, user_id, since)
+        if rows:
+            since = rows[-1].created_at
+            # Cache jumlah belum dibaca proses ini tidak ikut di-invalidate oleh proses lain
+            notification_service.unread_cache.delete(user_id)
+        return [serialize_notification(n) for n in rows if first_time(n.id)]
+
+    async def events():
+        subscription = notification_service.broker.subscribe(user_id)
+        queue = subscription[1]
+        try:
+            yield _sse("unread", {"unread": unread})
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    missed = await poll()
+                    for item in missed:
+                        yield _sse("notification", item)
+                    if not missed:
+                        yield ": ping\n\n"
+                    continue
+                if first_time(item["id"]):
+                    yield _sse("notification", item)
+        finally:
+            notification_service.broker.unsubscribe(user_id, subscription)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no", # nginx: jangan buffer stream
+    })
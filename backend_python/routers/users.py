@@ -1,15 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-import database, models, auth_utils
+from sqlalchemy.orm import Session, load_only
+import database, models, auth_utils, response_cache, schemas
 
 router = APIRouter(prefix="/users", tags=["users"])
 
-@router.get("/")
+# Kolom yang dikirim ke client; hash password tidak pernah dimuat
+USER_COLUMNS = tuple(getattr(models.User, name) for name in schemas.UserOut.model_fields)
+
+@router.get("/", response_model=schemas.UserList)
 def list_users(
     db: Session = Depends(database.get_db),
     user: models.User = Depends(auth_utils.require_role(['admin', 'superuser']))
 ):
-    users = db.query(models.User).all()
+    users = db.query(models.User).options(load_only(*USER_COLUMNS)).all()
     return {"users": users}
 
 @router.delete("/{user_id}")
@@ -23,5 +26,14 @@ def delete_user(
         raise HTTPException(status_code=404, detail="User not found")
     
     db.delete(target)
+    response_cache.bump(db, "users")
+    # Principal di user_cache dihapus setelah commit (listener di auth_utils), hanya di proses ini:
+    # proses lain menerima token user ini sampai USER_CACHE_TTL habis
     db.commit()
     return {"message": "User deleted"}
+
+@router.get("/cache/stats")
+def user_cache_stats(
+    user: models.User = Depends(auth_utils.require_role(['admin', 'superuser']))
+):
+    return auth_utils.user_cache.stats()
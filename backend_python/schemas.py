@@ -0,0 +1,77 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict, RootModel
+
+# Response model: FastAPI memvalidasi lalu menulis JSON langsung lewat pydantic-core
+# (tanpa jsonable_encoder + json.dumps). Field di sini = kontrak API, jangan tambah kolom sensitif.
+
+class ORMModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+class UserOut(ORMModel):
+    id: str
+    name: str
+    email: str
+    role: str
+    position: Optional[str] = None
+    instansi: Optional[str] = None
+    address: Optional[str] = None
+    is_active: Optional[bool] = None
+    created_at: Optional[datetime] = None
+
+class UserList(BaseModel):
+    users: List[UserOut]
+
+class CategoryOut(ORMModel):
+    id: int
+    name: str
+    created_by: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+class CategoryList(RootModel[List[CategoryOut]]):
+    pass
+
+class UploaderOut(BaseModel):
+    name: str
+    instansi: Optional[str] = None
+    email: str
+
+class DocumentOut(BaseModel):
+    id: str
+    title: str
+    file_url: str
+    download_url: str
+    status: str
+    storage_status: Optional[str] = None
+    category: Optional[List[str]] = None
+    tags: Optional[List[str]] = None
+    created_at: Optional[datetime] = None
+    uploader: UploaderOut
+    rejection_note: Optional[str] = None
+    is_favorite: bool = False
+
+class DocumentPage(BaseModel):
+    results: List[DocumentOut]
+    next_cursor: Optional[str] = None
+
+class FavoriteDocumentOut(DocumentOut):
+    favorited_at: Optional[datetime] = None
+
+class FavoritePage(BaseModel):
+    results: List[FavoriteDocumentOut]
+    next_cursor: Optional[str] = None
+
+class SearchHighlight(BaseModel):
+    title: Optional[str] = None
+    tags: Optional[str] = None
+    category: Optional[str] = None
+    content: Optional[str] = None
+
+class SearchResultOut(DocumentOut):
+    score: float
+    highlight: SearchHighlight
+
+class SearchPage(BaseModel):
+    results: List[SearchResultOut]
+    total: int
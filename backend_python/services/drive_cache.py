@@ -0,0 +1,228 @@
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Salinan lokal file Drive (read-through); 0 = cache nonaktif
+DRIVE_CACHE_DIR = os.getenv("DRIVE_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "drive-cache")
+DRIVE_CACHE_MAX_BYTES = int(os.getenv("DRIVE_CACHE_MAX_MB", "1024")) * 1024 * 1024
+# Ukuran chunk download Drive = granularitas data yang bisa langsung dikirim ke reader
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+READ_CHUNK_SIZE = 64 * 1024
+# Reader berhenti bila download tidak menulis byte baru selama sekian detik
+FILL_TIMEOUT = float(os.getenv("DRIVE_CACHE_FILL_TIMEOUT", "120"))
+TEMP_PREFIX = ".fill-"
+
+class _Fill:
+    """Satu download yang sedang berjalan; reader mengikuti file sementaranya selagi ditulis."""
+
+    def __init__(self, temp_path):
+        self.temp_path = temp_path
+        self.written = 0
+        self.done = False
+        self.error = None
+        self.cond = threading.Condition()
+
+class _FillWriter:
+    """File-like untuk backend.download: tulis ke file sementara lalu bangunkan reader."""
+
+    def __init__(self, fill, fileobj):
+        self._fill = fill
+        self._file = fileobj
+
+    def write(self, data):
+        count = self._file.write(data)
+        self._file.flush()
+        with self._fill.cond:
+            self._fill.written += len(data)
+            self._fill.cond.notify_all()
+        return count
+
+class DiskLRUCache:
+    """Cache file di disk dengan batas total byte (LRU), aman dipakai lintas thread.
+
+    - miss yang bersamaan untuk key yang sama digabung menjadi satu download
+    - reader tidak menunggu download selesai: byte dikirim begitu ditulis ke file sementara
+    """
+
+    def __init__(self, directory, max_bytes, fetch):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._fetch = fetch  # fetch(key, fileobj)
+        self._entries = OrderedDict()  # key -> ukuran file
+        self._size = 0
+        self._fills = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def _load(self):
+        # Isi cache dari proses sebelumnya; urutan LRU awal mengikuti mtime
+        files = []
+        for name in os.listdir(self.directory):
+            path = self._path(name)
+            if name.startswith(TEMP_PREFIX):
+                _remove(path)
+            elif os.path.isfile(path):
+                stat = os.stat(path)
+                files.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._size += size
+        with self._lock:
+            self._evict()
+
+    def _evict(self):
+        while self._size > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._size -= size
+            self.evictions += 1
+            # Reader yang sudah membuka file tetap bisa membaca sampai selesai (POSIX)
+            _remove(self._path(key))
+
+    def get_path(self, key):
+        """Path file yang sudah lengkap di cache, atau None."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._path(key)
+        return None
+
+    def _acquire(self, key):
+        """Return (file terbuka, fill); fill None bila file sudah lengkap di cache."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return open(self._path(key), "rb"), None
+            fill = self._fills.get(key)
+            if fill is None:
+                self.misses += 1
+                fd, temp_path = tempfile.mkstemp(prefix=TEMP_PREFIX, dir=self.directory)
+                fill = _Fill(temp_path)
+                self._fills[key] = fill
+                threading.Thread(target=self._run_fill, args=(key, fill, fd), daemon=True).start()
+            else:
+                self.coalesced += 1
+            return open(fill.temp_path, "rb"), fill
+
+    def _run_fill(self, key, fill, fd):
+        error = None
+        try:
+            with os.fdopen(fd, "wb") as out:
+                self._fetch(key, _FillWriter(fill, out))
+        except Exception as e:
+            error = e
+            logger.warning(f"Drive cache fill failed for {key}: {e}")
+
+        with self._lock:
+            del self._fills[key]
+            # File lebih besar dari seluruh cache tidak disimpan (reader yang sedang jalan tetap selesai)
+            if error is None and fill.written <= self.max_bytes:
+                try:
+                    os.replace(fill.temp_path, self._path(key))
+                    self._entries[key] = fill.written
+                    self._size += fill.written
+                    self._evict()
+                except OSError as e:
+                    logger.warning(f"Could not store {key} in Drive cache: {e}")
+                    _remove(fill.temp_path)
+            else:
+                _remove(fill.temp_path)
+
+        with fill.cond:
+            fill.error = error
+            fill.done = True
+            fill.cond.notify_all()
+
+    def stream(self, key, chunk_size=READ_CHUNK_SIZE):
+        """Iterator bytes isi file; miss diunduh sekali dan dibagi ke semua reader."""
+        fileobj, fill = self._acquire(key)
+        return _read_file(fileobj, chunk_size) if fill is None else _follow(fileobj, fill, chunk_size)
+
+    def open(self, key):
+        """File biner seekable berisi isi lengkap (menunggu download selesai bila miss)."""
+        fileobj, fill = self._acquire(key)
+        if fill is not None:
+            try:
+                _wait(fill, lambda: fill.done)
+            except Exception:
+                fileobj.close()
+                raise
+        return fileobj
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses + self.coalesced
+            return {
+                "files": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "filling": len(self._fills),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def _wait(fill, predicate):
+    with fill.cond:
+        if not fill.cond.wait_for(lambda: fill.done or predicate(), timeout=FILL_TIMEOUT):
+            raise TimeoutError("Download dari Google Drive terlalu lama")
+        if fill.error is not None:
+            raise RuntimeError(f"Gagal mengunduh dari Google Drive: {fill.error}")
+
+def _read_file(fileobj, chunk_size):
+    with fileobj:
+        while True:
+            data = fileobj.read(chunk_size)
+            if not data:
+                return
+            yield data
+
+def _follow(fileobj, fill, chunk_size):
+    with fileobj:
+        while True:
+            data = fileobj.read(chunk_size)
+            if data:
+                yield data
+                continue
+            position = fileobj.tell()
+            _wait(fill, lambda: fill.written > position)
+            if fill.done and fill.written <= position:
+                return
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def enabled():
+    return DRIVE_CACHE_MAX_BYTES > 0
+
+def _download(file_id, fileobj):
+    from services import drive_service
+    drive_service.get_backend().download(file_id, fileobj, chunk_size=DOWNLOAD_CHUNK_SIZE)
+
+def get_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = DiskLRUCache(DRIVE_CACHE_DIR, DRIVE_CACHE_MAX_BYTES, _download)
+        return _cache
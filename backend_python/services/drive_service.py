@@ -1,17 +1,34 @@
 import os
 import json
+import shutil
+import tempfile
+import threading
+import uuid
 from google.auth.transport.requests import Request
 from google.oauth2.service_account import Credentials
 from google.oauth2.credentials import Credentials as UserCredentials
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseUpload
+from googleapiclient.http import MediaIoBaseUpload, MediaIoBaseDownload, MediaFileUpload
 import io
+import re
 
 # If modifying these scopes, delete the file token.json.
 SCOPES = ['https://www.googleapis.com/auth/drive.file']
 
-def get_drive_service():
-    """Shows basic usage of the Drive v3 API."""
+# Resumable uploads are sent in chunks of this size (must be a multiple of 256 KiB)
+DRIVE_CHUNK_SIZE = int(os.getenv("DRIVE_CHUNK_SIZE", str(8 * 1024 * 1024)))
+# "google" (default) or "fake" (local directory, for tests/offline)
+DRIVE_BACKEND = os.getenv("DRIVE_BACKEND", "google").lower()
+
+# Credentials are loaded once per process and shared; the token is refreshed
+# under the lock when it expires.
+_creds = None
+_creds_lock = threading.Lock()
+# httplib2 is not thread-safe, so each thread keeps its own service object
+# built from the shared credentials.
+_local = threading.local()
+
+def _load_credentials():
     creds = None
     token_file = 'token.json'
 
@@ -32,17 +49,7 @@ def get_drive_service():
         except Exception as e:
             print(f"Error loading token.json: {e}")
 
-    # 3. Refresh if expired
-    if creds and creds.expired and creds.refresh_token:
-        try:
-            creds.refresh(Request())
-        except Exception as e:
-            print(f"Error refreshing token: {e}")
-            # In production/Vercel, we can't easily save back the refreshed token 
-            # unless we use a database or external store. 
-            # But the refresh should work for the current session.
-
-    # 4. Fallback to Service Account (Legacy/Alternative)
+    # 3. Fallback to Service Account (Legacy/Alternative)
     if not creds:
         # Check Env for Service Account
         sa_env = os.getenv('GOOGLE_CREDENTIALS_JSON')
@@ -51,16 +58,49 @@ def get_drive_service():
                 creds_dict = json.loads(sa_env)
                 creds = Credentials.from_service_account_info(creds_dict, scopes=SCOPES)
              except: pass
-        
+
         # Check File
         if not creds and os.path.exists('credentials.json'):
             creds = Credentials.from_service_account_file('credentials.json', scopes=SCOPES)
 
+    return creds
+
+def get_credentials():
+    global _creds
+    with _creds_lock:
+        if _creds is None:
+            _creds = _load_credentials()
+
+        # Refresh if expired
+        if _creds and _creds.expired and getattr(_creds, 'refresh_token', None):
+            try:
+                _creds.refresh(Request())
+            except Exception as e:
+                print(f"Error refreshing token: {e}")
+                # In production/Vercel, we can't easily save back the refreshed token
+                # unless we use a database or external store.
+                # But the refresh should work for the current process.
+        return _creds
+
+def reset_drive_service():
+    """Forget cached credentials/clients (e.g. after rotating the token)."""
+    global _creds
+    with _creds_lock:
+        _creds = None
+    _local.__dict__.clear()
+
+def get_drive_service():
+    creds = get_credentials()
     if not creds:
         print("No valid credentials found.")
         return None
 
-    return build('drive', 'v3', credentials=creds)
+    service = getattr(_local, 'service', None)
+    if service is None or getattr(_local, 'creds', None) is not creds:
+        service = build('drive', 'v3', credentials=creds, cache_discovery=False)
+        _local.service = service
+        _local.creds = creds
+    return service
 
 def upload_file_to_drive(file_content, filename, mimetype, folder_id=None):
     service = get_drive_service()
@@ -71,7 +111,10 @@ def upload_file_to_drive(file_content, filename, mimetype, folder_id=None):
     if folder_id:
         file_metadata['parents'] = [folder_id]
 
-    media = MediaIoBaseUpload(io.BytesIO(file_content), mimetype=mimetype, resumable=True)
+    # file_content may be raw bytes or an open binary file object
+    if isinstance(file_content, (bytes, bytearray)):
+        file_content = io.BytesIO(file_content)
+    media = MediaIoBaseUpload(file_content, mimetype=mimetype, resumable=True)
 
     # supportsAllDrives=True is needed for some shared folder types
     file = service.files().create(
@@ -80,5 +123,85 @@ def upload_file_to_drive(file_content, filename, mimetype, folder_id=None):
         fields='id, webViewLink, webContentLink',
         supportsAllDrives=True
     ).execute()
-    
+
     return file
+
+def upload_path_to_drive(path, filename, mimetype, folder_id=None, chunk_size=DRIVE_CHUNK_SIZE):
+    """Chunked resumable upload streamed from a file on disk."""
+    service = get_drive_service()
+    if not service:
+        return None
+
+    file_metadata = {'name': filename}
+    if folder_id:
+        file_metadata['parents'] = [folder_id]
+
+    media = MediaFileUpload(path, mimetype=mimetype, chunksize=chunk_size, resumable=True)
+    request = service.files().create(
+        body=file_metadata,
+        media_body=media,
+        fields='id, webViewLink, webContentLink',
+        supportsAllDrives=True
+    )
+    response = None
+    while response is None:
+        _, response = request.next_chunk(num_retries=3)
+    return response
+
+def file_id_from_link(link):
+    # webViewLink: https://drive.google.com/file/d/<id>/view, webContentLink: ...?id=<id>
+    match = re.search(r"/d/([\w-]+)", link) or re.search(r"[?&]id=([\w-]+)", link)
+    return match.group(1) if match else None
+
+def download_file(file_id, fileobj, chunk_size=1024 * 1024):
+    """Download a Drive file into fileobj chunk by chunk (bounded memory)."""
+    service = get_drive_service()
+    if not service:
+        raise RuntimeError("No Drive service available")
+
+    request = service.files().get_media(fileId=file_id, supportsAllDrives=True)
+    downloader = MediaIoBaseDownload(fileobj, request, chunksize=chunk_size)
+    done = False
+    while not done:
+        _, done = downloader.next_chunk()
+    return fileobj
+
+class GoogleDriveBackend:
+    def upload(self, path, filename, mimetype, folder_id=None):
+        return upload_path_to_drive(path, filename, mimetype, folder_id=folder_id)
+
+    def download(self, file_id, fileobj, chunk_size=1024 * 1024):
+        return download_file(file_id, fileobj, chunk_size=chunk_size)
+
+class FakeDriveBackend:
+    """Drive stand-in that keeps files in a local directory (tests/offline)."""
+
+    def __init__(self, root=None):
+        self.root = root or tempfile.mkdtemp(prefix="fake-drive-")
+        os.makedirs(self.root, exist_ok=True)
+
+    def upload(self, path, filename, mimetype, folder_id=None):
+        file_id = uuid.uuid4().hex
+        shutil.copyfile(path, os.path.join(self.root, file_id))
+        return {
+            'id': file_id,
+            'webViewLink': f"https://drive.google.com/file/d/{file_id}/view",
+            'webContentLink': f"https://drive.google.com/uc?id={file_id}&export=download",
+        }
+
+    def download(self, file_id, fileobj, chunk_size=1024 * 1024):
+        with open(os.path.join(self.root, file_id), "rb") as f:
+            shutil.copyfileobj(f, fileobj, chunk_size)
+        return fileobj
+
+_backend = None
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = FakeDriveBackend() if DRIVE_BACKEND == "fake" else GoogleDriveBackend()
+    return _backend
+
+def set_backend(backend):
+    global _backend
+    _backend = backend
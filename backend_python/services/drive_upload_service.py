@@ -0,0 +1,58 @@
+import os
+
+import database, models, response_cache
+from services import drive_service, extraction_service, job_queue
+
+# Serverless (Vercel / LEAN_STARTUP): thread worker belum tentu jalan dan file staging di /tmp tidak
+# terlihat instance lain, jadi upload ke Drive dilakukan sebelum response dikirim
+UPLOAD_INLINE = os.getenv(
+    "DRIVE_UPLOAD_INLINE", os.getenv("LEAN_STARTUP", "true" if os.getenv("VERCEL") else "false")
+).lower() == "true"
+
+def upload_file(path, filename, mimetype, folder_id=None):
+    drive_file = drive_service.get_backend().upload(path, filename, mimetype, folder_id=folder_id)
+    if not drive_file:
+        raise RuntimeError("Gagal mengupload ke Google Drive")
+    return drive_file
+
+def enqueue(db, doc_id, path, filename, mimetype, folder_id=None):
+    """Antrikan upload file staging ke Drive; status dokumen uploading -> stored/failed."""
+    return job_queue.enqueue(db, 'drive_upload', {
+        'doc_id': doc_id,
+        'path': path,
+        'filename': filename,
+        'mimetype': mimetype,
+        'folder_id': folder_id,
+    }, idempotency_key=f"drive_upload:{doc_id}")
+
+def _mark_failed(payload, error):
+    # File staging dibiarkan supaya upload bisa diulang manual
+    db = database.SessionLocal()
+    try:
+        db.query(models.Document).filter(models.Document.id == payload['doc_id']).update(
+            {"storage_status": 'failed'}, synchronize_session=False
+        )
+        response_cache.bump(db, "documents")
+        db.commit()
+    finally:
+        db.close()
+
+@job_queue.handler('drive_upload', on_failure=_mark_failed)
+def store_on_drive(payload):
+    drive_file = upload_file(payload['path'], payload['filename'], payload['mimetype'], folder_id=payload.get('folder_id'))
+
+    db = database.SessionLocal()
+    try:
+        doc = db.query(models.Document).filter(models.Document.id == payload['doc_id']).first()
+        if doc is None:
+            return None
+        # Use webViewLink as the path
+        doc.file_path = drive_file.get('webViewLink')
+        doc.storage_status = 'stored'
+        # Ekstraksi memakai salinan lokal lalu menghapusnya
+        extraction_service.enqueue(db, doc.id, payload['path'], payload['mimetype'], payload['filename'], remove_after=True)
+        response_cache.bump(db, "documents")
+        db.commit()
+    finally:
+        db.close()
+    return drive_file
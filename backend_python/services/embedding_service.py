@@ -0,0 +1,90 @@
+import hashlib
+import os
+
+import numpy as np
+
+from services.search_service import tokenize, _as_text
+
+# Backend embedding: "local" (hashing, deterministik & offline) atau "openai"
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "local").lower()
+OPENAI_EMBEDDING_MODEL = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+# Batas panjang teks yang di-embed per dokumen
+MAX_EMBED_CHARS = 8000
+
+class Embedder:
+    """Interface embedding: ubah daftar teks menjadi matriks float32 (n, dim)."""
+    name = "base"
+    dim = 0
+
+    def embed(self, texts):
+        raise NotImplementedError
+
+class HashingEmbedder(Embedder):
+    """Stand-in lokal: feature hashing kata + trigram karakter ke vektor berdimensi tetap.
+
+    Hasilnya deterministik antar proses (pakai blake2b, bukan hash() Python),
+    jadi bisa dipakai offline dan di test.
+    """
+    name = "local-hashing"
+
+    def __init__(self, dim=256):
+        self.dim = dim
+
+    def _features(self, text):
+        for tok in tokenize(text):
+            yield tok, 1.0
+            padded = f"#{tok}#"
+            for i in range(len(padded) - 2):
+                yield padded[i:i + 3], 0.5
+
+    def embed(self, texts):
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text):
+                digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self.dim
+                sign = 1.0 if digest[4] & 1 else -1.0
+                out[row, bucket] += sign * weight
+        return out
+
+class OpenAIEmbedder(Embedder):
+    name = "openai"
+
+    def __init__(self, model=OPENAI_EMBEDDING_MODEL):
+        from openai import OpenAI  # Lazy import: hanya dibutuhkan jika backend openai dipakai
+        self.client = OpenAI()
+        self.model = model
+        self.dim = 1536 if model.endswith("small") or model == "text-embedding-ada-002" else 3072
+
+    def embed(self, texts):
+        response = self.client.embeddings.create(model=self.model, input=[t or " " for t in texts])
+        return np.asarray([item.embedding for item in response.data], dtype=np.float32)
+
+_embedder = None
+
+def get_embedder():
+    global _embedder
+    if _embedder is None:
+        if EMBEDDING_BACKEND == "openai":
+            _embedder = OpenAIEmbedder()
+        else:
+            _embedder = HashingEmbedder()
+    return _embedder
+
+def set_embedder(embedder):
+    """Ganti embedder yang dipakai (mis. untuk test)."""
+    global _embedder
+    _embedder = embedder
+
+def document_text(doc):
+    parts = [doc.title, _as_text(doc.tags), _as_text(doc.category), doc.content or ""]
+    return " ".join(p for p in parts if p)[:MAX_EMBED_CHARS]
+
+def embed_documents(docs):
+    """Hitung embedding untuk banyak dokumen sekaligus dan simpan ke kolom Document.embedding."""
+    if not docs:
+        return None
+    vectors = get_embedder().embed([document_text(d) for d in docs])
+    for doc, vec in zip(docs, vectors):
+        doc.embedding = [round(float(x), 6) for x in vec]
+    return vectors
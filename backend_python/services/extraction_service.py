@@ -0,0 +1,238 @@
+import codecs
+import logging
+import os
+import queue
+import threading
+import time
+import zipfile
+from collections import namedtuple
+from xml.etree.ElementTree import iterparse
+
+import database, models, response_cache
+from services import search_service, embedding_service, vector_index, job_queue, storage_backends
+
+CHUNK_SIZE = 64 * 1024
+# Batas teks yang disimpan per dokumen (kolom content = LONGTEXT)
+MAX_CONTENT_CHARS = int(os.getenv("MAX_CONTENT_CHARS", "1000000"))
+# Hasil yang sudah menunggu ditulis bersama (group commit), maksimal WRITE_BATCH_SIZE dokumen per transaksi
+WRITE_BATCH_SIZE = 20
+# Batas job menunggu hasilnya di-commit; lewat dari ini job gagal dan dicoba ulang
+WRITE_TIMEOUT = 60.0
+# Embedding yang gagal diisi job backfill; kegagalan dalam satu window digabung ke satu job
+EMBED_RETRY_WINDOW = 60
+
+logger = logging.getLogger(__name__)
+
+DOCX_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+ExtractionResult = namedtuple("ExtractionResult", ["doc_id", "content", "file_size"])
+
+class _Ticket:
+    """Satu hasil di antrean writer; job menunggu done lalu membaca error."""
+
+    def __init__(self, result):
+        self.result = result
+        self.done = threading.Event()
+        self.error = None
+
+class _TextBuffer:
+    """Kumpulkan potongan teks sampai MAX_CONTENT_CHARS lalu berhenti."""
+
+    def __init__(self, limit=MAX_CONTENT_CHARS):
+        self.parts = []
+        self.length = 0
+        self.limit = limit
+
+    @property
+    def full(self):
+        return self.length >= self.limit
+
+    def add(self, text):
+        if not text or self.full:
+            return
+        text = text[:self.limit - self.length]
+        self.parts.append(text)
+        self.length += len(text)
+
+    def value(self):
+        return "".join(self.parts).strip() or None
+
+def detect_kind(file_type, filename):
+    file_type = (file_type or "").lower()
+    ext = os.path.splitext(filename or "")[1].lower()
+    if "pdf" in file_type or ext == ".pdf":
+        return "pdf"
+    if "wordprocessingml" in file_type or ext == ".docx":
+        return "docx"
+    if file_type.startswith("text/") or ext in (".txt", ".md", ".csv"):
+        return "txt"
+    return None
+
+def _extract_txt(fileobj, buf):
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    while not buf.full:
+        chunk = fileobj.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        buf.add(decoder.decode(chunk))
+    buf.add(decoder.decode(b"", final=True))
+
+def _extract_docx(fileobj, buf):
+    # Parse word/document.xml secara streaming; elemen dibuang setelah dibaca
+    with zipfile.ZipFile(fileobj) as zf, zf.open("word/document.xml") as xml:
+        for _, elem in iterparse(xml, events=("end",)):
+            if elem.tag == DOCX_NS + "t":
+                buf.add(elem.text)
+            elif elem.tag == DOCX_NS + "p":
+                buf.add("\n")
+                elem.clear()
+            if buf.full:
+                break
+
+def _extract_pdf(fileobj, buf):
+    # Lazy import: pypdf cukup berat dan hanya dibutuhkan worker ekstraksi
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        logger.warning("pypdf not installed, skipping PDF extraction")
+        return
+    reader = PdfReader(fileobj)
+    for page in reader.pages:
+        buf.add(page.extract_text() or "")
+        buf.add("\n")
+        if buf.full:
+            break
+
+EXTRACTORS = {"txt": _extract_txt, "docx": _extract_docx, "pdf": _extract_pdf}
+
+def extract_text(fileobj, file_type, filename):
+    """Ambil teks dari file yang sudah terbuka (binary, seekable)."""
+    kind = detect_kind(file_type, filename)
+    if kind is None:
+        return None
+    buf = _TextBuffer()
+    EXTRACTORS[kind](fileobj, buf)
+    return buf.value()
+
+def process_file(doc_id, file_path, file_type, filename):
+    # Lokal dibuka langsung; Drive lewat cache disk (sekaligus menghangatkan cache untuk download)
+    with storage_backends.open_file(file_path) as f:
+        file_size = f.seek(0, os.SEEK_END)
+        f.seek(0)
+        content = extract_text(f, file_type, filename)
+    return ExtractionResult(doc_id, content, file_size)
+
+class ExtractionPipeline:
+    """Satu writer thread yang menulis hasil ekstraksi ke DB per batch.
+
+    Ekstraksinya sendiri berjalan sebagai job 'extract_content' di worker job_queue; job
+    menunggu sampai hasilnya di-commit, jadi job baru ditandai selesai setelah data tersimpan.
+    """
+
+    def __init__(self):
+        self._results = queue.Queue()
+        self._writer = None
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._pending = 0
+
+    def _start(self):
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._writer_loop, name="extract-writer", daemon=True)
+            self._writer.start()
+
+    def write(self, result, timeout=WRITE_TIMEOUT):
+        """Tulis hasil (digabung dengan hasil job lain yang sedang menunggu); error tulis dilempar ulang."""
+        ticket = _Ticket(result)
+        with self._lock:
+            self._start()
+            self._pending += 1
+        self._results.put(ticket)
+        if not ticket.done.wait(timeout):
+            raise TimeoutError(f"Hasil ekstraksi {result.doc_id} belum tersimpan setelah {timeout:.0f} detik")
+        if ticket.error is not None:
+            raise ticket.error
+
+    def _done(self, count):
+        with self._lock:
+            self._pending -= count
+            if self._pending <= 0:
+                self._idle.notify_all()
+
+    def _writer_loop(self):
+        while True:
+            # Tanpa menunggu batch penuh: ambil yang sudah antre, hasil baru masuk batch berikutnya
+            batch = [self._results.get()]
+            while len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._results.get_nowait())
+                except queue.Empty:
+                    break
+            error = None
+            try:
+                write_results([ticket.result for ticket in batch])
+            except Exception as e:
+                error = e
+            for ticket in batch:
+                ticket.error = error
+                ticket.done.set()
+            self._done(len(batch))
+
+    def wait_idle(self, timeout=None):
+        """Tunggu sampai semua hasil yang sedang antre selesai ditulis (untuk test/skrip)."""
+        with self._lock:
+            return self._idle.wait_for(lambda: self._pending <= 0, timeout=timeout)
+
+def write_results(batch):
+    # expire_on_commit=False: index di-update dari objek yang sama tanpa SELECT ulang
+    db = database.SessionLocal(expire_on_commit=False)
+    try:
+        by_id = {r.doc_id: r for r in batch}
+        docs = db.query(models.Document).filter(models.Document.id.in_(list(by_id))).all()
+        for doc in docs:
+            result = by_id[doc.id]
+            doc.content = result.content
+            doc.file_size = result.file_size
+        try:
+            embedding_service.embed_documents(docs)
+        except Exception as e:
+            # Isi tetap disimpan; embedding yang kosong diisi ulang oleh job backfill
+            logger.warning(f"Failed to embed {len(docs)} documents, queueing backfill: {e}")
+            window = int(time.time() // EMBED_RETRY_WINDOW)
+            vector_index.enqueue_backfill(db, idempotency_key=f"backfill_embeddings:extract:{window}")
+        response_cache.bump(db, "documents")
+        db.commit()
+
+        for doc in docs:
+            search_service.search_index.upsert(doc)
+            vector_index.vector_index.upsert(doc)
+    finally:
+        db.close()
+
+# Pipeline bersama untuk satu proses worker
+pipeline = ExtractionPipeline()
+
+def _remove_staged(payload, error=None):
+    if payload.get('remove_after'):
+        try:
+            os.remove(payload['file_path'])
+        except OSError:
+            pass
+
+@job_queue.handler('extract_content', on_failure=_remove_staged)
+def run_extraction(payload):
+    """Job: ekstrak teks & ukuran file; gagal -> dicoba ulang oleh job_queue."""
+    result = process_file(payload['doc_id'], payload['file_path'], payload.get('file_type'), payload.get('filename'))
+    # Job selesai setelah hasilnya di-commit; gagal tulis -> job (dan file staging) dicoba ulang
+    pipeline.write(result)
+    # remove_after=True: file staging upload Drive dihapus setelah hasilnya tersimpan
+    _remove_staged(payload)
+
+def enqueue(db, doc_id, file_path, file_type, filename, remove_after=False):
+    return job_queue.enqueue(db, 'extract_content', {
+        'doc_id': doc_id,
+        'file_path': file_path,
+        'file_type': file_type,
+        'filename': filename,
+        'remove_after': remove_after,
+    }, idempotency_key=f"extract_content:{doc_id}")
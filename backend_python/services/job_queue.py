@@ -0,0 +1,207 @@
+import importlib
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+import database, models
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+# Backoff eksponensial: BACKOFF_BASE * 2^(attempt-1) detik, maksimal BACKOFF_MAX
+BACKOFF_BASE = float(os.getenv("JOB_BACKOFF_BASE", "2"))
+BACKOFF_MAX = float(os.getenv("JOB_BACKOFF_MAX", "300"))
+POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1"))
+# Job 'running' lebih lama dari ini dianggap yatim (worker mati) dan diantrikan ulang
+STALE_AFTER_SECONDS = int(os.getenv("JOB_STALE_AFTER", "900"))
+
+# kind -> (handler, on_failure)
+HANDLERS = {}
+# Handler di modul yang tidak di-import saat startup (dependency berat/opsional);
+# modulnya di-import saat job jenis itu pertama kali dijalankan
+HANDLER_MODULES = {
+    'drive_upload': 'services.drive_upload_service',
+}
+
+_wake = threading.Event()
+_lock = threading.Lock()
+_workers = []
+_active = 0
+
+def handler(kind, on_failure=None):
+    """Daftarkan fungsi handler(payload) untuk satu jenis job.
+
+    on_failure(payload, error) dipanggil sekali ketika percobaan terakhir gagal.
+    """
+    def decorator(fn):
+        HANDLERS[kind] = (fn, on_failure)
+        return fn
+    return decorator
+
+def utcnow():
+    return datetime.utcnow()
+
+def enqueue(db, kind, payload=None, idempotency_key=None, delay=0, max_attempts=MAX_ATTEMPTS):
+    """Tambahkan job ke session yang sama dengan perubahan data pemanggil.
+
+    Job baru terlihat oleh worker setelah pemanggil commit (outbox). Job dengan
+    idempotency_key yang sudah pernah diantrikan tidak dibuat lagi.
+    """
+    if idempotency_key:
+        existing = db.query(models.Job.id).filter(models.Job.idempotency_key == idempotency_key).first()
+        if existing:
+            return None
+    job = models.Job(
+        kind=kind,
+        payload=payload or {},
+        idempotency_key=idempotency_key,
+        max_attempts=max_attempts,
+        run_at=utcnow() + timedelta(seconds=delay),
+    )
+    db.add(job)
+    db.info['jobs_enqueued'] = True
+    return job
+
+# Dipasang di kelas Session agar berlaku juga untuk session milik AsyncSession
+@event.listens_for(Session, "after_commit")
+def _wake_after_commit(session):
+    if session.info.pop('jobs_enqueued', False):
+        start()
+        _wake.set()
+
+def backoff_seconds(attempt):
+    delay = min(BACKOFF_BASE * (2 ** max(attempt - 1, 0)), BACKOFF_MAX)
+    return delay + random.uniform(0, delay * 0.1)
+
+def _requeue_stale(db):
+    cutoff = utcnow() - timedelta(seconds=STALE_AFTER_SECONDS)
+    db.query(models.Job).filter(
+        models.Job.status == 'running',
+        models.Job.locked_at < cutoff
+    ).update({"status": 'queued', "locked_at": None}, synchronize_session=False)
+    db.commit()
+
+def _claim(db):
+    """Ambil satu job yang sudah jatuh tempo; klaim atomik lewat UPDATE ... WHERE status='queued'."""
+    now = utcnow()
+    candidates = db.query(models.Job.id).filter(
+        models.Job.status == 'queued',
+        models.Job.run_at <= now
+    ).order_by(models.Job.run_at).limit(JOB_WORKERS + 1).all()
+    for (job_id,) in candidates:
+        claimed = db.query(models.Job).filter(
+            models.Job.id == job_id,
+            models.Job.status == 'queued'
+        ).update({
+            "status": 'running',
+            "locked_at": now,
+            "attempts": models.Job.attempts + 1,
+        }, synchronize_session=False)
+        db.commit()
+        if claimed:
+            return db.query(models.Job).filter(models.Job.id == job_id).first()
+    return None
+
+def _handler_for(kind):
+    if kind not in HANDLERS and kind in HANDLER_MODULES:
+        importlib.import_module(HANDLER_MODULES[kind])
+    return HANDLERS.get(kind, (None, None))
+
+def run_job(db, job):
+    fn = on_failure = None
+    try:
+        fn, on_failure = _handler_for(job.kind)
+        if fn is None:
+            raise RuntimeError(f"Tidak ada handler untuk job '{job.kind}'")
+        fn(job.payload or {})
+    except Exception as e:
+        db.rollback()
+        job.last_error = repr(e)[:2000]
+        job.locked_at = None
+        if job.attempts >= job.max_attempts:
+            job.status = 'failed'
+            logger.error(f"Job {job.kind} {job.id} failed permanently: {e}")
+            if on_failure:
+                try:
+                    on_failure(job.payload or {}, e)
+                except Exception as hook_error:
+                    logger.error(f"Error in failure hook for job {job.id}: {hook_error}")
+        else:
+            job.status = 'queued'
+            job.run_at = utcnow() + timedelta(seconds=backoff_seconds(job.attempts))
+        db.commit()
+        return False
+
+    job.status = 'done'
+    job.last_error = None
+    job.locked_at = None
+    db.commit()
+    return True
+
+def _worker_loop():
+    global _active
+    last_stale_check = 0.0
+    while True:
+        db = database.SessionLocal()
+        try:
+            if time.monotonic() - last_stale_check > 60:
+                _requeue_stale(db)
+                last_stale_check = time.monotonic()
+            job = _claim(db)
+            if job is None:
+                db.close()
+                _wake.wait(POLL_INTERVAL)
+                _wake.clear()
+                continue
+            with _lock:
+                _active += 1
+            try:
+                run_job(db, job)
+            finally:
+                with _lock:
+                    _active -= 1
+        except Exception as e:
+            logger.exception(f"Job worker error: {e}")
+            time.sleep(POLL_INTERVAL)
+        finally:
+            db.close()
+
+def start(workers=JOB_WORKERS):
+    """Jalankan worker thread (sekali per proses)."""
+    with _lock:
+        if _workers:
+            return
+        for i in range(workers):
+            t = threading.Thread(target=_worker_loop, name=f"job-worker-{i}", daemon=True)
+            t.start()
+            _workers.append(t)
+
+def wait_idle(timeout=None):
+    """Tunggu sampai semua job queued/running selesai, termasuk yang menunggu retry (untuk test/skrip).
+
+    Job terjadwal yang jatuh tempo lebih dari BACKOFF_MAX detik lagi (mis. job berkala) tidak ditunggu.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        db = database.SessionLocal()
+        try:
+            horizon = utcnow() + timedelta(seconds=BACKOFF_MAX)
+            due = db.query(models.Job.id).filter(
+                models.Job.status.in_(['queued', 'running']),
+                models.Job.run_at <= horizon
+            ).first()
+        finally:
+            db.close()
+        if due is None and _active == 0:
+            return True
+        if deadline is not None and time.monotonic() > deadline:
+            return False
+        _wake.set()
+        time.sleep(0.05)
@@ -0,0 +1,190 @@
+import asyncio
+import os
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select, update
+
+import database, models
+from cache import TTLCache
+from services import job_queue
+
+# Role yang bisa menyetujui dokumen (menerima notifikasi upload baru)
+APPROVER_ROLES = ('admin', 'manager', 'superuser')
+# Jumlah baris per INSERT saat fan-out
+FANOUT_BATCH_SIZE = int(os.getenv("NOTIFY_BATCH_SIZE", "500"))
+# Jumlah notifikasi belum dibaca per user; di-invalidate saat ada notifikasi baru / dibaca
+UNREAD_CACHE_TTL = int(os.getenv("NOTIFY_UNREAD_TTL", "30"))
+unread_cache = TTLCache(maxsize=4096, ttl=UNREAD_CACHE_TTL)
+# Maksimal notifikasi yang diambil per polling stream
+STREAM_POLL_LIMIT = 100
+# Polling mundur sekian detik dari created_at terakhir: TIMESTAMP berpresisi detik dan transaksi
+# fan-out bisa di-commit setelah baris yang lebih baru terlihat
+STREAM_POLL_OVERLAP = timedelta(seconds=5)
+
+MESSAGES = {
+    'document_uploaded': "Dokumen baru menunggu persetujuan: {title}",
+    'document_approved': "Dokumen Anda disetujui: {title}",
+    'document_rejected': "Dokumen Anda ditolak: {title}",
+}
+
+class NotificationBroker:
+    """Pub/sub in-process: worker thread publish, koneksi SSE (asyncio) menerima per user."""
+
+    def __init__(self, queue_size=100):
+        self._subscribers = {}  # user_id -> set of (loop, asyncio.Queue)
+        self._lock = threading.Lock()
+        self.queue_size = queue_size
+
+    def subscribe(self, user_id):
+        subscription = (asyncio.get_running_loop(), asyncio.Queue(maxsize=self.queue_size))
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, user_id, subscription):
+        with self._lock:
+            subs = self._subscribers.get(user_id)
+            if subs is not None:
+                subs.discard(subscription)
+                if not subs:
+                    del self._subscribers[user_id]
+
+    @staticmethod
+    def _put(queue, item):
+        try:
+            queue.put_nowait(item)
+        except asyncio.QueueFull:
+            pass  # klien lambat; notifikasi tetap ada di DB
+
+    def publish(self, user_id, item):
+        with self._lock:
+            subs = list(self._subscribers.get(user_id, ()))
+        for loop, queue in subs:
+            try:
+                loop.call_soon_threadsafe(self._put, queue, item)
+            except RuntimeError:
+                pass  # event loop sudah ditutup
+
+    def connections(self):
+        with self._lock:
+            return sum(len(subs) for subs in self._subscribers.values())
+
+broker = NotificationBroker()
+
+def enqueue(db, event, documents, actor_id=None, note=None):
+    """Antrikan fan-out notifikasi di transaksi pemanggil.
+
+    documents: [{'id', 'title', 'uploaded_by'}]; penerima dihitung oleh job, bukan di request.
+    """
+    if not documents:
+        return None
+    return job_queue.enqueue(db, 'notify', {
+        'event': event,
+        'documents': documents,
+        'actor_id': actor_id,
+        'note': note,
+    })
+
+def _message(event, doc, note=None):
+    message = MESSAGES[event].format(title=doc.get('title') or '-')
+    if event == 'document_rejected' and note:
+        message += f". Alasan: {note}"
+    return message
+
+def _recipient_batches(db, event, documents, actor_id):
+    """Yield list (user_id, doc) per batch FANOUT_BATCH_SIZE."""
+    if event == 'document_uploaded':
+        # Semua approver aktif, diambil per batch (keyset pada id)
+        last_id = ''
+        per_batch = max(FANOUT_BATCH_SIZE // max(len(documents), 1), 1)
+        while True:
+            user_ids = db.execute(
+                select(models.User.id)
+                .where(models.User.role.in_(APPROVER_ROLES), models.User.is_active == True, models.User.id > last_id)
+                .order_by(models.User.id)
+                .limit(per_batch)
+            ).scalars().all()
+            if not user_ids:
+                return
+            yield [(uid, doc) for uid in user_ids if uid != actor_id for doc in documents]
+            last_id = user_ids[-1]
+    else:
+        pairs = [(doc['uploaded_by'], doc) for doc in documents if doc.get('uploaded_by') and doc['uploaded_by'] != actor_id]
+        for start in range(0, len(pairs), FANOUT_BATCH_SIZE):
+            yield pairs[start:start + FANOUT_BATCH_SIZE]
+
+@job_queue.handler('notify')
+def fan_out(payload):
+    """Job: bulk insert satu notifikasi per penerima, lalu push ke koneksi SSE."""
+    event = payload['event']
+    documents = payload.get('documents') or []
+    rows = []
+    db = database.SessionLocal()
+    try:
+        # Semua batch dalam satu transaksi: retry job tidak menghasilkan notifikasi ganda
+        for batch in _recipient_batches(db, event, documents, payload.get('actor_id')):
+            batch_rows = [{
+                "id": models.generate_uuid(),
+                "user_id": user_id,
+                "message": _message(event, doc, payload.get('note')),
+                "type": event,
+                "is_read": False,
+            } for user_id, doc in batch]
+            if batch_rows:
+                db.execute(insert(models.Notification), batch_rows)
+                rows.extend(batch_rows)
+        db.commit()
+    finally:
+        db.close()
+
+    created_at = datetime.utcnow().isoformat()
+    for row in rows:
+        unread_cache.delete(row["user_id"])
+        broker.publish(row["user_id"], {**row, "created_at": created_at})
+    return len(rows)
+
+def unread_count(db, user_id):
+    count = unread_cache.get(user_id)
+    if count is None:
+        count = db.execute(
+            select(func.count()).select_from(models.Notification)
+            .where(models.Notification.user_id == user_id, models.Notification.is_read == False)
+        ).scalar_one()
+        unread_cache.set(user_id, count)
+    return count
+
+def unread_since(db, user_id, since=None, limit=STREAM_POLL_LIMIT):
+    """Notifikasi belum dibaca sejak created_at `since` (dikurangi STREAM_POLL_OVERLAP), terlama dulu.
+
+    Dipakai stream SSE untuk notifikasi yang dibuat proses lain (broker hanya per proses); index
+    ix_notifications_user_read_created. Baris di rentang overlap terambil lagi, pemanggil menyaring id
+    yang sudah dikirim.
+    """
+    notification = models.Notification
+    query = select(notification).where(notification.user_id == user_id, notification.is_read == False)
+    if since is not None:
+        query = query.where(notification.created_at >= since - STREAM_POLL_OVERLAP)
+    return db.execute(query.order_by(notification.created_at, notification.id).limit(limit)).scalars().all()
+
+def latest_unread(db, user_id):
+    """(created_at terbaru, [id pada created_at itu]) sebagai titik awal polling stream, atau (None, [])."""
+    latest = db.execute(
+        select(func.max(models.Notification.created_at))
+        .where(models.Notification.user_id == user_id, models.Notification.is_read == False)
+    ).scalar()
+    if latest is None:
+        return None, []
+    return latest, [n.id for n in unread_since(db, user_id, latest)]
+
+def mark_read(db, user_id, ids=None):
+    """Tandai notifikasi (semua, atau ids tertentu) milik user sebagai sudah dibaca."""
+    stmt = update(models.Notification).where(
+        models.Notification.user_id == user_id, models.Notification.is_read == False
+    )
+    if ids is not None:
+        stmt = stmt.where(models.Notification.id.in_(ids))
+    updated = db.execute(stmt.values(is_read=True).execution_options(synchronize_session=False)).rowcount
+    db.commit()
+    unread_cache.delete(user_id)
+    return updated
@@ -0,0 +1,256 @@
+import html
+import math
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+import database, models
+
+# Bobot per field (BM25F sederhana): judul paling penting, lalu tag/kategori, lalu isi
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    "tags": 2.0,
+    "category": 2.0,
+    "content": 1.0,
+}
+K1 = 1.2
+B = 0.75
+MIN_PREFIX_LEN = 3
+SNIPPET_CHARS = 160
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+STOPWORDS = {
+    "dan", "di", "ke", "dari", "yang", "untuk", "pada", "dengan", "atau", "ini", "itu",
+    "the", "of", "and", "a", "an", "to", "in", "for", "on",
+}
+
+def tokenize(text):
+    if not text:
+        return []
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+def _as_text(value):
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(v) for v in value if v)
+    return value or ""
+
+class SearchIndex:
+    """Inverted index in-memory (pure Python) dengan ranking BM25."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        # Hanya satu rebuild sekaligus; selama rebuild, perubahan incremental dicatat di _journal
+        self._rebuild_lock = threading.Lock()
+        self._journal = None
+        self._reset()
+
+    def _reset(self):
+        self.postings = defaultdict(dict)  # term -> {doc_id: weighted tf}
+        self.doc_terms = {}                # doc_id -> set(term), untuk hapus incremental
+        self.doc_len = {}                  # doc_id -> panjang dokumen (berbobot)
+        self.doc_status = {}               # doc_id -> status
+        self.total_len = 0.0
+        self.vocabulary = []               # term terurut, untuk prefix match
+        self._vocab_dirty = False
+        self.loaded_at = None
+        self.loaded_version = None         # versi tabel documents (table_versions) saat dibangun
+
+    @property
+    def is_loaded(self):
+        return self.loaded_at is not None
+
+    def is_stale(self, version):
+        # Semua proses menaikkan versi documents saat menulis, jadi index tertinggal begitu versinya beda
+        return not self.is_loaded or self.loaded_version != version
+
+    def refresh(self, version):
+        """Rebuild bila index lebih lama dari `version`; jalankan di thread (run_in_threadpool), bukan event loop.
+
+        Request lain yang juga melihat index basi menunggu rebuild yang sedang berjalan lalu memakai hasilnya.
+        """
+        with self._rebuild_lock:
+            if not self.is_stale(version):
+                return
+            db = database.SessionLocal()
+            try:
+                self.rebuild(db, version)
+            finally:
+                db.close()
+
+    def rebuild(self, db, version=None):
+        """Bangun ulang index dari semua dokumen yang belum dihapus.
+
+        Postings baru dibangun di luar lock (search tetap jalan memakai index lama), lalu ditukar
+        di bawah lock bersama perubahan incremental yang masuk selama rebuild.
+        """
+        fresh = SearchIndex()
+        with self._lock:
+            self._journal = []
+        try:
+            rows = db.query(
+                models.Document.id,
+                models.Document.title,
+                models.Document.tags,
+                models.Document.category,
+                models.Document.content,
+                models.Document.status,
+            ).filter(models.Document.deleted_at == None).yield_per(500)
+            for row in rows:
+                fresh._add(row.id, row.title, row.tags, row.category, row.content, row.status)
+            fresh.loaded_at = time.monotonic()
+
+            with self._lock:
+                for op, args in self._journal:
+                    getattr(fresh, op)(*args)
+                self.postings = fresh.postings
+                self.doc_terms = fresh.doc_terms
+                self.doc_len = fresh.doc_len
+                self.doc_status = fresh.doc_status
+                self.total_len = fresh.total_len
+                self.vocabulary = fresh.vocabulary
+                self._vocab_dirty = True
+                self.loaded_at = fresh.loaded_at
+                self.loaded_version = version
+        finally:
+            with self._lock:
+                self._journal = None
+
+    def _add(self, doc_id, title, tags, category, content, status):
+        weighted = defaultdict(float)
+        length = 0.0
+        for field, value in (("title", title), ("tags", tags), ("category", category), ("content", content)):
+            tokens = tokenize(_as_text(value))
+            weight = FIELD_WEIGHTS[field]
+            length += weight * len(tokens)
+            for tok in tokens:
+                weighted[tok] += weight
+
+        for term, tf in weighted.items():
+            if term not in self.postings:
+                self._vocab_dirty = True
+            self.postings[term][doc_id] = tf
+        self.doc_terms[doc_id] = set(weighted)
+        self.doc_len[doc_id] = length
+        self.doc_status[doc_id] = status
+        self.total_len += length
+
+    def _remove(self, doc_id):
+        for term in self.doc_terms.pop(doc_id, ()):
+            postings = self.postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            if not postings:
+                del self.postings[term]
+                self._vocab_dirty = True
+        self.total_len -= self.doc_len.pop(doc_id, 0.0)
+        self.doc_status.pop(doc_id, None)
+
+    def upsert(self, doc):
+        """Tambah/perbarui satu dokumen (dipanggil saat upload atau isi diekstrak)."""
+        fields = (doc.id, doc.title, doc.tags, doc.category, doc.content, doc.status, doc.deleted_at is None)
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append(("_upsert", fields))
+            if self.is_loaded:
+                self._upsert(*fields)
+
+    def _upsert(self, doc_id, title, tags, category, content, status, alive):
+        self._remove(doc_id)
+        if alive:
+            self._add(doc_id, title, tags, category, content, status)
+
+    def set_status(self, doc_id, status):
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append(("_set_status", (doc_id, status)))
+            self._set_status(doc_id, status)
+
+    def _set_status(self, doc_id, status):
+        if doc_id in self.doc_status:
+            self.doc_status[doc_id] = status
+
+    def remove(self, doc_id):
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append(("_remove", (doc_id,)))
+            if self.is_loaded:
+                self._remove(doc_id)
+
+    def _expand(self, term):
+        # Term pendek dicocokkan persis; yang lebih panjang juga mencocokkan prefix
+        if len(term) < MIN_PREFIX_LEN:
+            return [term] if term in self.postings else []
+        if self._vocab_dirty:
+            self.vocabulary = sorted(self.postings)
+            self._vocab_dirty = False
+        matches = []
+        i = bisect_left(self.vocabulary, term)
+        while i < len(self.vocabulary) and self.vocabulary[i].startswith(term):
+            matches.append(self.vocabulary[i])
+            i += 1
+        return matches
+
+    def search(self, q, statuses=None, limit=50, offset=0):
+        """Kembalikan (total, [(doc_id, score), ...]) terurut skor BM25."""
+        terms = tokenize(q)
+        if not terms:
+            return 0, []
+        with self._lock:
+            n_docs = len(self.doc_len)
+            if n_docs == 0:
+                return 0, []
+            avg_len = (self.total_len / n_docs) or 1.0
+            scores = defaultdict(float)
+            for term in set(terms):
+                for expanded in self._expand(term):
+                    postings = self.postings[expanded]
+                    idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for doc_id, tf in postings.items():
+                        if statuses and self.doc_status.get(doc_id) not in statuses:
+                            continue
+                        norm = K1 * (1 - B + B * self.doc_len[doc_id] / avg_len)
+                        scores[doc_id] += idf * tf * (K1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return len(ranked), ranked[offset:offset + limit]
+
+def highlight(text, q, snippet=False):
+    """Bungkus kata yang cocok dengan <mark>; untuk isi, ambil potongan di sekitar kecocokan."""
+    text = _as_text(text)
+    if not text:
+        return None
+    terms = set(tokenize(q))
+    if not terms:
+        return html.escape(text[:SNIPPET_CHARS]) if snippet else html.escape(text)
+
+    def is_match(word):
+        word = word.lower()
+        return any(word == t or (len(t) >= MIN_PREFIX_LEN and word.startswith(t)) for t in terms)
+
+    matches = [m for m in TOKEN_RE.finditer(text) if is_match(m.group())]
+    if snippet:
+        if not matches:
+            return None
+        start = max(0, matches[0].start() - SNIPPET_CHARS // 3)
+        end = min(len(text), start + SNIPPET_CHARS)
+        matches = [m for m in matches if m.start() >= start and m.end() <= end]
+    else:
+        start, end = 0, len(text)
+
+    parts = []
+    pos = start
+    for m in matches:
+        parts.append(html.escape(text[pos:m.start()]))
+        parts.append("<mark>" + html.escape(m.group()) + "</mark>")
+        pos = m.end()
+    parts.append(html.escape(text[pos:end]))
+    result = "".join(parts)
+    if snippet:
+        result = ("..." if start > 0 else "") + result.strip() + ("..." if end < len(text) else "")
+    return result
+
+# Index bersama untuk satu proses worker
+search_index = SearchIndex()
@@ -0,0 +1,191 @@
+import logging
+import os
+import time
+from collections import Counter
+
+from sqlalchemy import delete, func, select
+
+import database, models
+from services import job_queue
+
+# Jarak antar rekonsiliasi otomatis (detik)
+RECONCILE_INTERVAL = int(os.getenv("STATS_RECONCILE_INTERVAL", str(6 * 3600)))
+
+STATUSES = ('pending', 'approved', 'rejected')
+
+logger = logging.getLogger(__name__)
+
+def _keys(uploaded_by, status, category_ids):
+    keys = [('status', '', status), ('uploader', uploaded_by or '', status)]
+    keys += [('category', str(cat_id), status) for cat_id in category_ids]
+    return keys
+
+def _document_category_ids(db, doc_id):
+    return db.execute(
+        select(models.DocumentCategory.category_id).where(models.DocumentCategory.document_id == doc_id)
+    ).scalars().all()
+
+def _upsert_statement(db, rows):
+    """INSERT ... ON DUPLICATE KEY / ON CONFLICT: doc_count = doc_count + nilai baru."""
+    table = models.DocumentCounter.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect == 'mysql':
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(table).values(rows)
+        return stmt.on_duplicate_key_update(doc_count=table.c.doc_count + stmt.inserted.doc_count)
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    stmt = insert(table).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.dimension, table.c.ref_id, table.c.status],
+        set_={"doc_count": table.c.doc_count + stmt.excluded.doc_count}
+    )
+
+def apply(db, deltas):
+    """Tambahkan deltas {(dimension, ref_id, status): n} ke tabel counter (tanpa commit)."""
+    rows = [
+        {"dimension": d, "ref_id": r, "status": s, "doc_count": n}
+        for (d, r, s), n in sorted(deltas.items()) if n
+    ]
+    if rows:
+        db.execute(_upsert_statement(db, rows))
+
+def _category_ids_by_document(db, doc_ids):
+    by_doc = {}
+    for doc_id, cat_id in db.execute(
+        select(models.DocumentCategory.document_id, models.DocumentCategory.category_id)
+        .where(models.DocumentCategory.document_id.in_(list(doc_ids)))
+    ):
+        by_doc.setdefault(doc_id, []).append(cat_id)
+    return by_doc
+
+def apply_changes(db, changes):
+    """changes: [(doc_id, uploaded_by, old_status, new_status)]; old None = dokumen baru, new None = dihapus.
+
+    Kategori semua dokumen diambil dengan satu query IN, lalu semua delta ditulis dengan satu upsert.
+    """
+    changes = [c for c in changes if c[2] != c[3]]
+    if not changes:
+        return
+    categories = _category_ids_by_document(db, {c[0] for c in changes})
+    deltas = Counter()
+    for doc_id, uploaded_by, old_status, new_status in changes:
+        cat_ids = categories.get(doc_id, [])
+        if old_status:
+            for key in _keys(uploaded_by, old_status, cat_ids):
+                deltas[key] -= 1
+        if new_status:
+            for key in _keys(uploaded_by, new_status, cat_ids):
+                deltas[key] += 1
+    apply(db, deltas)
+
+def adjust(db, doc_id, uploaded_by, status, delta, category_ids=None):
+    """Hitung (delta=+1) atau lepas (delta=-1) satu dokumen dari semua counter."""
+    if category_ids is None:
+        category_ids = _document_category_ids(db, doc_id)
+    apply(db, Counter({key: delta for key in _keys(uploaded_by, status, category_ids)}))
+
+def change_status(db, doc_id, uploaded_by, old_status, new_status):
+    apply_changes(db, [(doc_id, uploaded_by, old_status, new_status)])
+
+def get_stats(db, statuses=None):
+    """Ringkasan dashboard dari tabel counter (tidak bergantung jumlah dokumen)."""
+    statuses = statuses or STATUSES
+    rows = db.execute(
+        select(models.DocumentCounter.dimension, models.DocumentCounter.ref_id,
+               models.DocumentCounter.status, models.DocumentCounter.doc_count)
+        .where(models.DocumentCounter.status.in_(statuses), models.DocumentCounter.doc_count != 0)
+    ).all()
+    by_status = {s: 0 for s in statuses}
+    categories = Counter()
+    uploaders = Counter()
+    for dimension, ref_id, status, n in rows:
+        if dimension == 'status':
+            by_status[status] += n
+        elif dimension == 'category':
+            categories[int(ref_id)] += n
+        elif dimension == 'uploader':
+            uploaders[ref_id] += n
+
+    cat_names = dict(db.execute(
+        select(models.Category.id, models.Category.name).where(models.Category.id.in_(list(categories)))
+    ).all()) if categories else {}
+    user_names = dict(db.execute(
+        select(models.User.id, models.User.name).where(models.User.id.in_(list(uploaders)))
+    ).all()) if uploaders else {}
+
+    return {
+        "total": sum(by_status.values()),
+        "status": by_status,
+        "categories": [
+            {"id": cat_id, "name": cat_names.get(cat_id, "-"), "count": n}
+            for cat_id, n in categories.most_common()
+        ],
+        "uploaders": [
+            {"id": uid, "name": user_names.get(uid, "Unknown"), "count": n}
+            for uid, n in uploaders.most_common()
+        ],
+    }
+
+def compute_counters(db):
+    """Hitung ulang semua counter langsung dari tabel documents (GROUP BY)."""
+    doc = models.Document
+    live = doc.deleted_at == None
+    counts = Counter()
+    for status, n in db.execute(select(doc.status, func.count()).where(live).group_by(doc.status)):
+        counts[('status', '', status)] = n
+    for uploader, status, n in db.execute(
+        select(doc.uploaded_by, doc.status, func.count()).where(live).group_by(doc.uploaded_by, doc.status)
+    ):
+        counts[('uploader', uploader or '', status)] = n
+    for cat_id, status, n in db.execute(
+        select(models.DocumentCategory.category_id, doc.status, func.count())
+        .join(doc, doc.id == models.DocumentCategory.document_id)
+        .where(live)
+        .group_by(models.DocumentCategory.category_id, doc.status)
+    ):
+        counts[('category', str(cat_id), status)] = n
+    return counts
+
+def reconcile(db):
+    """Ganti isi tabel counter dengan hasil hitung ulang; return jumlah counter yang berubah (drift).
+
+    Baris counter dikunci dulu (FOR UPDATE) sehingga upload/status/delete yang berjalan bersamaan
+    menunggu, lalu menambahkan delta-nya di atas hasil rekonsiliasi.
+    """
+    current = Counter({
+        (d, r, s): n for d, r, s, n in db.execute(select(
+            models.DocumentCounter.dimension, models.DocumentCounter.ref_id,
+            models.DocumentCounter.status, models.DocumentCounter.doc_count
+        ).with_for_update())
+    })
+    expected = compute_counters(db)
+    drift = sum(1 for key in set(expected) | set(current) if expected.get(key, 0) != current.get(key, 0))
+    db.execute(delete(models.DocumentCounter))
+    apply(db, expected)
+    db.commit()
+    return drift
+
+@job_queue.handler('reconcile_document_counters')
+def run_reconcile(payload):
+    db = database.SessionLocal()
+    try:
+        drift = reconcile(db)
+        if drift:
+            logger.info(f"Document counters reconciled, fixed {drift} drifted counters")
+        if payload.get('repeat', True):
+            # Jadwalkan putaran berikutnya (key per slot waktu supaya tidak dobel)
+            enqueue_reconcile(db, delay=RECONCILE_INTERVAL)
+            db.commit()
+    finally:
+        db.close()
+    return drift
+
+def enqueue_reconcile(db, delay=0, repeat=True):
+    slot = int((time.time() + delay) // max(RECONCILE_INTERVAL, 1))
+    return job_queue.enqueue(
+        db, 'reconcile_document_counters', {'repeat': repeat},
+        idempotency_key=f"reconcile_document_counters:{slot}" if repeat else None, delay=delay
+    )
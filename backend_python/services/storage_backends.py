@@ -0,0 +1,111 @@
+import tempfile
+
+from services import drive_cache, storage_service
+
+# File Drive di bawah ukuran ini ditampung di memori saat cache nonaktif, selebihnya di disk
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+def drive_available():
+    """google-api-python-client terpasang; import-nya (berat) baru terjadi saat dipanggil."""
+    try:
+        from services import drive_service # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+class StorageBackend:
+    """Tempat byte file dokumen disimpan; dipilih dari documents.file_path."""
+
+    # True = byte harus diambil dari layanan lain (tidak selalu ada di disk lokal)
+    remote = False
+
+    def handles(self, file_path):
+        raise NotImplementedError
+
+    def available(self):
+        return True
+
+    def local_path(self, file_path):
+        """Path di disk yang bisa dikirim langsung (FileResponse / X-Accel-Redirect), atau None."""
+        raise NotImplementedError
+
+    def stream(self, file_path, chunk_size=drive_cache.READ_CHUNK_SIZE):
+        """Iterator bytes isi file."""
+        raise NotImplementedError
+
+    def open(self, file_path):
+        """File biner seekable (dipakai ekstraksi isi)."""
+        raise NotImplementedError
+
+class LocalBackend(StorageBackend):
+    """File di UPLOAD_DIR (content-addressed) atau file staging upload Drive."""
+
+    def handles(self, file_path):
+        return not file_path.startswith("http")
+
+    def local_path(self, file_path):
+        return storage_service.local_file(file_path)
+
+    def stream(self, file_path, chunk_size=drive_cache.READ_CHUNK_SIZE):
+        with open(file_path, "rb") as f:
+            while True:
+                data = f.read(chunk_size)
+                if not data:
+                    return
+                yield data
+
+    def open(self, file_path):
+        return open(file_path, "rb")
+
+class DriveBackend(StorageBackend):
+    """File di Google Drive (file_path = webViewLink), dibaca lewat cache disk read-through."""
+
+    remote = True
+
+    def handles(self, file_path):
+        return file_path.startswith("http")
+
+    def available(self):
+        return drive_available() and drive_cache.enabled()
+
+    def file_id(self, file_path):
+        from services import drive_service
+        file_id = drive_service.file_id_from_link(file_path)
+        if not file_id:
+            raise RuntimeError(f"Tidak bisa membaca file id dari {file_path}")
+        return file_id
+
+    def local_path(self, file_path):
+        # Hanya bila sudah lengkap di cache; miss dilayani lewat stream()
+        if not drive_cache.enabled():
+            return None
+        return drive_cache.get_cache().get_path(self.file_id(file_path))
+
+    def stream(self, file_path, chunk_size=drive_cache.READ_CHUNK_SIZE):
+        return drive_cache.get_cache().stream(self.file_id(file_path), chunk_size)
+
+    def open(self, file_path):
+        file_id = self.file_id(file_path)
+        if drive_cache.enabled():
+            return drive_cache.get_cache().open(file_id)
+        from services import drive_service
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+        drive_service.get_backend().download(file_id, spool, chunk_size=drive_cache.DOWNLOAD_CHUNK_SIZE)
+        spool.seek(0)
+        return spool
+
+local_backend = LocalBackend()
+drive_backend = DriveBackend()
+BACKENDS = (drive_backend, local_backend)
+
+def for_path(file_path):
+    for backend in BACKENDS:
+        if backend.handles(file_path):
+            return backend
+    return local_backend
+
+def open_file(file_path):
+    backend = for_path(file_path)
+    if not backend.available():
+        raise RuntimeError("Drive service tidak tersedia")
+    return backend.open(file_path)
@@ -0,0 +1,79 @@
+import hashlib
+import os
+import tempfile
+from urllib.parse import quote
+
+from starlette.concurrency import run_in_threadpool
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Default: file lokal hanya lewat /documents/{id}/download. true = folder upload juga di-mount
+# tanpa auth di /uploads (hanya untuk deploy lama yang masih memakai link /uploads/...)
+PUBLIC_UPLOADS = os.getenv("PUBLIC_UPLOADS", "false").lower() == "true"
+# Mis. "/protected-uploads/": byte file dikirim nginx (location internal yang menunjuk folder upload)
+ACCEL_REDIRECT_PREFIX = os.getenv("DOWNLOAD_ACCEL_PREFIX")
+
+class StagedUpload:
+    """File upload yang sudah ditulis ke file sementara, lengkap dengan SHA-256 dan ukurannya."""
+
+    def __init__(self, temp_path, sha256, size, extension):
+        self.temp_path = temp_path
+        self.sha256 = sha256
+        self.size = size
+        self.extension = extension
+
+    @property
+    def blob_name(self):
+        return f"{self.sha256}{self.extension}"
+
+    def open(self):
+        return open(self.temp_path, "rb")
+
+    def discard(self):
+        try:
+            os.remove(self.temp_path)
+        except FileNotFoundError:
+            pass
+
+def _safe_extension(filename):
+    ext = os.path.splitext(filename or "")[1].lower()
+    return ext if ext[1:].isalnum() and len(ext) <= 10 else ""
+
+async def stage_upload(upload_file, directory=None):
+    """Stream UploadFile per chunk ke file sementara sambil menghitung SHA-256 dan ukuran."""
+    digest = hashlib.sha256()
+    size = 0
+    fd, temp_path = tempfile.mkstemp(prefix=".upload-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await upload_file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                size += len(chunk)
+                await run_in_threadpool(out.write, chunk)
+    except Exception:
+        os.remove(temp_path)
+        raise
+    return StagedUpload(temp_path, digest.hexdigest(), size, _safe_extension(upload_file.filename))
+
+def commit_local(staged, directory):
+    """Pindahkan file sementara ke <directory>/<sha256><ext> secara atomik.
+
+    Jika blob dengan isi yang sama sudah ada, file sementara dibuang dan path lama dipakai.
+    """
+    final_path = os.path.join(directory, staged.blob_name)
+    if os.path.exists(final_path):
+        staged.discard()
+    else:
+        os.replace(staged.temp_path, final_path)
+    return final_path
+
+def local_file(file_path):
+    """Path file lokal milik dokumen, atau None bila bukan file lokal / sudah tidak ada."""
+    if not file_path or file_path.startswith("http") or not os.path.isfile(file_path):
+        return None
+    return file_path
+
+def accel_redirect_path(file_path):
+    return ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + quote(os.path.basename(file_path))
@@ -0,0 +1,142 @@
+import logging
+
+from sqlalchemy import func, select, delete
+from sqlalchemy.exc import IntegrityError
+
+import database, models
+from services import job_queue, stats_service
+
+MAX_TAG_LENGTH = 100
+BACKFILL_BATCH_SIZE = 500
+
+logger = logging.getLogger(__name__)
+
+def parse_list(value):
+    """'a, b,,a' -> ['a', 'b']: buang spasi, item kosong dan duplikat (urutan dipertahankan)."""
+    items = value.split(',') if isinstance(value, str) else (value or [])
+    seen = set()
+    result = []
+    for item in items:
+        item = str(item).strip()
+        if item and item not in seen:
+            seen.add(item)
+            result.append(item)
+    return result
+
+def normalize_tag(tag):
+    return tag.strip().lower()[:MAX_TAG_LENGTH]
+
+def category_ids(db, names, created_by=None):
+    """Id kategori untuk setiap nama; kategori yang belum ada dibuat."""
+    names = parse_list(names)
+    if not names:
+        return []
+    rows = db.execute(select(models.Category.id, models.Category.name).where(models.Category.name.in_(names))).all()
+    ids = {name: cat_id for cat_id, name in rows}
+    for name in names:
+        if name in ids:
+            continue
+        try:
+            with db.begin_nested():
+                cat = models.Category(name=name, created_by=created_by)
+                db.add(cat)
+            ids[name] = cat.id
+        except IntegrityError:
+            # Dibuat bersamaan oleh request lain
+            ids[name] = db.execute(select(models.Category.id).where(models.Category.name == name)).scalar_one()
+    return [ids[name] for name in names]
+
+def set_document_terms(db, doc_id, tags, categories, created_by=None):
+    """Tulis ulang baris document_tags/document_categories satu dokumen (tanpa commit); return id kategori."""
+    db.execute(delete(models.DocumentTag).where(models.DocumentTag.document_id == doc_id))
+    db.execute(delete(models.DocumentCategory).where(models.DocumentCategory.document_id == doc_id))
+    for tag in {normalize_tag(t) for t in parse_list(tags)}:
+        if tag:
+            db.add(models.DocumentTag(document_id=doc_id, tag=tag))
+    cat_ids = set(category_ids(db, categories, created_by=created_by))
+    for cat_id in cat_ids:
+        db.add(models.DocumentCategory(document_id=doc_id, category_id=cat_id))
+    return cat_ids
+
+def filter_documents(query, tags=None, categories=None):
+    """Filter Select dokumen lewat index join table; nilai dalam satu parameter digabung OR."""
+    tags = [normalize_tag(t) for t in parse_list(tags)]
+    if tags:
+        query = query.where(models.Document.id.in_(
+            select(models.DocumentTag.document_id).where(models.DocumentTag.tag.in_(tags))
+        ))
+    categories = parse_list(categories)
+    if categories:
+        query = query.where(models.Document.id.in_(
+            select(models.DocumentCategory.document_id)
+            .join(models.Category, models.Category.id == models.DocumentCategory.category_id)
+            .where(models.Category.name.in_(categories))
+        ))
+    return query
+
+def _visible(query, link_model, statuses):
+    query = query.join(models.Document, models.Document.id == link_model.document_id) \
+        .where(models.Document.deleted_at == None)
+    if statuses:
+        query = query.where(models.Document.status.in_(statuses))
+    return query
+
+def facets(db, statuses=None, limit=100):
+    """Jumlah dokumen (yang terlihat) per kategori dan per tag."""
+    count = func.count(models.DocumentCategory.document_id)
+    category_query = _visible(
+        select(models.DocumentCategory.category_id, models.Category.name, count)
+        .join(models.Category, models.Category.id == models.DocumentCategory.category_id),
+        models.DocumentCategory, statuses
+    ).group_by(models.DocumentCategory.category_id, models.Category.name).order_by(count.desc(), models.Category.name)
+
+    count = func.count(models.DocumentTag.document_id)
+    tag_query = _visible(select(models.DocumentTag.tag, count), models.DocumentTag, statuses) \
+        .group_by(models.DocumentTag.tag).order_by(count.desc(), models.DocumentTag.tag).limit(limit)
+
+    return {
+        "categories": [
+            {"id": cat_id, "name": name, "count": n} for cat_id, name, n in db.execute(category_query)
+        ],
+        "tags": [{"tag": tag, "count": n} for tag, n in db.execute(tag_query)],
+    }
+
+@job_queue.handler('backfill_document_terms')
+def backfill(payload):
+    """Job: isi join table dari kolom JSON tags/category untuk semua dokumen, per batch.
+
+    Idempoten (baris per dokumen ditulis ulang), jadi aman diulang dari awal saat retry.
+    """
+    batch_size = payload.get('batch_size', BACKFILL_BATCH_SIZE)
+    last_id = ''
+    total = 0
+    while True:
+        db = database.SessionLocal()
+        try:
+            rows = db.execute(
+                select(models.Document.id, models.Document.tags, models.Document.category, models.Document.uploaded_by)
+                .where(models.Document.id > last_id)
+                .order_by(models.Document.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            for doc_id, tags, categories, uploaded_by in rows:
+                set_document_terms(db, doc_id, tags, categories, created_by=uploaded_by)
+            db.commit()
+        finally:
+            db.close()
+        last_id = rows[-1].id
+        total += len(rows)
+    logger.info(f"Backfilled tags/categories for {total} documents")
+    # Counter per kategori bergantung pada join table; hitung ulang sekali
+    db = database.SessionLocal()
+    try:
+        stats_service.enqueue_reconcile(db, repeat=False)
+        db.commit()
+    finally:
+        db.close()
+    return total
+
+def enqueue_backfill(db):
+    return job_queue.enqueue(db, 'backfill_document_terms', {})
@@ -0,0 +1,222 @@
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+from sqlalchemy import select
+
+import database, models, response_cache
+from services import embedding_service, job_queue
+
+INDEX_TTL_SECONDS = int(os.getenv("VECTOR_INDEX_TTL", "300"))
+# Bobot skor semantik pada mode hybrid (sisanya skor keyword BM25)
+HYBRID_ALPHA = float(os.getenv("HYBRID_ALPHA", "0.5"))
+STATUS_CODES = {"pending": 0, "approved": 1, "rejected": 2}
+BACKFILL_BATCH_SIZE = 200
+
+logger = logging.getLogger(__name__)
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+class VectorIndex:
+    """Matriks float32 in-memory (baris sudah dinormalisasi) dengan id yang sejajar per baris."""
+
+    def __init__(self, dim=None):
+        self._lock = threading.RLock()
+        self._rebuild_lock = threading.Lock()
+        self.dim = dim
+        self._reset()
+
+    def _reset(self):
+        self.matrix = np.zeros((0, self.dim or 0), dtype=np.float32)
+        self.status = np.zeros(0, dtype=np.int8)
+        self.ids = []
+        self.row_of = {}
+        self.size = 0
+        self.missing = 0  # dokumen tanpa embedding yang cocok dengan embedder aktif (diisi job backfill)
+        self.loaded_at = None
+
+    @property
+    def is_loaded(self):
+        return self.loaded_at is not None
+
+    def is_stale(self):
+        return not self.is_loaded or time.monotonic() - self.loaded_at > INDEX_TTL_SECONDS
+
+    def _grow(self, needed):
+        capacity = self.matrix.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2, 64)
+        matrix = np.zeros((new_capacity, self.dim), dtype=np.float32)
+        matrix[:self.size] = self.matrix[:self.size]
+        status = np.zeros(new_capacity, dtype=np.int8)
+        status[:self.size] = self.status[:self.size]
+        self.matrix, self.status = matrix, status
+
+    def _add_many(self, ids, vectors, statuses):
+        vectors = _normalize(np.asarray(vectors, dtype=np.float32))
+        for doc_id, vec, status in zip(ids, vectors, statuses):
+            row = self.row_of.get(doc_id)
+            if row is None:
+                self._grow(self.size + 1)
+                row = self.size
+                self.ids.append(doc_id)
+                self.row_of[doc_id] = row
+                self.size += 1
+            self.matrix[row] = vec
+            self.status[row] = STATUS_CODES.get(status, 0)
+
+    def _remove(self, doc_id):
+        row = self.row_of.pop(doc_id, None)
+        if row is None:
+            return
+        # Pindahkan baris terakhir ke slot yang kosong agar matriks tetap rapat
+        last = self.size - 1
+        if row != last:
+            moved = self.ids[last]
+            self.matrix[row] = self.matrix[last]
+            self.status[row] = self.status[last]
+            self.ids[row] = moved
+            self.row_of[moved] = row
+        self.ids.pop()
+        self.size -= 1
+
+    def rebuild(self, db):
+        """Muat embedding yang sudah tersimpan (read-only); yang belum ada diisi job 'backfill_embeddings'."""
+        dim = embedding_service.get_embedder().dim
+        rows = db.query(
+            models.Document.id,
+            models.Document.embedding,
+            models.Document.status,
+        ).filter(models.Document.deleted_at == None).all()
+        usable = [r for r in rows if _usable(r.embedding, dim)]
+
+        with self._lock:
+            self.dim = dim
+            self._reset()
+            self._grow(len(usable))
+            if usable:
+                self._add_many([r.id for r in usable], [r.embedding for r in usable], [r.status for r in usable])
+            self.missing = len(rows) - len(usable)
+            self.loaded_at = time.monotonic()
+
+    def ensure_fresh(self, db):
+        if self.is_stale():
+            self.rebuild(db)
+
+    def refresh(self):
+        """ensure_fresh dengan session sendiri; dipanggil lewat run_in_threadpool dari route async."""
+        with self._rebuild_lock:
+            if not self.is_stale():
+                return
+            db = database.SessionLocal()
+            try:
+                self.rebuild(db)
+            finally:
+                db.close()
+
+    def upsert(self, doc):
+        with self._lock:
+            if not self.is_loaded or not doc.embedding or len(doc.embedding) != self.dim:
+                return
+            if doc.deleted_at is not None:
+                self._remove(doc.id)
+            else:
+                self._add_many([doc.id], [doc.embedding], [doc.status])
+
+    def set_status(self, doc_id, status):
+        with self._lock:
+            row = self.row_of.get(doc_id)
+            if row is not None:
+                self.status[row] = STATUS_CODES.get(status, 0)
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._remove(doc_id)
+
+    def search_batch(self, query_vectors, k=50, statuses=None, min_score=0.0):
+        """Cosine top-k untuk beberapa query sekaligus; kembalikan list [(doc_id, score), ...] per query."""
+        queries = _normalize(np.atleast_2d(np.asarray(query_vectors, dtype=np.float32)))
+        with self._lock:
+            if self.size == 0:
+                return [[] for _ in range(len(queries))]
+            scores = queries @ self.matrix[:self.size].T  # (n_query, n_doc)
+            if statuses:
+                allowed = np.isin(self.status[:self.size], [STATUS_CODES[s] for s in statuses])
+                scores[:, ~allowed] = -np.inf
+            ids = list(self.ids)
+
+        k = min(k, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for qi, cols in enumerate(top):
+            cols = cols[np.argsort(-scores[qi, cols])]
+            results.append([(ids[c], float(scores[qi, c])) for c in cols if scores[qi, c] > min_score])
+        return results
+
+    def search(self, q, k=50, statuses=None, min_score=0.0):
+        query_vec = embedding_service.get_embedder().embed([q])
+        return self.search_batch(query_vec, k=k, statuses=statuses, min_score=min_score)[0]
+
+def _usable(embedding, dim):
+    return bool(embedding) and len(embedding) == dim
+
+def hybrid_rank(keyword_hits, vector_hits, alpha=HYBRID_ALPHA):
+    """Gabungkan skor BM25 (dinormalisasi ke 0..1) dengan skor cosine."""
+    max_kw = max((s for _, s in keyword_hits), default=0.0) or 1.0
+    combined = {}
+    for doc_id, score in keyword_hits:
+        combined[doc_id] = (1 - alpha) * (score / max_kw)
+    for doc_id, score in vector_hits:
+        combined[doc_id] = combined.get(doc_id, 0.0) + alpha * max(score, 0.0)
+    return sorted(combined.items(), key=lambda item: (-item[1], item[0]))
+
+# Index bersama untuk satu proses worker
+vector_index = VectorIndex()
+
+@job_queue.handler('backfill_embeddings')
+def backfill(payload):
+    """Job: hitung embedding dokumen yang belum punya (atau dimensinya beda dengan embedder aktif), per batch.
+
+    Idempoten (hanya mengisi yang kosong/tidak cocok), jadi aman diulang dari awal saat retry.
+    """
+    batch_size = payload.get('batch_size', BACKFILL_BATCH_SIZE)
+    dim = embedding_service.get_embedder().dim
+    last_id = ''
+    total = 0
+    while True:
+        db = database.SessionLocal(expire_on_commit=False)
+        try:
+            rows = db.execute(
+                select(models.Document.id, models.Document.embedding)
+                .where(models.Document.deleted_at == None, models.Document.id > last_id)
+                .order_by(models.Document.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            missing = [doc_id for doc_id, embedding in rows if not _usable(embedding, dim)]
+            if not missing:
+                continue
+            docs = db.query(models.Document).filter(models.Document.id.in_(missing)).all()
+            embedding_service.embed_documents(docs)
+            # Hasil mode semantic/hybrid berubah
+            response_cache.bump(db, "documents")
+            db.commit()
+        finally:
+            db.close()
+        for doc in docs:
+            vector_index.upsert(doc)
+        total += len(docs)
+    logger.info(f"Backfilled embeddings for {total} documents")
+    return total
+
+def enqueue_backfill(db, idempotency_key=None):
+    """Antrikan backfill ulang, mis. setelah mengganti EMBEDDING_BACKEND (dimensi embedding berubah)."""
+    return job_queue.enqueue(db, 'backfill_embeddings', {}, idempotency_key=idempotency_key)
@@ -0,0 +1,89 @@
+"""Fixture bersama: app dengan database SQLite sementara dan backend Drive palsu.
+
+Env diset sebelum modul aplikasi di-import (database/engine dibuat saat import).
+Jalankan dari backend_python: python -m pytest -q
+"""
+import os
+import sys
+import tempfile
+
+TMP_DIR = tempfile.mkdtemp(prefix="buku-saku-test-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(TMP_DIR, 'test.sqlite')}",
+    "DB_ASYNC": "false",
+    "ENABLE_GDRIVE": "false",
+    "LEAN_STARTUP": "false",
+    "DRIVE_BACKEND": "fake",
+    "DRIVE_CACHE_DIR": os.path.join(TMP_DIR, "drive-cache"),
+    "EMBEDDING_BACKEND": "local",
+    # Retry job cepat supaya jalur gagal -> ulang bisa dites
+    "JOB_BACKOFF_BASE": "0.05",
+})
+os.chdir(TMP_DIR)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+
+import auth_utils, database, main, models, response_cache
+from services import job_queue, search_service, vector_index
+
+PASSWORD = "rahasia"
+
+@pytest.fixture(scope="session")
+def client():
+    # with: jalankan event startup (job worker untuk job yang diantrekan migrasi)
+    with TestClient(main.app) as client:
+        yield client
+
+@pytest.fixture(autouse=True)
+def clean_db(client):
+    yield
+    job_queue.wait_idle(timeout=30)
+    db = database.SessionLocal()
+    try:
+        for table in reversed(database.Base.metadata.sorted_tables):
+            db.execute(table.delete())
+        db.commit()
+    finally:
+        db.close()
+    auth_utils.user_cache.clear()
+    response_cache.body_cache.clear()
+    search_service.search_index.loaded_at = None
+    vector_index.vector_index.loaded_at = None
+
+@pytest.fixture
+def make_user(client):
+    """make_user(email, role) -> (user_id, header Authorization)."""
+    def make(email, role="user"):
+        db = database.SessionLocal()
+        try:
+            user = models.User(name=email.split("@")[0], email=email, role=role, is_active=True,
+                               password=auth_utils.get_password_hash(PASSWORD))
+            db.add(user)
+            db.commit()
+            user_id = user.id
+        finally:
+            db.close()
+        token = client.post("/auth/login", json={"email": email, "password": PASSWORD}).json()["access_token"]
+        return user_id, {"Authorization": f"Bearer {token}"}
+    return make
+
+@pytest.fixture
+def upload(client):
+    """upload(headers, title, ...) -> id dokumen; wait=True menunggu job upload/ekstraksi selesai."""
+    def upload(headers, title, body=b"isi dokumen", tags="a,b", category="K3", filename="a.txt", wait=True):
+        response = client.post("/documents/", headers=headers,
+                               data={"title": title, "tags": tags, "category": category},
+                               files={"file": (filename, body, "text/plain")})
+        assert response.status_code == 200, response.text
+        if wait:
+            assert job_queue.wait_idle(timeout=30)
+        return response.json()["document_id"]
+    return upload
+
+@pytest.fixture
+def gdrive(monkeypatch):
+    """Upload lewat jalur Google Drive (FakeDriveBackend, file di direktori sementara)."""
+    from routers import documents
+    monkeypatch.setattr(documents, "ENABLE_GDRIVE", True)
@@ -0,0 +1,15 @@
+def test_list_pages_follow_next_cursor(client, make_user, upload):
+    # Frontend mengikuti next_cursor sampai habis; tiap dokumen muncul tepat sekali
+    _, headers = make_user("admin@example.com", "admin")
+    ids = {upload(headers, f"Dokumen {i}", body=f"isi {i}".encode(), wait=False) for i in range(5)}
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/documents/", params=params, headers=headers).json()
+        assert len(page["results"]) <= 2
+        seen += [item["id"] for item in page["results"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert sorted(seen) == sorted(ids)
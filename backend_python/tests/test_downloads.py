@@ -0,0 +1,69 @@
+import os
+import time
+
+import auth_utils, database, models
+from test_streaming_sessions import held_while_streaming
+
+def test_download_local_file(client, make_user, upload):
+    _, headers = make_user("admin@example.com", "admin")
+    doc_id = upload(headers, "Laporan", body=b"isi lokal")
+
+    response = client.get(f"/documents/{doc_id}/download", headers=headers)
+    assert response.status_code == 200
+    assert response.content == b"isi lokal"
+    assert response.headers["content-disposition"].startswith("inline")
+
+    cached = client.get(f"/documents/{doc_id}/download", headers={**headers, "If-None-Match": response.headers["etag"]})
+    assert cached.status_code == 304
+
+def test_uploads_are_not_public_by_default(client, make_user, upload):
+    _, headers = make_user("admin@example.com", "admin")
+    upload(headers, "Laporan", body=b"isi lokal")
+    item = client.get("/documents/", headers=headers).json()["results"][0]
+    assert item["file_url"] == item["download_url"]
+
+    db = database.SessionLocal()
+    try:
+        file_path = db.get(models.Document, item["id"]).file_path
+    finally:
+        db.close()
+    assert client.get(f"/uploads/{os.path.basename(file_path)}").status_code == 404
+
+def test_download_releases_session(make_user, upload):
+    _, headers = make_user("admin@example.com", "admin")
+    doc_id = upload(headers, "Laporan")
+    held, status = held_while_streaming(f"/documents/{doc_id}/download", headers)
+    assert (held, status) == (0, 200)
+
+def test_drive_miss_releases_session(client, make_user, upload, gdrive):
+    _, headers = make_user("admin@example.com", "admin")
+    body = b"x" * (3 * 1024 * 1024)
+    doc_id = upload(headers, "Besar", body=body)
+
+    held, status = held_while_streaming(f"/documents/{doc_id}/download", headers)
+    assert (held, status) == (0, 200)
+    assert client.get(f"/documents/{doc_id}/download", headers=headers).content == body
+
+def test_download_url_is_signed(client, make_user, upload):
+    # Frontend membuka download_url lewat anchor biasa: link sudah ditandatangani, tanpa JWT di query string
+    _, headers = make_user("admin@example.com", "admin")
+    upload(headers, "Laporan", body=b"isi lokal")
+    item = client.get("/documents/", headers=headers).json()["results"][0]
+    assert item["download_url"].startswith(f"/documents/{item['id']}/download?v=")
+    assert "access_token" not in item["download_url"]
+
+    response = client.get(item["download_url"])
+    assert response.status_code == 200
+    assert response.content == b"isi lokal"
+
+    path, query = item["download_url"].split("?")
+    params = dict(part.split("=") for part in query.split("&"))
+    forged = {**params, "sig": "0" * 32}
+    assert client.get(path, params=forged).status_code == 401
+    expired_at = int(time.time()) - 1
+    expired = {**params, "expires": expired_at, "sig": auth_utils._download_signature(item["id"], expired_at)}
+    assert client.get(path, params=expired).status_code == 401
+    # Tanda tangan hanya berlaku untuk dokumen yang sama
+    other = upload(headers, "Lain", body=b"isi lain")
+    assert client.get(f"/documents/{other}/download", params=params).status_code == 401
+    assert client.get(path).status_code == 401
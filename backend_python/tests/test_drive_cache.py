@@ -0,0 +1,114 @@
+"""DiskLRUCache dengan FakeDriveBackend (tanpa jaringan)."""
+import os
+import threading
+
+import pytest
+
+from services import drive_cache
+from services.drive_service import FakeDriveBackend
+
+def put(backend, tmp_path, data):
+    source = tmp_path / f"source-{len(data)}-{os.urandom(4).hex()}"
+    source.write_bytes(data)
+    return backend.upload(str(source), source.name, "application/octet-stream")["id"]
+
+@pytest.fixture
+def backend(tmp_path):
+    return FakeDriveBackend(str(tmp_path / "drive"))
+
+def make_cache(tmp_path, backend, max_bytes=1024 * 1024, fetch=None):
+    fetch = fetch or (lambda key, fileobj: backend.download(key, fileobj, chunk_size=4096))
+    return drive_cache.DiskLRUCache(str(tmp_path / "cache"), max_bytes, fetch)
+
+class GatedFetch:
+    """Fetch yang menulis satu chunk lalu menunggu izin untuk tiap chunk berikutnya."""
+
+    def __init__(self, backend, chunk_size):
+        self.backend = backend
+        self.chunk_size = chunk_size
+        self.calls = 0
+        self.started = threading.Event()
+        self.step = threading.Semaphore(0)
+
+    def __call__(self, key, fileobj):
+        self.calls += 1
+        with open(os.path.join(self.backend.root, key), "rb") as f:
+            while True:
+                data = f.read(self.chunk_size)
+                if not data:
+                    return
+                fileobj.write(data)
+                self.started.set()
+                assert self.step.acquire(timeout=10)
+
+def test_concurrent_misses_share_one_download(tmp_path, backend):
+    data = os.urandom(64 * 1024)
+    key = put(backend, tmp_path, data)
+    fetch = GatedFetch(backend, 16 * 1024)
+    cache = make_cache(tmp_path, backend, fetch=fetch)
+
+    first = cache.stream(key, chunk_size=8 * 1024)
+    assert fetch.started.wait(5)
+    second = cache.stream(key, chunk_size=8 * 1024)
+    for _ in range(4):
+        fetch.step.release()
+
+    assert b"".join(first) == data
+    assert b"".join(second) == data
+    assert fetch.calls == 1
+    stats = cache.stats()
+    assert (stats["misses"], stats["coalesced"], stats["files"]) == (1, 1, 1)
+    assert cache.get_path(key) is not None
+
+def test_follow_yields_bytes_before_download_finishes(tmp_path, backend):
+    data = os.urandom(48 * 1024)
+    key = put(backend, tmp_path, data)
+    fetch = GatedFetch(backend, 16 * 1024)
+    cache = make_cache(tmp_path, backend, fetch=fetch)
+
+    chunks = cache.stream(key, chunk_size=16 * 1024)
+    # Chunk pertama terbaca selagi fetch masih menunggu (download belum selesai)
+    assert next(chunks) == data[:16 * 1024]
+    assert cache.stats()["filling"] == 1
+    for _ in range(3):
+        fetch.step.release()
+    assert next(chunks) + b"".join(chunks) == data[16 * 1024:]
+    assert cache.stats()["filling"] == 0
+
+def test_follow_raises_when_download_fails(tmp_path, backend, caplog):
+    def failing(key, fileobj):
+        fileobj.write(b"sebagian")
+        raise IOError("koneksi putus")
+
+    cache = make_cache(tmp_path, backend, fetch=failing)
+    with pytest.raises(RuntimeError, match="koneksi putus"):
+        b"".join(cache.stream("tidak-ada"))
+    assert cache.stats()["files"] == 0
+    assert [name for name in os.listdir(cache.directory)] == []
+    assert any(r.name == "services.drive_cache" and "koneksi putus" in r.getMessage() for r in caplog.records)
+
+def test_lru_eviction_keeps_recently_used(tmp_path, backend):
+    size = 40 * 1024
+    keys = [put(backend, tmp_path, os.urandom(size)) for _ in range(3)]
+    cache = make_cache(tmp_path, backend, max_bytes=2 * size + 1)
+
+    for key in keys[:2]:
+        b"".join(cache.stream(key))
+    assert cache.get_path(keys[0]) is not None  # keys[0] jadi yang terbaru dipakai
+    b"".join(cache.stream(keys[2]))
+
+    assert cache.get_path(keys[1]) is None
+    assert not os.path.exists(os.path.join(cache.directory, keys[1]))
+    assert cache.get_path(keys[0]) is not None and cache.get_path(keys[2]) is not None
+    stats = cache.stats()
+    assert (stats["files"], stats["bytes"], stats["evictions"]) == (2, 2 * size, 1)
+
+def test_restart_reloads_entries_and_drops_partial_fills(tmp_path, backend):
+    key = put(backend, tmp_path, b"isi file")
+    cache = make_cache(tmp_path, backend)
+    b"".join(cache.stream(key))
+    open(os.path.join(cache.directory, drive_cache.TEMP_PREFIX + "sisa"), "wb").close()
+
+    reloaded = make_cache(tmp_path, backend)
+    assert reloaded.get_path(key) is not None
+    assert os.listdir(reloaded.directory) == [key]
@@ -0,0 +1,116 @@
+"""Upload lewat jalur Drive: status uploading -> stored, dan jalur gagal."""
+import os
+import threading
+
+import pytest
+
+import database, models
+from services import drive_service, drive_upload_service, job_queue
+
+class GatedDrive(drive_service.FakeDriveBackend):
+    def __init__(self, root):
+        super().__init__(root)
+        self.release = threading.Event()
+
+    def upload(self, path, filename, mimetype, folder_id=None):
+        assert self.release.wait(10)
+        return super().upload(path, filename, mimetype, folder_id)
+
+class BrokenDrive(drive_service.FakeDriveBackend):
+    def upload(self, path, filename, mimetype, folder_id=None):
+        raise IOError("Drive tidak bisa dihubungi")
+
+def stored(doc_id):
+    db = database.SessionLocal()
+    try:
+        doc = db.get(models.Document, doc_id)
+        return doc.storage_status, doc.file_path, doc.content
+    finally:
+        db.close()
+
+@pytest.fixture
+def drive(monkeypatch, tmp_path, gdrive):
+    def use(backend_class):
+        backend = backend_class(str(tmp_path / "drive"))
+        monkeypatch.setattr(drive_service, "_backend", backend)
+        return backend
+    return use
+
+def test_upload_is_stored_on_drive_in_background(client, make_user, upload, drive):
+    backend = drive(GatedDrive)
+    _, headers = make_user("admin@example.com", "admin")
+    doc_id = upload(headers, "Prosedur", body=b"isi prosedur drive", wait=False)
+
+    status, staging, _ = stored(doc_id)
+    assert status == "uploading"
+    assert os.path.exists(staging)
+    item = client.get("/documents/", headers=headers).json()["results"][0]
+    assert item["storage_status"] == "uploading"
+    # Path staging tidak pernah dibuka ke luar
+    assert item["file_url"] == item["download_url"]
+
+    backend.release.set()
+    assert job_queue.wait_idle(timeout=30)
+    status, file_path, content = stored(doc_id)
+    assert status == "stored"
+    assert file_path.startswith("https://drive.google.com/file/d/")
+    assert content == "isi prosedur drive"
+    # File staging dihapus setelah ekstraksi membaca salinan lokalnya
+    assert not os.path.exists(staging)
+    file_id = drive_service.file_id_from_link(file_path)
+    with open(os.path.join(backend.root, file_id), "rb") as f:
+        assert f.read() == b"isi prosedur drive"
+    item = client.get("/documents/", headers=headers).json()["results"][0]
+    assert (item["storage_status"], item["file_url"]) == ("stored", file_path)
+
+def test_failed_drive_upload_marks_document_failed(client, make_user, upload, drive):
+    drive(BrokenDrive)
+    _, headers = make_user("admin@example.com", "admin")
+    doc_id = upload(headers, "Prosedur", body=b"isi prosedur")
+
+    status, staging, _ = stored(doc_id)
+    assert status == "failed"
+    # File staging dibiarkan supaya upload bisa diulang
+    assert os.path.exists(staging)
+    db = database.SessionLocal()
+    try:
+        job = db.query(models.Job).filter(models.Job.idempotency_key == f"drive_upload:{doc_id}").one()
+        assert (job.status, job.attempts) == ("failed", job.max_attempts)
+        assert "Drive tidak bisa dihubungi" in job.last_error
+    finally:
+        db.close()
+    assert client.get("/documents/", headers=headers).json()["results"][0]["storage_status"] == "failed"
+
+def test_serverless_upload_is_stored_before_response(client, make_user, upload, drive, monkeypatch):
+    backend = drive(drive_service.FakeDriveBackend)
+    monkeypatch.setattr(drive_upload_service, "UPLOAD_INLINE", True)
+    _, headers = make_user("admin@example.com", "admin")
+    doc_id = upload(headers, "Prosedur", body=b"isi prosedur serverless", wait=False)
+
+    status, file_path, _ = stored(doc_id)
+    assert status == "stored"
+    assert file_path.startswith("https://drive.google.com/file/d/")
+    assert os.listdir(backend.root)
+    # Tidak ada job yang bergantung pada file staging lokal
+    db = database.SessionLocal()
+    try:
+        assert db.query(models.Job).filter(models.Job.kind == "drive_upload").count() == 0
+    finally:
+        db.close()
+
+    # Ekstraksi membaca dari Drive
+    assert job_queue.wait_idle(timeout=30)
+    assert stored(doc_id)[2] == "isi prosedur serverless"
+
+def test_serverless_upload_failure_is_reported(client, make_user, drive, monkeypatch):
+    drive(BrokenDrive)
+    monkeypatch.setattr(drive_upload_service, "UPLOAD_INLINE", True)
+    _, headers = make_user("admin@example.com", "admin")
+    response = client.post("/documents/", data={"title": "Prosedur"}, files={"file": ("a.txt", b"isi", "text/plain")},
+                           headers=headers)
+    assert response.status_code == 500
+    db = database.SessionLocal()
+    try:
+        assert db.query(models.Document).count() == 0
+    finally:
+        db.close()
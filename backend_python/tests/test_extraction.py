@@ -0,0 +1,61 @@
+import database, models
+from services import embedding_service, extraction_service
+
+def extraction_job(doc_id):
+    db = database.SessionLocal()
+    try:
+        doc = db.get(models.Document, doc_id)
+        job = db.query(models.Job).filter(models.Job.idempotency_key == f"extract_content:{doc_id}").one()
+        return doc.content, job.status, job.attempts
+    finally:
+        db.close()
+
+def test_job_done_only_after_results_are_written(make_user, upload):
+    _, headers = make_user("admin@example.com", "admin")
+    doc_id = upload(headers, "Catatan", body=b"isi catatan keselamatan")
+    assert extraction_job(doc_id) == ("isi catatan keselamatan", "done", 1)
+
+def test_failed_write_retries_job(monkeypatch, make_user, upload):
+    calls = []
+    write_results = extraction_service.write_results
+
+    def flaky(batch):
+        calls.append([result.doc_id for result in batch])
+        if len(calls) == 1:
+            raise RuntimeError("database sedang tidak tersedia")
+        write_results(batch)
+
+    monkeypatch.setattr(extraction_service, "write_results", flaky)
+    _, headers = make_user("admin@example.com", "admin")
+    doc_id = upload(headers, "Catatan", body=b"isi catatan")
+    assert len(calls) == 2
+    assert extraction_job(doc_id) == ("isi catatan", "done", 2)
+
+def test_embedding_failure_queues_backfill(monkeypatch, make_user, upload):
+    embedder = embedding_service.get_embedder()
+    calls = []
+
+    class FlakyEmbedder:
+        dim = embedder.dim
+
+        def embed(self, texts):
+            calls.append(len(texts))
+            if len(calls) == 1:
+                raise RuntimeError("layanan embedding tidak tersedia")
+            return embedder.embed(texts)
+
+    monkeypatch.setattr(embedding_service, "_embedder", FlakyEmbedder())
+    _, headers = make_user("admin@example.com", "admin")
+    doc_id = upload(headers, "Catatan", body=b"isi catatan")
+
+    # Isi tetap tersimpan; embedding diisi job backfill yang ikut di-commit bersama hasil ekstraksi
+    db = database.SessionLocal()
+    try:
+        doc = db.get(models.Document, doc_id)
+        assert doc.content == "isi catatan"
+        assert doc.embedding is not None
+        job = db.query(models.Job).filter(models.Job.kind == "backfill_embeddings").one()
+        assert job.idempotency_key.startswith("backfill_embeddings:extract:")
+        assert job.status == "done"
+    finally:
+        db.close()
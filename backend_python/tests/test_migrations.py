@@ -0,0 +1,28 @@
+import pytest
+from sqlalchemy import create_engine, inspect
+
+import database, migrate, migrations
+
+HOT_QUERIES = migrate.hot_queries()
+
+def test_hot_queries_cover_next_pages():
+    assert sum("next page" in name for name, _, _ in HOT_QUERIES) >= 3
+
+@pytest.mark.parametrize("name,statement,expected_index", HOT_QUERIES, ids=[q[0] for q in HOT_QUERIES])
+def test_hot_query_uses_index(name, statement, expected_index):
+    with database.engine.connect() as conn:
+        plan = migrate.explain(conn, statement)
+    assert any(expected_index in line for line in plan), plan
+
+def test_migrations_build_models_schema(tmp_path):
+    # Database kosong yang hanya dibangun lewat migrasi harus sama dengan models.py
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.sqlite'}")
+    try:
+        migrations.upgrade(engine)
+        assert migrations.pending(engine) == []
+        inspector = inspect(engine)
+        for table in database.Base.metadata.sorted_tables:
+            assert {c["name"] for c in inspector.get_columns(table.name)} == {c.name for c in table.columns}, table.name
+            assert {i.name for i in table.indexes} <= {i["name"] for i in inspector.get_indexes(table.name)}, table.name
+    finally:
+        engine.dispose()
@@ -0,0 +1,64 @@
+"""Stream SSE: notifikasi yang dibuat proses lain (tanpa broker proses ini) tetap sampai ke klien."""
+import asyncio
+
+import database, main, models
+from routers import notifications
+
+def add_notification(user_id, message):
+    # Seperti job fan-out di proses lain: baris di DB, tanpa publish ke broker proses ini
+    db = database.SessionLocal()
+    try:
+        db.add(models.Notification(user_id=user_id, message=message, type="document_approved"))
+        db.commit()
+    finally:
+        db.close()
+
+def stream_until(path, predicate, timeout=10):
+    """Baca body /notifications/stream lewat ASGI sampai predicate(body) benar; return body."""
+    body = []
+
+    async def run():
+        done = asyncio.Event()
+
+        async def receive():
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.body":
+                body.append(message.get("body", b"").decode())
+                if predicate("".join(body)):
+                    done.set()
+
+        path_only, _, query = path.partition("?")
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": path_only, "raw_path": path_only.encode(), "root_path": "",
+            "query_string": query.encode(), "server": ("testserver", 80), "client": ("testclient", 50000),
+            "headers": [],
+        }
+        app = asyncio.create_task(main.app(scope, receive, send))
+        await asyncio.wait_for(done.wait(), timeout)
+        await asyncio.wait_for(app, timeout)
+
+    asyncio.run(run())
+    return "".join(body)
+
+def test_stream_polls_notifications_from_other_processes(make_user, monkeypatch):
+    monkeypatch.setattr(notifications, "HEARTBEAT_SECONDS", 0.05)
+    user_id, headers = make_user("sse@example.com")
+    token = headers["Authorization"].split()[1]
+    add_notification(user_id, "Sudah ada sebelum terhubung")
+
+    def after_connect(body):
+        if "event: unread" in body and "Dari proses lain" not in body and not after_connect.added:
+            after_connect.added = True
+            add_notification(user_id, "Dari proses lain")
+        return "Dari proses lain" in body
+    after_connect.added = False
+
+    body = stream_until(f"/notifications/stream?access_token={token}", after_connect)
+    assert '"unread": 1' in body
+    # Notifikasi lama sudah terhitung di unread, tidak dikirim ulang; yang baru dikirim sekali
+    assert "Sudah ada sebelum terhubung" not in body
+    assert body.count("Dari proses lain") == 1
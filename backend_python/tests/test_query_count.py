@@ -0,0 +1,87 @@
+"""Guard N+1: jumlah statement SQL per request tidak boleh tumbuh dengan jumlah dokumen/uploader."""
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, insert
+
+import auth_utils, database, models
+
+DOCUMENT_COUNT = 1000
+UPLOADER_COUNT = 25
+# Per request: versi tabel (ETag), halaman dokumen + uploader (join), favorit, lookup user (cache miss)
+LIST_STATEMENT_LIMIT = 5
+# Search menambah rebuild index (sekali, saat index kosong)
+SEARCH_STATEMENT_LIMIT = 6
+
+@contextmanager
+def count_statements():
+    """Hitung statement dari thread request (job worker / writer ekstraksi diabaikan)."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not threading.current_thread().name.startswith(("job-worker", "extract-writer")):
+            statements.append(statement)
+
+    event.listen(database.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(database.engine, "before_cursor_execute", before_cursor_execute)
+
+def seed_documents():
+    db = database.SessionLocal()
+    try:
+        uploaders = [models.User(id=models.generate_uuid(), name=f"Uploader {i}", email=f"up{i}@example.com",
+                                 password="-", role="manager", instansi=f"Unit {i}") for i in range(UPLOADER_COUNT)]
+        db.add_all(uploaders)
+        db.flush()
+        start = datetime(2024, 1, 1)
+        db.execute(insert(models.Document), [{
+            "id": models.generate_uuid(),
+            "title": f"Dokumen prosedur {i}",
+            "file_path": f"uploads/{i}.txt",
+            "file_type": "text/plain",
+            "file_size": 100,
+            "uploaded_by": uploaders[i % UPLOADER_COUNT].id,
+            "status": "approved",
+            "storage_status": "stored",
+            "tags": ["k3"],
+            "category": ["Prosedur"],
+            "content": f"isi prosedur nomor {i}",
+            "created_at": start + timedelta(minutes=i),
+        } for i in range(DOCUMENT_COUNT)])
+        db.commit()
+    finally:
+        db.close()
+
+def test_list_documents_statement_count(client, make_user):
+    _, headers = make_user("admin@example.com", "admin")
+    seed_documents()
+    auth_utils.user_cache.clear()
+
+    seen, cursor, pages = 0, None, 0
+    while True:
+        params = {"limit": 200, **({"cursor": cursor} if cursor else {})}
+        with count_statements() as statements:
+            page = client.get("/documents/", params=params, headers=headers).json()
+        assert len(statements) <= LIST_STATEMENT_LIMIT, statements
+        assert {item["uploader"]["name"] for item in page["results"]} <= {f"Uploader {i}" for i in range(UPLOADER_COUNT)}
+        seen += len(page["results"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert (seen, pages) == (DOCUMENT_COUNT, 5)
+
+def test_search_documents_statement_count(client, make_user):
+    _, headers = make_user("admin@example.com", "admin")
+    seed_documents()
+    auth_utils.user_cache.clear()
+
+    with count_statements() as statements:
+        page = client.get("/documents/search", params={"q": "prosedur", "limit": 200}, headers=headers).json()
+    assert page["total"] == DOCUMENT_COUNT
+    assert len(page["results"]) == 200
+    assert all(item["uploader"]["instansi"].startswith("Unit") for item in page["results"])
+    assert len(statements) <= SEARCH_STATEMENT_LIMIT, statements
@@ -0,0 +1,30 @@
+import database, models, response_cache
+
+def test_etag_shared_across_processes(client, make_user, upload):
+    _, headers = make_user("admin@example.com", "admin")
+    upload(headers, "Laporan")
+    first = client.get("/documents/", headers=headers)
+    etag = first.headers["etag"]
+
+    # Proses lain (body cache kosong) menghasilkan ETag yang sama selama versi tabel tidak berubah
+    response_cache.body_cache.clear()
+    assert client.get("/documents/", headers={**headers, "If-None-Match": etag}).status_code == 304
+
+def test_write_from_other_process_invalidates_etag(client, make_user, upload):
+    _, headers = make_user("admin@example.com", "admin")
+    doc_id = upload(headers, "Laporan")
+    etag = client.get("/documents/", headers=headers).headers["etag"]
+
+    # Penulisan di luar proses ini: data + versi di satu transaksi, tanpa menyentuh cache in-memory
+    db = database.SessionLocal()
+    try:
+        db.query(models.Document).filter(models.Document.id == doc_id).update({"title": "Baru"})
+        response_cache.bump(db, "documents")
+        db.commit()
+    finally:
+        db.close()
+
+    response = client.get("/documents/", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["results"][0]["title"] == "Baru"
@@ -0,0 +1,104 @@
+from types import SimpleNamespace
+
+import database, models, response_cache
+from services import job_queue, search_service, vector_index
+
+def set_status_elsewhere(doc_id, status):
+    # Perubahan dari proses lain: DB berubah, index in-memory proses ini tidak
+    db = database.SessionLocal()
+    try:
+        db.query(models.Document).filter(models.Document.id == doc_id).update({"status": status})
+        response_cache.bump(db, "documents")
+        db.commit()
+    finally:
+        db.close()
+
+def test_search_rechecks_role_filter(client, make_user, upload):
+    _, admin = make_user("admin@example.com", "admin")
+    _, reader = make_user("reader@example.com", "user")
+    kept = upload(admin, "Prosedur kerja aman", body=b"satu")
+    hidden = upload(admin, "Prosedur kerja lama", body=b"dua")
+    for doc_id in (kept, hidden):
+        assert client.put(f"/documents/{doc_id}/status", json={"status": "approved"}, headers=admin).status_code == 200
+
+    page = client.get("/documents/search", params={"q": "prosedur"}, headers=reader).json()
+    assert page["total"] == 2
+
+    set_status_elsewhere(hidden, "rejected")
+    page = client.get("/documents/search", params={"q": "prosedur"}, headers=reader).json()
+    assert [item["id"] for item in page["results"]] == [kept]
+    assert page["total"] == 1
+
+def test_index_follows_documents_version(client, make_user, upload):
+    _, admin = make_user("admin@example.com", "admin")
+    upload(admin, "Prosedur kerja aman")
+    assert client.get("/documents/search", params={"q": "kalibrasi"}, headers=admin).json()["total"] == 0
+
+    # Dokumen dari proses lain hanya terlihat lewat versi documents di table_versions (tanpa menunggu TTL)
+    db = database.SessionLocal()
+    try:
+        user = db.query(models.User).first()
+        db.add(models.Document(id=models.generate_uuid(), title="Kalibrasi alat ukur", file_path="uploads/x.txt",
+                               file_type="text/plain", file_size=1, uploaded_by=user.id, status="approved"))
+        response_cache.bump(db, "documents")
+        db.commit()
+    finally:
+        db.close()
+    assert client.get("/documents/search", params={"q": "kalibrasi"}, headers=admin).json()["total"] == 1
+
+def test_index_rebuild_keeps_writes_made_meanwhile(client, make_user, upload, monkeypatch):
+    _, admin = make_user("admin@example.com", "admin")
+    upload(admin, "Prosedur kerja aman")
+    index = search_service.search_index
+    late = SimpleNamespace(id="late", title="Zebra cross", tags=[], category=[], content="", status="approved",
+                           deleted_at=None)
+    add = search_service.SearchIndex._add
+    written = []
+
+    def add_then_write(self, *args):
+        # Upload lain selesai saat rebuild masih membaca DB
+        add(self, *args)
+        if self is not index and not written:
+            written.append(late.id)
+            index.upsert(late)
+
+    monkeypatch.setattr(search_service.SearchIndex, "_add", add_then_write)
+    index.refresh(version=-1)
+    monkeypatch.undo()
+    assert index.loaded_version == -1
+    assert [doc_id for doc_id, _ in index.search("zebra")[1]] == ["late"]
+    assert index.search("prosedur")[0] == 1
+
+def test_semantic_search_does_not_write_and_backfill_job_fills(client, make_user, upload):
+    _, admin = make_user("admin@example.com", "admin")
+    doc_id = upload(admin, "Prosedur evakuasi gedung", body=b"jalur evakuasi dan titik kumpul")
+    db = database.SessionLocal()
+    try:
+        db.query(models.Document).update({"embedding": None})
+        db.commit()
+    finally:
+        db.close()
+
+    def state():
+        db = database.SessionLocal()
+        try:
+            return db.get(models.Document, doc_id).embedding, db.query(models.Job).filter(
+                models.Job.kind == "backfill_embeddings").count()
+        finally:
+            db.close()
+
+    params = {"q": "evakuasi", "mode": "semantic"}
+    assert client.get("/documents/search", params=params, headers=admin).json()["total"] == 0
+    assert state() == (None, 0)
+    assert vector_index.vector_index.missing == 1
+
+    db = database.SessionLocal()
+    try:
+        vector_index.enqueue_backfill(db)
+        db.commit()
+    finally:
+        db.close()
+    assert job_queue.wait_idle(timeout=30)
+    assert state()[0] is not None
+    results = client.get("/documents/search", params=params, headers=admin).json()["results"]
+    assert [item["id"] for item in results] == [doc_id]
@@ -0,0 +1,42 @@
+from collections import Counter
+
+import database
+from services import stats_service
+
+def stats_from_counts(counts):
+    # Bentuk get_stats yang diharapkan, dihitung ulang dari tabel documents
+    by_status = {s: 0 for s in stats_service.STATUSES}
+    by_ref = {"category": Counter(), "uploader": Counter()}
+    for (dimension, ref_id, status), n in counts.items():
+        if dimension == "status":
+            by_status[status] += n
+        else:
+            by_ref[dimension][ref_id] += n
+    return by_status, {str(k): n for k, n in by_ref["category"].items()}, dict(by_ref["uploader"])
+
+def test_counters_follow_every_write_path(client, make_user, upload):
+    _, admin = make_user("admin@example.com", "admin")
+    _, staff = make_user("staff@example.com", "admin")
+    kept = upload(admin, "Prosedur", category="K3,Mutu")
+    rejected = upload(staff, "Laporan", category="Mutu")
+    deleted = upload(admin, "Lama")
+    for doc_id in (kept, rejected):
+        assert client.put(f"/documents/{doc_id}/status", json={"status": "approved"}, headers=admin).status_code == 200
+    response = client.post("/documents/bulk", json={"ids": [rejected, deleted], "action": "reject", "note": "Revisi"},
+                           headers=admin)
+    assert response.json()["succeeded"] == 2
+    assert client.delete(f"/documents/{deleted}", headers=admin).status_code == 200
+
+    db = database.SessionLocal()
+    try:
+        stats = stats_service.get_stats(db)
+        by_status, categories, uploaders = stats_from_counts(stats_service.compute_counters(db))
+        assert stats["status"] == by_status == {"pending": 0, "approved": 1, "rejected": 1}
+        assert stats["total"] == 2
+        assert {str(c["id"]): c["count"] for c in stats["categories"]} == categories
+        assert sorted(c["count"] for c in stats["categories"]) == [1, 2]
+        assert {u["id"]: u["count"] for u in stats["uploaders"]} == uploaders
+        assert stats_service.reconcile(db) == 0
+    finally:
+        db.close()
+    assert client.get("/documents/stats", headers=admin).json()["status"] == by_status
@@ -0,0 +1,61 @@
+from collections import Counter
+
+import database, models
+
+def history(*doc_ids):
+    db = database.SessionLocal()
+    try:
+        rows = db.query(models.DocumentHistory.document_id, models.DocumentHistory.action).filter(
+            models.DocumentHistory.document_id.in_(doc_ids),
+            models.DocumentHistory.action != "upload").all()
+        return Counter((doc_id, action) for doc_id, action in rows)
+    finally:
+        db.close()
+
+def test_update_status_rejects_invalid_transitions(client, make_user, upload):
+    _, admin = make_user("admin@example.com", "admin")
+    doc_id = upload(admin, "Prosedur", wait=False)
+    assert client.put(f"/documents/{doc_id}/status", json={"status": "approved"}, headers=admin).status_code == 200
+
+    same = client.put(f"/documents/{doc_id}/status", json={"status": "approved"}, headers=admin)
+    assert same.status_code == 400
+    assert same.json()["detail"] == "Status tidak dapat diubah dari approved ke approved"
+    unknown = client.put(f"/documents/{doc_id}/status", json={"status": "archived"}, headers=admin)
+    assert unknown.status_code == 400
+    assert unknown.json()["detail"] == "Status tidak valid"
+    assert history(doc_id) == {(doc_id, "status_change_approved"): 1}
+
+def test_bulk_reports_result_per_id(client, make_user, upload):
+    _, admin = make_user("admin@example.com", "admin")
+    pending = upload(admin, "Menunggu", wait=False)
+    approved = upload(admin, "Disetujui", wait=False)
+    deleted = upload(admin, "Dihapus", wait=False)
+    assert client.put(f"/documents/{approved}/status", json={"status": "approved"}, headers=admin).status_code == 200
+    assert client.delete(f"/documents/{deleted}", headers=admin).status_code == 200
+    before = history(pending, approved, deleted)
+
+    response = client.post("/documents/bulk", json={"ids": [pending, approved, "tidak-ada", deleted, pending],
+                                                     "action": "approve"}, headers=admin)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["results"] == [
+        {"id": pending, "ok": True, "status": "approved"},
+        {"id": approved, "ok": False, "error": "Status tidak dapat diubah dari approved ke approved"},
+        {"id": "tidak-ada", "ok": False, "error": "Dokumen tidak ditemukan"},
+        {"id": deleted, "ok": False, "error": "Dokumen tidak ditemukan"},
+    ]
+    assert (body["succeeded"], body["failed"]) == (1, 3)
+    # Tepat satu riwayat untuk tiap dokumen yang berhasil, tidak ada untuk yang gagal
+    assert history(pending, approved, deleted) - before == {(pending, "status_change_approved"): 1}
+
+    response = client.post("/documents/bulk", json={"ids": [pending, approved, "tidak-ada"], "action": "delete"},
+                           headers=admin)
+    assert [r["ok"] for r in response.json()["results"]] == [True, True, False]
+    assert history(pending, approved) - before == {(pending, "status_change_approved"): 1,
+                                                   (pending, "delete"): 1, (approved, "delete"): 1}
+    assert client.get("/documents/", headers=admin).json()["results"] == []
+
+def test_bulk_rejects_unknown_action_and_empty_list(client, make_user):
+    _, admin = make_user("admin@example.com", "admin")
+    assert client.post("/documents/bulk", json={"ids": ["x"], "action": "archive"}, headers=admin).status_code == 400
+    assert client.post("/documents/bulk", json={"ids": [], "action": "approve"}, headers=admin).status_code == 400
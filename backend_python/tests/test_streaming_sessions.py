@@ -0,0 +1,56 @@
+"""Endpoint streaming tidak boleh menahan koneksi pool selama response berjalan."""
+import asyncio
+
+import auth_utils, database, main
+from services import job_queue
+
+def outstanding():
+    return database.pool_metrics.checkouts - database.pool_metrics.checkins
+
+def held_while_streaming(path, headers):
+    """Panggil app lewat ASGI; return (koneksi tertahan saat chunk pertama terkirim, status)."""
+    result = {}
+    # Job worker juga memakai pool; tunggu sampai diam supaya hitungan hanya milik request ini
+    assert job_queue.wait_idle(timeout=30)
+
+    async def run():
+        disconnected = asyncio.Event()
+        before = outstanding()
+
+        async def receive():
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                result["status"] = message["status"]
+            elif message["type"] == "http.response.body" and "held" not in result:
+                result["held"] = outstanding() - before
+                disconnected.set()
+
+        path_only, _, query = path.partition("?")
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": path_only, "raw_path": path_only.encode(), "root_path": "",
+            "query_string": query.encode(), "server": ("testserver", 80), "client": ("testclient", 50000),
+            "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        }
+        await asyncio.wait_for(main.app(scope, receive, send), timeout=10)
+
+    asyncio.run(run())
+    return result["held"], result["status"]
+
+def test_stream_notifications_releases_session(make_user):
+    _, headers = make_user("sse@example.com")
+    token = headers["Authorization"].split()[1]
+    held, status = held_while_streaming(f"/notifications/stream?access_token={token}", {})
+    assert status == 200
+    assert held == 0
+
+def test_export_holds_only_its_cursor_connection(make_user, upload):
+    _, headers = make_user("admin@example.com", "admin")
+    upload(headers, "Laporan")
+    # Lookup user (cache miss) memakai session sendiri yang sudah ditutup sebelum stream dimulai
+    auth_utils.user_cache.clear()
+    held, status = held_while_streaming("/documents/export", headers)
+    assert (held, status) == (1, 200)
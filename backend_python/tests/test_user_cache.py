@@ -0,0 +1,29 @@
+import auth_utils, database, models
+
+def test_principal_invalidated_only_after_commit(client, make_user):
+    user_id, headers = make_user("staf@example.com", "user")
+    assert client.get("/documents/", headers=headers).status_code == 200
+    assert auth_utils.user_cache.get(user_id) is not None
+
+    db = database.SessionLocal()
+    try:
+        db.get(models.User, user_id).role = "admin"
+        db.flush()
+        # Belum di-commit: request lain masih melihat role lama di DB, cache tidak boleh dikosongkan dulu
+        assert auth_utils.user_cache.get(user_id).role == "user"
+        db.rollback()
+        assert auth_utils.user_cache.get(user_id).role == "user"
+
+        db.get(models.User, user_id).role = "admin"
+        db.commit()
+        assert auth_utils.user_cache.get(user_id) is None
+    finally:
+        db.close()
+
+def test_deleted_user_is_dropped_from_cache(client, make_user):
+    _, admin = make_user("admin@example.com", "admin")
+    user_id, headers = make_user("staf@example.com", "user")
+    assert client.get("/documents/", headers=headers).status_code == 200
+    assert client.delete(f"/users/{user_id}", headers=admin).status_code == 200
+    assert auth_utils.user_cache.get(user_id) is None
+    assert client.get("/documents/", headers=headers).status_code == 401
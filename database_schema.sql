@@ -28,8 +28,10 @@ CREATE TABLE IF NOT EXISTS documents (
     file_path TEXT NOT NULL,
     file_type VARCHAR(50) NOT NULL,
     file_size BIGINT NOT NULL,
+    content_hash CHAR(64),
     uploaded_by VARCHAR(36) NOT NULL,
     status ENUM('pending', 'approved', 'rejected') NOT NULL DEFAULT 'pending',
+    storage_status ENUM('uploading', 'stored', 'failed') NOT NULL DEFAULT 'stored',
     approved_by VARCHAR(36),
     rejected_by VARCHAR(36),
     rejection_note TEXT,
@@ -44,7 +46,10 @@ CREATE TABLE IF NOT EXISTS documents (
     FOREIGN KEY (uploaded_by) REFERENCES users(id),
     FOREIGN KEY (approved_by) REFERENCES users(id),
     FOREIGN KEY (rejected_by) REFERENCES users(id),
-    FOREIGN KEY (deleted_by) REFERENCES users(id)
+    FOREIGN KEY (deleted_by) REFERENCES users(id),
+    INDEX ix_documents_content_hash (content_hash),
+    INDEX ix_documents_deleted_created (deleted_at, created_at, id),
+    INDEX ix_documents_deleted_status_created (deleted_at, status, created_at, id)
 );
 
 CREATE TABLE IF NOT EXISTS document_history (
@@ -55,7 +60,10 @@ CREATE TABLE IF NOT EXISTS document_history (
     notes TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (document_id) REFERENCES documents(id),
-    FOREIGN KEY (changed_by) REFERENCES users(id)
+    FOREIGN KEY (changed_by) REFERENCES users(id),
+    INDEX ix_document_history_document_created (document_id, created_at),
+    INDEX ix_document_history_created (created_at, id),
+    INDEX ix_document_history_actor_created (changed_by, created_at)
 );
 
 CREATE TABLE IF NOT EXISTS notifications (
@@ -65,7 +73,8 @@ CREATE TABLE IF NOT EXISTS notifications (
     is_read BOOLEAN DEFAULT FALSE,
     type VARCHAR(50),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (user_id) REFERENCES users(id)
+    FOREIGN KEY (user_id) REFERENCES users(id),
+    INDEX ix_notifications_user_read_created (user_id, is_read, created_at)
 );
 
 CREATE TABLE IF NOT EXISTS favorites (
@@ -74,7 +83,57 @@ CREATE TABLE IF NOT EXISTS favorites (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     PRIMARY KEY (user_id, document_id),
     FOREIGN KEY (user_id) REFERENCES users(id),
-    FOREIGN KEY (document_id) REFERENCES documents(id)
+    FOREIGN KEY (document_id) REFERENCES documents(id),
+    INDEX ix_favorites_user_created (user_id, created_at, document_id)
+);
+
+CREATE TABLE IF NOT EXISTS document_tags (
+    document_id VARCHAR(36) NOT NULL,
+    tag VARCHAR(100) NOT NULL,
+    PRIMARY KEY (document_id, tag),
+    FOREIGN KEY (document_id) REFERENCES documents(id),
+    INDEX ix_document_tags_tag_document (tag, document_id)
+);
+
+CREATE TABLE IF NOT EXISTS document_categories (
+    document_id VARCHAR(36) NOT NULL,
+    category_id INT NOT NULL,
+    PRIMARY KEY (document_id, category_id),
+    FOREIGN KEY (document_id) REFERENCES documents(id),
+    FOREIGN KEY (category_id) REFERENCES categories(id),
+    INDEX ix_document_categories_category_document (category_id, document_id)
+);
+
+CREATE TABLE IF NOT EXISTS document_counters (
+    dimension VARCHAR(20) NOT NULL,
+    ref_id VARCHAR(36) NOT NULL,
+    status ENUM('pending', 'approved', 'rejected') NOT NULL,
+    doc_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (dimension, ref_id, status)
+);
+
+CREATE TABLE IF NOT EXISTS table_versions (
+    name VARCHAR(64) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT IGNORE INTO table_versions (name, version)
+VALUES ('documents', 0), ('favorites', 0), ('users', 0), ('categories', 0);
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id VARCHAR(36) PRIMARY KEY,
+    kind VARCHAR(50) NOT NULL,
+    payload JSON,
+    idempotency_key VARCHAR(255) UNIQUE,
+    status ENUM('queued', 'running', 'done', 'failed') NOT NULL DEFAULT 'queued',
+    attempts INT NOT NULL DEFAULT 0,
+    max_attempts INT NOT NULL DEFAULT 5,
+    run_at TIMESTAMP NOT NULL,
+    locked_at TIMESTAMP NULL,
+    last_error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX ix_jobs_status_run_at (status, run_at)
 );
 
 -- Insert Default Admin (Password: password123)
@@ -53,7 +53,7 @@
                                 <div>
                                     <div class="font-medium text-slate-800" x-text="row.title"></div>
                                     <div class="text-xs text-slate-400 mt-0.5" x-text="formatDate(row.created_at)"></div>
-                                    <a :href="row.file_url.startsWith('http') ? row.file_url : `{{ config('services.python_api.url') }}${row.file_url}`" target="_blank" class="text-xs text-blue-600 hover:underline mt-1 inline-block">Lihat File</a>
+                                    <a :href="fileUrl(row.file_url)" target="_blank" class="text-xs text-blue-600 hover:underline mt-1 inline-block">Lihat File</a>
                                 </div>
                             </div>
                         </td>
@@ -107,17 +107,23 @@ class="p-1.5 bg-red-50 text-red-600 rounded hover:bg-red-100 hover:text-red-700
             </tbody>
         </table>
     </div>
+
+    @include('partials.load_more')
 </div>
 
+@include('partials.file_url')
+@include('partials.document_pages')
 <script>
     function checkFileComponent(token) {
         return {
-            rows: [],
+            ...documentPages(token, 'Gagal mengambil data dokumen'),
             loading: true,
             error: '',
             actionLoading: null,
             filter: 'all', // all, pending
             
+            fileUrl: fileUrl,
+
             init() {
                 this.fetchDocuments();
             },
@@ -126,7 +132,12 @@ function checkFileComponent(token) {
                 if (this.filter === 'pending') {
                     return this.rows.filter(r => r.status === 'pending');
                 }
-                return this.rows;
+                // Sort pending first, then by date desc (halaman yang sudah dimuat)
+                return [...this.rows].sort((a, b) => {
+                    if (a.status === 'pending' && b.status !== 'pending') return -1;
+                    if (a.status !== 'pending' && b.status === 'pending') return 1;
+                    return new Date(b.created_at) - new Date(a.created_at);
+                });
             },
 
             formatDate(dateString) {
@@ -137,19 +148,7 @@ function checkFileComponent(token) {
             
             async fetchDocuments() {
                 try {
-                    const response = await fetch('{{ config('services.python_api.url') }}/documents/', {
-                        headers: { 'Authorization': `Bearer ${token}` }
-                    });
-                    
-                    if (!response.ok) throw new Error('Gagal mengambil data dokumen');
-                    
-                    const data = await response.json();
-                    // Sort pending first, then by date desc
-                    this.rows = (data.results || []).sort((a, b) => {
-                        if (a.status === 'pending' && b.status !== 'pending') return -1;
-                        if (a.status !== 'pending' && b.status === 'pending') return 1;
-                        return new Date(b.created_at) - new Date(a.created_at);
-                    });
+                    await this.loadFirstPage();
                 } catch (e) {
                     this.error = e.message;
                 } finally {
@@ -16,7 +16,15 @@
     <!-- Search Section -->
     <div class="bg-white p-6 rounded-lg shadow-sm border border-slate-100" 
          x-data="searchComponent('{{ session('token') }}')">
-        <div class="text-lg font-semibold mb-4 text-slate-700">Daftar Dokumen</div>
+        <div class="flex items-baseline justify-between mb-4">
+            <div class="text-lg font-semibold text-slate-700">Daftar Dokumen</div>
+            <div x-show="stats" class="text-sm text-slate-500" style="display: none;">
+                <span x-text="stats?.total"></span> dokumen
+                <template x-if="stats?.status?.pending !== undefined">
+                    <span>&middot; <span x-text="stats.status.pending"></span> menunggu verifikasi</span>
+                </template>
+            </div>
+        </div>
         
         <div class="space-y-3">
             <form @submit.prevent="performSearch" class="flex gap-2">
@@ -43,10 +51,10 @@ class="w-full border border-slate-300 rounded px-3 py-2 pl-10 focus:outline-none
 
             <!-- Results List -->
             <div class="grid gap-3 mt-4">
-                <template x-for="r in results" :key="r.id">
+                <template x-for="r in rows" :key="r.id">
                     <div class="relative p-4 border border-slate-200 rounded-lg bg-white hover:bg-slate-50 transition-all hover:shadow-md group">
                         
-                        <a :href="r.file_url ? (r.file_url.startsWith('http') ? r.file_url : '{{ config('services.python_api.url') }}' + r.file_url) : '#'" target="_blank" class="block">
+                        <a :href="fileUrl(r.file_url)" target="_blank" class="block">
                             <div class="flex items-start justify-between">
                                 <div class="flex items-start gap-3">
                                     <div class="bg-blue-50 text-blue-600 p-2 rounded shrink-0">
@@ -72,26 +80,46 @@ class="w-full border border-slate-300 rounded px-3 py-2 pl-10 focus:outline-none
                     </div>
                 </template>
                 
-                <div x-show="results.length === 0 && !loading" class="text-slate-500 text-sm text-center py-8 bg-slate-50 rounded border border-dashed border-slate-200">
+                <div x-show="rows.length === 0 && !loading" class="text-slate-500 text-sm text-center py-8 bg-slate-50 rounded border border-dashed border-slate-200">
                     <span x-show="!q">Belum ada dokumen yang diunggah.</span>
                     <span x-show="q">Tidak ada dokumen yang ditemukan untuk pencarian ini.</span>
                 </div>
             </div>
+
+            @include('partials.load_more')
         </div>
     </div>
 
 </div>
 
+@include('partials.file_url')
+@include('partials.document_pages')
 <script>
     function searchComponent(token) {
         return {
             q: '',
             loading: false,
-            results: [],
+            ...documentPages(token, 'Gagal mengambil data'),
+            stats: null,
             error: '',
             
+            fileUrl: fileUrl,
+
             init() {
                 this.performSearch();
+                this.fetchStats();
+            },
+
+            // Total dari tabel counter (GET /documents/stats), bukan dari jumlah baris yang sudah dimuat
+            async fetchStats() {
+                try {
+                    const response = await fetch(`{{ config('services.python_api.url') }}/documents/stats`, {
+                        headers: { 'Authorization': `Bearer ${token}`, 'Accept': 'application/json' }
+                    });
+                    if (response.ok) this.stats = await response.json();
+                } catch (err) {
+                    console.error(err);
+                }
             },
             
             formatDate(dateString) {
@@ -107,19 +135,8 @@ function searchComponent(token) {
                 
                 try {
                     // Use list endpoint which supports optional q param
-                    const url = `{{ config('services.python_api.url') }}/documents/?q=${encodeURIComponent(this.q)}`;
-                    
-                    const response = await fetch(url, {
-                        headers: {
-                            'Authorization': `Bearer ${token}`,
-                            'Accept': 'application/json'
-                        }
-                    });
-                    
-                    if (!response.ok) throw new Error('Gagal mengambil data');
-                    
-                    const data = await response.json();
-                    this.results = data.results || [];
+                    this.pageUrl = `{{ config('services.python_api.url') }}/documents/?q=${encodeURIComponent(this.q)}`;
+                    await this.loadFirstPage();
                 } catch (err) {
                     this.error = 'Terjadi kesalahan saat memuat data.';
                     console.error(err);
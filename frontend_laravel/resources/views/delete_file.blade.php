@@ -49,7 +49,7 @@
                                 <div>
                                     <div class="font-medium text-slate-800" x-text="row.title"></div>
                                     <div class="text-xs text-slate-400 mt-0.5" x-text="row.uploader?.name || 'Unknown'"></div>
-                                    <a :href="row.file_url.startsWith('http') ? row.file_url : `{{ config('services.python_api.url') }}${row.file_url}`" target="_blank" class="text-xs text-blue-600 hover:underline mt-1 inline-block">Lihat File</a>
+                                    <a :href="fileUrl(row.file_url)" target="_blank" class="text-xs text-blue-600 hover:underline mt-1 inline-block">Lihat File</a>
                                 </div>
                             </div>
                         </td>
@@ -86,16 +86,22 @@ class="px-3 py-1.5 bg-red-50 text-red-600 rounded hover:bg-red-100 hover:text-re
             </tbody>
         </table>
     </div>
+
+    @include('partials.load_more')
 </div>
 
+@include('partials.file_url')
+@include('partials.document_pages')
 <script>
     function deleteFileComponent(token) {
         return {
-            rows: [],
+            ...documentPages(token, 'Gagal mengambil data dokumen'),
             loading: true,
             error: '',
             actionLoading: null,
             
+            fileUrl: fileUrl,
+
             init() {
                 this.fetchDocuments();
             },
@@ -108,14 +114,7 @@ function deleteFileComponent(token) {
             
             async fetchDocuments() {
                 try {
-                    const response = await fetch('{{ config('services.python_api.url') }}/documents/', {
-                        headers: { 'Authorization': `Bearer ${token}` }
-                    });
-                    
-                    if (!response.ok) throw new Error('Gagal mengambil data dokumen');
-                    
-                    const data = await response.json();
-                    this.rows = data.results || [];
+                    await this.loadFirstPage();
                 } catch (e) {
                     this.error = e.message;
                 } finally {
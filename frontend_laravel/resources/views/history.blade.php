@@ -40,7 +40,7 @@
                         <td class="px-6 py-4 font-medium text-slate-800">
                             <div class="flex items-center gap-2">
                                 <span class="uppercase text-xs font-bold bg-slate-200 px-1.5 py-0.5 rounded text-slate-600">FILE</span>
-                                <a :href="row.file_url ? (row.file_url.startsWith('http') ? row.file_url : '{{ config('services.python_api.url') }}' + row.file_url) : '#'" target="_blank" class="hover:text-blue-600 hover:underline" x-text="row.title"></a>
+                                <a :href="fileUrl(row.file_url)" target="_blank" class="hover:text-blue-600 hover:underline" x-text="row.title"></a>
                             </div>
                         </td>
                         <td class="px-6 py-4">
@@ -87,34 +87,33 @@ class="px-3 py-1 bg-red-600 text-white text-xs rounded hover:bg-red-700 disabled
             </tbody>
         </table>
     </div>
+
+    @include('partials.load_more')
 </div>
 
+@include('partials.file_url')
+@include('partials.document_pages')
 <script>
     function historyComponent(token, canManage) {
         return {
-            rows: [],
+            ...documentPages(token, 'Failed to fetch history'),
             loading: true,
             error: '',
             actionLoading: null,
             canManage: canManage,
             
+            fileUrl: fileUrl,
+
             init() {
                 this.fetchHistory();
             },
             
             async fetchHistory() {
                 try {
-                    const response = await fetch('{{ config('services.python_api.url') }}/documents/', {
-                        headers: { 'Authorization': `Bearer ${token}` }
-                    });
-                    
-                    if (!response.ok) throw new Error('Failed to fetch history');
-                    
-                    const data = await response.json();
                     // Filter for "Riwayat" (Approved/Rejected/Pending if user uploaded it?)
                     // For Admin "Riwayat Masukkan": Verified files (Approved/Rejected).
                     // For User "Riwayat File": Approved files (filtered by backend).
-                    this.rows = data.results || [];
+                    await this.loadFirstPage();
                 } catch (e) {
                     this.error = e.message;
                 } finally {
@@ -0,0 +1,42 @@
+{{-- Paginasi daftar dokumen untuk komponen Alpine: `...documentPages(token, pesanError),` di objek komponen. --}}
+<script>
+    // GET /documents/ dipaginasi (keyset): halaman pertama saat dibuka, halaman berikut lewat next_cursor
+    // saat tombol "Muat lebih banyak" (partials.load_more) diklik
+    function documentPages(token, errorMessage) {
+        return {
+            rows: [],
+            nextCursor: null,
+            loadingMore: false,
+            pageUrl: `{{ config('services.python_api.url') }}/documents/`,
+
+            async fetchPage(cursor) {
+                const params = new URLSearchParams();
+                if (cursor) params.set('cursor', cursor);
+                const url = this.pageUrl;
+                const response = await fetch(`${url}${url.includes('?') ? '&' : '?'}${params}`, {
+                    headers: { 'Authorization': `Bearer ${token}`, 'Accept': 'application/json' }
+                });
+                if (!response.ok) throw new Error(errorMessage);
+                const data = await response.json();
+                this.nextCursor = data.next_cursor;
+                return data.results || [];
+            },
+
+            async loadFirstPage() {
+                this.rows = await this.fetchPage(null);
+            },
+
+            async loadMore() {
+                if (!this.nextCursor || this.loadingMore) return;
+                this.loadingMore = true;
+                try {
+                    this.rows.push(...await this.fetchPage(this.nextCursor));
+                } catch (e) {
+                    this.error = e.message;
+                } finally {
+                    this.loadingMore = false;
+                }
+            },
+        };
+    }
+</script>
@@ -0,0 +1,10 @@
+{{-- Helper link file untuk komponen Alpine: `fileUrl: fileUrl,` di objek komponen. --}}
+<script>
+    // Path relatif = endpoint API Python; download_url sudah ditandatangani API (berlaku singkat),
+    // jadi token login tidak pernah ikut di href
+    function fileUrl(url) {
+        if (!url) return '#';
+        if (url.startsWith('http')) return url;
+        return `{{ config('services.python_api.url') }}${url}`;
+    }
+</script>
@@ -0,0 +1,6 @@
+<div x-show="!loading && nextCursor" class="p-4 text-center" style="display: none;">
+    <button @click="loadMore()" :disabled="loadingMore" class="px-4 py-2 text-sm bg-slate-100 text-slate-700 rounded hover:bg-slate-200 transition-colors disabled:opacity-50">
+        <span x-show="!loadingMore">Muat lebih banyak</span>
+        <span x-show="loadingMore">Memuat...</span>
+    </button>
+</div>
@@ -101,13 +101,13 @@ class="px-6 py-3 bg-blue-600 text-white font-medium rounded-lg hover:bg-blue-700
                     <div class="px-5 py-4 border-t border-slate-100 bg-slate-50 rounded-b-lg flex justify-between items-center">
                         <span class="text-xs text-slate-400" x-text="formatDate(doc.created_at)"></span>
                         <div class="flex gap-2">
-                            <a :href="doc.file_url" target="_blank" class="p-2 text-slate-500 hover:text-blue-600 hover:bg-blue-50 rounded-full transition-all" title="Preview">
+                            <a :href="fileUrl(doc.file_url)" target="_blank" class="p-2 text-slate-500 hover:text-blue-600 hover:bg-blue-50 rounded-full transition-all" title="Preview">
                                 <svg class="w-5 h-5" fill="none" stroke="currentColor" viewBox="0 0 24 24">
                                     <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M15 12a3 3 0 11-6 0 3 3 0 016 0z"></path>
                                     <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M2.458 12C3.732 7.943 7.523 5 12 5c4.478 0 8.268 2.943 9.542 7-1.274 4.057-5.064 7-9.542 7-4.477 0-8.268-2.943-9.542-7z"></path>
                                 </svg>
                             </a>
-                            <a :href="doc.download_url || doc.file_url" download class="p-2 text-slate-500 hover:text-green-600 hover:bg-green-50 rounded-full transition-all" title="Download">
+                            <a :href="fileUrl(doc.download_url || doc.file_url)" download class="p-2 text-slate-500 hover:text-green-600 hover:bg-green-50 rounded-full transition-all" title="Download">
                                 <svg class="w-5 h-5" fill="none" stroke="currentColor" viewBox="0 0 24 24">
                                     <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M4 16v1a3 3 0 003 3h10a3 3 0 003-3v-1m-4-4l-4 4m0 0l-4-4m4 4V4"></path>
                                 </svg>
@@ -120,6 +120,7 @@ class="px-6 py-3 bg-blue-600 text-white font-medium rounded-lg hover:bg-blue-700
     </div>
 </div>
 
+@include('partials.file_url')
 <script>
     function searchPage(token) {
         return {
@@ -130,6 +131,8 @@ function searchPage(token) {
             error: '',
             filters: ['Prosedur', 'Instruksi Kerja', 'Manual', 'Formulir'], // Static for now
             
+            fileUrl: fileUrl,
+
             async performSearch() {
                 if (!this.q.trim()) return;
                 